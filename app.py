@@ -1,11 +1,11 @@
+import logging
 import pandas as pd
 import streamlit as st
 import datetime as dt
-import re
-import plotly.graph_objects as go
 
-from core.fetch import fno_stock_all, get_constituents, read_intraday, get_intraday_symbols
-from core.straddles import straddle_tables, straddle_timeseries, price_timeseries
+from core.fetch import fno_stock_all, fno_index_all, get_constituents, read_intraday, get_intraday_symbols
+from core.straddles import (straddle_tables, straddle_timeseries, price_timeseries,
+                            straddle_panel, decay_vs_history)
 from core.preprocess import (
     breadth_panels,
     cash_with_live,
@@ -17,20 +17,34 @@ from core.preprocess import (
     stock_explorer_processing
 )
 from core.live_zerodha import live_index_quotes, live_quotes, atm_straddle
-from core.sector import constituent_returns   
-from core.live_scanner import scan_prev_expiry_cross
-from core.fno_utils import classify_futures
-from core.basis_screener import current_basis_table, intraday_prices, daily_basis_series
+from core.sector import constituent_returns
+from core.live_scanner import scan_prev_expiry_cross, run_scans
+from core.fno_utils import classify_futures, futures_underlying, INDEX_SPOT
+from core.basis_screener import (
+    current_basis_table,
+    daily_basis_series,
+    daily_basis_panel,
+    basis_screen,
+    intraday_basis_matrix,
+    basis_spikes,
+)
+from core.volatility import vol_panels, vol_screen, ESTIMATORS
+from core.option_chain import chain_snapshot, chain_summary
+from core.resample import resample, TIMEFRAMES
+from core.intraday_breadth import intraday_breadth
+
 
 
+# plotly (via plots/) is imported inside the tab that draws it: a cold start
+# only pays for the charts on the first page it renders
+from plots.tables import gradient_table          # no plotly import
 
-from plots.breadth import breadth_figure, advdec_figure, ema_area_figure, nnhl_figure
-from plots.stock_explorer import stock_explorer_figure
-from plots.sector import sector_figure
-from plots.straddle import straddle_figure
-from plots.basis        import  basis_daily_figure
+from core import snapshots
+from core.cache import memory_report, cache_stats
+from core import perf
+from core.trading_calendar import window_start, previous_session
 
-from app_config import INDEX_SYMBOLS
+from app_config import INDEX_SYMBOLS, AUTO_REFRESH_SECS, SNAPSHOT_MAX_AGE
 
 
 
@@ -47,6 +61,22 @@ st.set_page_config(page_title="📊 Market Breadth", layout="wide")
 TODAY = dt.date.today()
 TODAY_STR  = TODAY.strftime("%d %b %Y")
 
+RUN = perf.begin("app")              # finished (and logged) at the bottom
+
+
+class _PageWarnings(logging.Handler):
+    """Show core-layer warnings (missing tokens, Kite errors) on the page."""
+
+    def emit(self, record):
+        st.warning(record.getMessage())
+
+
+_core_log = logging.getLogger("core")
+if not any(h.get_name() == "page-warnings" for h in _core_log.handlers):
+    _handler = _PageWarnings(logging.WARNING)
+    _handler.set_name("page-warnings")
+    _core_log.addHandler(_handler)
+
 st.sidebar.title("⚙️ Settings")
 USE_LIVE = st.sidebar.toggle("Include live (Kite) quotes", value=False,
                              key="use_live")
@@ -70,32 +100,213 @@ if st.sidebar.button("🔄 Update prices", help="Clear live caches and refresh")
         ]:
         fn.clear()                     # flush the cache
     st.session_state["last_update"] = dt.datetime.now()
+    if USE_LIVE:
+        # base frames come from the snapshot – republish it with fresh quotes
+        st.session_state["republish_after"] = pd.Timestamp.now()
     st.rerun()            # immediately rerun app with fresh data
-    
-# =============================================================================
 
-tabs = st.tabs(["📊 Market Breadth",
-                "📈 Open Interest Analysis",
-                "📉 Stock Explorer",
-                "Sectoral Analysis",
-                "Straddle Prices",
-                "⏱️ Intraday",
-                "Futures Basis"])
+with st.sidebar.expander("🧠 Cache memory"):
+    mem_rep = memory_report()
+    st.caption(f"{mem_rep['bytes'].sum() / 1024**2:,.1f} MB held" if not mem_rep.empty else "empty")
+    st.dataframe(mem_rep)
+
+# admin-only: open the app with ?admin=1 to get the instrumentation panel
+PERF_PANEL = st.query_params.get("admin") == "1" and st.sidebar.toggle(
+    "🛠️ Perf panel", value=False, key="perf_panel",
+    help="Per-function wall time, rows, cache and Kite calls for this rerun")
+
+AUTO_REFRESH = st.sidebar.toggle("⏱️ Auto-refresh live panels", value=False,
+                                 key="auto_refresh")
+if AUTO_REFRESH:
+    with st.sidebar.expander("Refresh intervals (s)"):
+        for panel, secs in AUTO_REFRESH_SECS.items():
+            st.number_input(panel.title(), min_value=5, max_value=600,
+                            value=secs, step=5, key=f"refresh_{panel}")
+
+
+def refresh_secs(panel: str) -> int | None:
+    """Auto-refresh interval for `panel`, or None when auto-refresh is off."""
+    if not AUTO_REFRESH:
+        return None
+    return st.session_state.get(f"refresh_{panel}", AUTO_REFRESH_SECS[panel])
+
+
+def live_fragment(panel: str, body, *args):
+    """
+    Run `body(*args, snap=...)` in a fragment that re-executes every
+    `refresh_secs(panel)` seconds, so the rest of the page is untouched.
+    New data comes from the caches behind the panel expiring on the
+    AUTO_REFRESH_SECS clock – shared by every viewer, so N sessions
+    polling still means one fetch per interval.
+
+    `snap` is the (version, meta) snapshot resolved on each fragment run –
+    the module-level SNAP_VERSION is only set by full reruns.  Once a
+    refresh finds the snapshot older than the interval, the panel computes
+    from its caches (snap = (None, {})) until a newer one appears.
+    """
+    secs = refresh_secs(panel)
+    key  = f"last_refresh_{panel}"
+    live_key = f"live_since_{panel}"
+
+    def _run(*a):
+        now  = dt.datetime.now()
+        last = st.session_state.get(key)
+        due  = bool(secs and last and (now - last).total_seconds() >= secs)
+        if last is None or due:
+            st.session_state[key] = now
+
+        snap = fresh_snapshot()
+        if due and (not snap[0] or snapshots.snapshot_age(snap[1]) > pd.Timedelta(seconds=secs)):
+            st.session_state[live_key] = pd.Timestamp(now)
+        since = st.session_state.get(live_key)
+        if since is not None and snap[0] and pd.Timestamp(snap[1]["published_at"]) < since:
+            snap = (None, {})
+        body(*a, snap=snap)
+        if secs:
+            st.caption(f"Auto-refresh every {secs}s · last {st.session_state[key]:%H:%M:%S}")
+
+    _run.__qualname__ = _run.__name__ = f"{panel}_live_fragment"
+    st.fragment(_run, run_every=secs)(*args)
+
+
+def chart(fig):
+    """st.plotly_chart, timed as one perf event (figure serialization + send)."""
+    points = sum(len(t.x) for t in fig.data if getattr(t, "x", None) is not None)
+    with perf.span("plotly_chart", rows_in=points):
+        st.plotly_chart(fig, use_container_width=True)
+
+# =============================================================================
+# Tab router: only the selected tab's body runs on a rerun (st.tabs would
+# execute all seven).  Widgets inside a tab live in st.fragment sections so
+# changing them reruns just that section.
+
+TAB_NAMES = ["📊 Market Breadth",
+             "📈 Open Interest Analysis",
+             "📉 Stock Explorer",
+             "Sectoral Analysis",
+             "Straddle Prices",
+             "⏱️ Intraday",
+             "Futures Basis"]
+
+active_tab = st.segmented_control(
+    "View", TAB_NAMES, default=TAB_NAMES[0], key="active_tab",
+    label_visibility="collapsed",
+) or TAB_NAMES[0]
+RUN["label"] = active_tab
+
+
+# ---------- worker snapshots (see worker.py / core/snapshots.py) ----------
+SNAP_ROOT = snapshots.mode_root(USE_LIVE)
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def snapshot_state(root):
+    version = snapshots.current_version(root)
+    return (version, snapshots.load_meta(version, root)) if version else (None, {})
+
+
+# cache_resource, not cache_data: hand every session the same memory-mapped
+# frames instead of a private unpickled copy
+@st.cache_resource(show_spinner=False, max_entries=64)
+def snapshot_table(root, version, name):
+    return snapshots.load_table(version, name, root)
+
+
+def fresh_snapshot():
+    version, meta = snapshot_state(SNAP_ROOT)
+    max_age = pd.Timedelta(meta.get("max_age", SNAPSHOT_MAX_AGE)) if version else None
+    if version and snapshots.snapshot_age(meta) <= max_age:
+        return version, meta
+    return None, {}
+
+
+def publish_base_snapshot(newer_than=None):
+    """
+    No fresh snapshot with base data (or none published after `newer_than`):
+    fetch once per host under a file lock and publish it, so the other
+    server processes just map the result.
+    """
+    with snapshots.host_lock(SNAP_ROOT):
+        snapshot_state.clear()
+        version, meta = fresh_snapshot()
+        if (version and set(snapshots.MMAP_TABLES) <= set(meta["tables"])
+                and (newer_than is None or pd.Timestamp(meta["published_at"]) >= newer_than)):
+            return                                  # another process won the race
+        snapshots.publish({
+            "cash":      cash_with_live(USE_LIVE),
+            "index":     index_with_live(USE_LIVE),
+            "fno_stock": fno_stock_all(),
+        }, {"use_live": USE_LIVE}, root=SNAP_ROOT)
+        for fn in (cash_with_live, index_with_live, fno_stock_all):
+            fn.clear(disk=False)                    # keep only the mapped copy
+    snapshot_state.clear()
+
+
+SNAP_VERSION, SNAP_META = fresh_snapshot()
+# "Update prices" in live mode: the snapshot may be up to max_age old
+REPUBLISH_AFTER = st.session_state.pop("republish_after", None)
+if (REPUBLISH_AFTER is not None or not SNAP_VERSION
+        or not set(snapshots.MMAP_TABLES) <= set(SNAP_META["tables"])):
+    publish_base_snapshot(REPUBLISH_AFTER)
+    SNAP_VERSION, SNAP_META = fresh_snapshot()
+if SNAP_VERSION:
+    st.sidebar.caption(f"Snapshot {SNAP_VERSION}")
+
+
+def from_snapshot(names, compute, snap=None):
+    """
+    Read `names` from the snapshot (`snap` = (version, meta), default the
+    one resolved for this run), else fall back to `compute()`.
+    """
+    version, meta = snap if snap is not None else (SNAP_VERSION, SNAP_META)
+    if version and all(n in meta["tables"] for n in names):
+        out = tuple(snapshot_table(SNAP_ROOT, version, n) for n in names)
+        return out if len(out) > 1 else out[0]
+    return compute()
+
+
+# ---------- shared base datasets (memory-mapped, shared across processes) ----------
+cash_df = from_snapshot(["cash"],      lambda: cash_with_live(USE_LIVE))
+idx_df  = from_snapshot(["index"],     lambda: index_with_live(USE_LIVE))
+fno_df  = from_snapshot(["fno_stock"], fno_stock_all)
+
+
+def oi_reference(snap=None):
+    """combined, prev_expiry, front_expiry, cash_latest_date from the OI table."""
+    version, meta = snap if snap is not None else (SNAP_VERSION, SNAP_META)
+    if version and "oi_combined" in meta["tables"]:
+        return (
+            snapshot_table(SNAP_ROOT, version, "oi_combined"),
+            pd.Timestamp(meta["prev_expiry"]),
+            meta["front_expiry"],
+            pd.Timestamp(meta["cash_latest_date"]),
+        )
+    return fno_oi_processing(fno_df, cash_df)
 
 
+def intraday_bars(timeframe: str = "1m"):
+    """Today's bars at `timeframe` (minute feed resampled): (cash_bars, index_bars, fut_bars)."""
+    available_syms = get_intraday_symbols()
+    front_fut, back_fut, far_fut = classify_futures(available_syms)
+    all_fut = front_fut + back_fut + far_fut
 
-cash_df = cash_with_live(USE_LIVE)
-idx_df  = index_with_live(USE_LIVE)
-fno_df  = fno_stock_all()
-ema_pct, nnhl = breadth_panels(cash_df)
+    cash_bars  = read_intraday([*get_constituents()["Symbol"].unique(),])
+    index_bars = read_intraday(INDEX_SYMBOLS)
+    fut_bars   = read_intraday(all_fut)
+    return (resample(cash_bars, timeframe, key="cash"),
+            resample(index_bars, timeframe, key="index"),
+            resample(fut_bars, timeframe, key="fut"))
 
 
 
 # ---------- Market Breadth tab ----------
-with tabs[0]:
+def breadth_tab():
+    from plots.breadth import ema_area_figure, nnhl_figure
+
     st.header(f"📊 Market Breadth — {TODAY_STR}")
 
-    breadth_df, pct_df = compute_adv_decl(cash_df)
+    ema_pct, nnhl = from_snapshot(["ema_pct", "nnhl"], lambda: breadth_panels(cash_df))
+    breadth_df, pct_df = from_snapshot(["breadth_df", "pct_df"], lambda: compute_adv_decl(cash_df))
     nifty_price_df = idx_df[idx_df["symbol"] == "NIFTY 50"][["date", "open", "high", "low", "close"]]
     start, end = breadth_df["date"].min(), breadth_df["date"].max()
     nifty_price_df = nifty_price_df[
@@ -103,41 +314,43 @@ with tabs[0]:
     ]
     todays_date = breadth_df['date'].iloc[-1].strftime('%Y-%m-%d')
     st.write(f'* Prices are for {todays_date}')
-    
-    
-    st.plotly_chart(ema_area_figure(ema_pct), use_container_width=True)
-    st.plotly_chart(nnhl_figure(nnhl),       use_container_width=True)
-    
-    
+
+
+    chart(ema_area_figure(ema_pct))
+    chart(nnhl_figure(nnhl))
+
+
     # st.plotly_chart(breadth_figure(breadth_df, pct_df, nifty_price_df),
     #             use_container_width=True)
-    
+
     # st.plotly_chart(advdec_figure(breadth_df, nifty_price_df),
     #                 use_container_width=True)
-    
+
     # after you already have cash_df
 
 
 
-    
-with tabs[1]:
+
+def oi_tab():
     st.header(f"📈 Open Interest Analysis — {TODAY_STR}")
-    
-    combined, prev_expiry, front_expiry, cash_latest_date = fno_oi_processing(fno_df, cash_df)
-    
+
+    combined, prev_expiry, front_expiry, cash_latest_date = oi_reference()
+
     st.write(f'* Prices are for {cash_latest_date.strftime("%Y-%m-%d")}')
-    
+
+    option_chain_section()
+
     top_winners = combined['price_change'].nlargest(10)
     top_losers = combined['price_change'].nsmallest(10)
-    
+
     top_winners = combined[combined['price_change'].isin(top_winners)]
     top_losers = combined[combined['price_change'].isin(top_losers)]
-    
+
     st.subheader('Top Winners of this Expiry')
     st.dataframe(top_winners.sort_values('price_change', ascending = False))
     st.subheader('Top Losers of this Expiry')
     st.dataframe(top_losers.sort_values('price_change'))
-    
+
     labels = [
     "OI Up / Price Up",
     "OI Up / Price Down",
@@ -150,37 +363,55 @@ with tabs[1]:
         'cash_close_prev', 'cash_close_latest', 'price_change',
         'combined_open_interest_prev', 'combined_open_interest_latest', 'oi_change', 'price_signal'
         ]].sort_values('price_change', ascending=False))
-        
-    
+
+
     labels = [
         'price_above_prev_expiry_high',
               'price_below_prev_expiry_low',
               'price_above_prev_expiry_close',
               'price_below_prev_expiry_close'
               ]
-    
+
     for label in labels:
         label_str = label.replace('_', ' ').replace('prev', 'previous').title()
         st.subheader(label_str)
         st.dataframe(combined[combined['price_signal']==label])
-    
+
+
+
+def option_chain_section():
+    st.subheader("Option chain – front expiry, all F&O names")
+    if SNAP_VERSION and "chain_summary" in SNAP_META["tables"]:
+        summary = from_snapshot(["chain_summary"], None)
+    elif USE_LIVE and st.button("Scan full chain (~1 min)", key="chain_scan"):
+        summary = chain_summary(chain_snapshot())
+    else:
+        st.caption("Published by `worker.py --live`; with live prices on, scan it here.")
+        return
+    st.caption("PCR = put / call OI. Walls = strikes with the most CE / PE OI.")
+    st.html(gradient_table(summary.drop(columns="Expiry"),
+                           {"PCR OI": "{:.2f}", "PCR Vol": "{:.2f}", "Max pain %": "{:+.1f}"},
+                           subset=["PCR OI", "Max pain %"]))
 
 
 # ----------------------------------------------------------------- Stock Explorer
 
-with tabs[2]:
+@st.fragment
+def stock_explorer_tab():
+    from plots.stock_explorer import stock_explorer_figure
+
     st.header(f"📉 Stock Explorer — {TODAY_STR}")
-    
+
     nifty500_syms = get_constituents()["Symbol"].unique().tolist()
-    
-    nifty_df = idx_df[idx_df['symbol']=='NIFTY 50']
+
+    nifty_df = idx_df[idx_df['symbol']=='NIFTY 50'].copy()
     nifty_df["date"]  = pd.to_datetime(nifty_df["date"])
-    
+
     latest_date = fno_df['date'].max()
     fno_syms = fno_df[fno_df['date']==latest_date]['symbol'].to_list()
 
     all_syms      = sorted(set(nifty500_syms) | set(fno_syms))
-        
+
     choice        = st.selectbox("Choose a stock", all_syms, index=all_syms.index("RELIANCE") if "RELIANCE" in all_syms else 0)
 
     # window slider (radio buttons)
@@ -188,52 +419,76 @@ with tabs[2]:
 
     win_map = {"1 M": 30, "3 M": 90, "6 M": 180, "12 M": 365, "All": 400}
     win_days = win_map[win_label]
-    
-    price_df, ind_df, rebased_stock, rebased_index, prev_close_price = stock_explorer_processing(cash_df, choice, fno_df, win_days, nifty_df, prev_expiry)
-   
+
+    prev_expiry = oi_reference()[1]
+    try:
+        price_df, ind_df, rebased_stock, rebased_index, prev_close_price = stock_explorer_processing(cash_df, choice, fno_df, win_days, nifty_df, prev_expiry)
+    except LookupError as e:
+        st.warning(str(e))
+        st.stop()
+
     # ----------- build Plotly figure ----------------------------------------
-    
-    st.plotly_chart(stock_explorer_figure(choice, price_df, ind_df, rebased_stock, rebased_index, prev_close_price, win_label), use_container_width=True)
-    
 
-with tabs[3]:
-    
+    chart(stock_explorer_figure(choice, price_df, ind_df, rebased_stock, rebased_index, prev_close_price, win_label))
+
+
+def sector_tab():
+
     ## Calculations
-    
+
     const_df = pd.read_csv("data/nifty_500_constituents.csv")
     const_df["Sector"] = const_df["Sector"].str.strip()
     sector_list = const_df["Sector"].sort_values().unique().tolist()
-    
-    
-    rel_official_df, official_table, official_syms = official_sector(idx_df)
-    
-    eq_sector_rel, eq_table = equal_weight_sector(cash_df, const_df, idx_df)
-    
-        
+
+
+    if SNAP_VERSION and "official_table" in SNAP_META["tables"]:
+        rel_official_df, official_table = from_snapshot(["rel_official_df", "official_table"], None)
+        official_syms = SNAP_META["official_syms"]
+    else:
+        rel_official_df, official_table, official_syms = official_sector(idx_df)
+
+    eq_sector_rel, eq_table = from_snapshot(["eq_sector_rel", "eq_table"],
+                                            lambda: equal_weight_sector(cash_df, const_df, idx_df))
+
+
     st.header(f"📊 Sectoral Analysis — {TODAY_STR}")
     st.subheader("Official Nifty Sector Indices vs Nifty (Relative)")
     st.write('*Prices are for ', rel_official_df.index[-1].strftime('%Y-%m-%d'))
-    st.dataframe(official_table.style.format("{:.1f}%").background_gradient(cmap="RdYlGn"))
+    st.html(gradient_table(official_table, "{:.1f}%"))
 
     st.subheader("Granular Equal-Weight Sector Indices vs Nifty (Relative)")
     st.write('*Prices are for ', eq_sector_rel.index[-1].strftime('%Y-%m-%d'))
-    st.dataframe(eq_table.style.format("{:.1f}%").background_gradient(cmap="RdYlGn"))
-        
+    st.html(gradient_table(eq_table, "{:.1f}%"))
+
+    sector_constituents_section(const_df, sector_list)
+    sector_timeseries_section(rel_official_df, eq_sector_rel, official_syms, sector_list)
+
+
+@st.fragment
+def sector_constituents_section(const_df, sector_list):
     # ───────────────────── Sector‑constituent returns ──────────────────────
     st.subheader("Sector Constituents – look‑back returns")
 
     dropdown_sectors = sector_list
     chosen_sector = st.selectbox("Choose a sector", dropdown_sectors, index=0)
 
-    tbl_const = constituent_returns(chosen_sector, cash_df, idx_df, const_df)
+    if SNAP_VERSION and "sector_constituents" in SNAP_META["tables"]:
+        all_const = from_snapshot(["sector_constituents"], None)
+        tbl_const = (all_const.xs(chosen_sector, level="Sector")
+                     if chosen_sector in all_const.index.get_level_values("Sector") else None)
+    else:
+        tbl_const = constituent_returns(chosen_sector, cash_df, idx_df, const_df)
 
     if tbl_const is None:
         st.info("Constituent mapping for official Nifty sector indices isn't linked yet.")
     else:
-        st.dataframe(
-            tbl_const.style.format("{:.1f}%").background_gradient(cmap="RdYlGn"),
-            height=min(400, 30 + 24 * len(tbl_const))
-        )
+        st.html(gradient_table(tbl_const, "{:.1f}%",
+                               height=min(400, 30 + 24 * len(tbl_const))))
+
+
+@st.fragment
+def sector_timeseries_section(rel_official_df, eq_sector_rel, official_syms, sector_list):
+    from plots.sector import sector_figure
 
     st.subheader("Relative Time-Series (select)")
         # 1️⃣  choose window
@@ -241,11 +496,11 @@ with tabs[3]:
         "Look‑back window",
         ["1 M", "3 M", "6 M", "12 M", "All"],
         horizontal=True,
-        index=3# default = 12 M
+        index=3# default = 12 M
     )
     win_map = {"1 M":30, "3 M":90, "6 M":180, "12 M":365, "All":None}
     days_back = win_map[win_label]
-    
+
     # 2️⃣  combined options list
     all_options = official_syms + sector_list
     default_sel = all_options[:3]   # show a few lines by default
@@ -253,50 +508,86 @@ with tabs[3]:
                             default=default_sel, max_selections=10)
     if not chosen:
         st.info("Choose at least one index / sector.")
-        st.stop()
-    
+        return
+
     # 3️⃣  build combined dataframe (relative already vs Nifty)
     combined_rel = pd.concat(
         [rel_official_df, eq_sector_rel], axis=1, join="inner"
     )
-    
+
     # 4️⃣  slice by date window
     if days_back:
-        date_cut = combined_rel.index.max() - pd.Timedelta(days=days_back)
+        date_cut = window_start(combined_rel.index.max(), days=days_back)
         combined_rel = combined_rel[combined_rel.index >= date_cut]
-    
+
     # 5️⃣  select & rebase to 100 at window start
     st.write(combined_rel)
     sel_df = combined_rel[chosen]
     rebased = (sel_df / sel_df.iloc[0]) * 100
-    
-    st.plotly_chart(sector_figure(rebased), use_container_width=True)
 
+    chart(sector_figure(rebased))
 
-with tabs[4]:
+
+def straddle_tab():
     st.header(f"🎯 Straddle Prices — {TODAY_STR}")
 
-    idx_tbl, stk_tbl = straddle_tables()
+    live_fragment("straddle", straddle_tables_section)
+    straddle_decay_section()
+    vol_section()
+
+    idx_tbl, stk_tbl = straddle_frames()
+    straddle_chart_section(idx_tbl.index.tolist() + stk_tbl.index.tolist())
+
+
+def straddle_frames(snap=None):
+    return from_snapshot(["straddle_idx", "straddle_stk"], lambda: straddle_tables(USE_LIVE),
+                         snap)
+
+
+def straddle_tables_section(snap=None):
+    idx_tbl, stk_tbl = straddle_frames(snap)
 
     st.subheader("Index Straddles – last 5 sessions")
-    st.dataframe(
-        idx_tbl.style.format("{:.2f}")
-                 .background_gradient(cmap="RdYlGn", subset=list(idx_tbl.columns).remove('Straddle'))
-    )
+    st.html(gradient_table(idx_tbl, "{:.2f}", subset=idx_tbl.columns.drop("Straddle")))
 
     st.subheader("Stock Straddles – last 5 sessions")
-    st.dataframe(
-        stk_tbl.style.format("{:.2f}")
-                 .background_gradient(cmap="RdYlGn", subset=list(stk_tbl.columns).remove('Straddle'))
-    )
+    st.html(gradient_table(stk_tbl, "{:.2f}", subset=stk_tbl.columns.drop("Straddle")))
+
+
+def straddle_decay_section():
+    decay = from_snapshot(["straddle_decay"],
+                          lambda: decay_vs_history(straddle_panel(fno_df, fno_index_all())))
+    st.subheader("Decay vs past expiries – same days to expiry")
+    st.caption("Median of each symbol's past expiries at today's DTE. "
+               "Decay = straddle / its first price in the expiry.")
+    st.html(gradient_table(decay.drop(columns="Expiry"),
+                           {"DTE": "{:.0f}", "Past expiries": "{:.0f}"},
+                           subset=["Decay vs hist %", "IV vs hist"]))
+
+
+@st.fragment
+def vol_section():
+    st.subheader("Implied vs realized volatility")
+    estimator = st.selectbox("Realized vol estimator", ESTIMATORS, format_func=str.upper,
+                             key="vol_estimator")
+    compute = lambda: vol_screen(vol_panels(cash_df, idx_df, fno_df, fno_index_all()), estimator)
+    screen = from_snapshot(["vol_screen"], compute) if estimator == "cc" else compute()
+    st.caption(f"Front ATM straddle IV against {estimator.upper()} realized vol (20 sessions, "
+               "annualised %). Percentiles rank today within the last year (100 = richest).")
+    st.html(gradient_table(screen, {"IV/RV": "{:.2f}", "Spread pct": "{:.0f}", "IV pct": "{:.0f}"},
+                           subset=["IV − RV", "Spread pct", "IV pct"]))
+
+
+@st.fragment
+def straddle_chart_section(symbols_dropdown):
+    from plots.straddle import straddle_figure
 
         # ── Interactive time‑series plot ──────────────────────────────────
     st.subheader("Straddle Price + Cash Candles")
 
-    symbols_dropdown = idx_tbl.index.tolist() + stk_tbl.index.tolist()
     chosen_sym = st.selectbox("Choose straddle symbol", symbols_dropdown, index=0)
 
-    ts_df = straddle_timeseries(chosen_sym)
+    ts_df = straddle_timeseries(chosen_sym, USE_LIVE)
     if ts_df.empty:
         st.info("No straddle data for this symbol / expiry.")
     else:
@@ -305,106 +596,101 @@ with tabs[4]:
             ts_df["date"].min(),
             ts_df["date"].max(),
             cash_df,
-            idx_df
+            idx_df,
+            use_live=USE_LIVE,
             )
-        
-        st.plotly_chart(
-            straddle_figure(ts_df, price_df, f"{chosen_sym} — Current Expiry"),
-            use_container_width=True
-        )
-        
+
+        chart(straddle_figure(ts_df, price_df, f"{chosen_sym} — Current Expiry"))
+
 
 
 # ─────────────────── Intraday tab ───────────────────────────────
-with tabs[5]:
+def intraday_tab():
     st.header(f"⏱️ Intraday – {TODAY_STR}")
     st.markdown(f"**Last live update:** {st.session_state['last_update'].strftime('%H:%M:%S')}")
 
-    available_syms = get_intraday_symbols()
-        
-    front_fut, back_fut, far_fut = classify_futures(available_syms)
-    all_fut = front_fut + back_fut + far_fut
+    timeframe = st.radio("Bar size", list(TIMEFRAMES), horizontal=True, key="intraday_tf")
+    live_fragment("intraday", intraday_panel, timeframe)
+
+
+def intraday_panel(timeframe="1m", snap=None):
+    import plotly.graph_objects as go
+    from plots.downsample import line
 
-    index_symbols = INDEX_SYMBOLS
-    
     # 1️⃣  fetch bars ---------------------------------------------------------
-    syms_needed = ["NIFTY 50", "NIFTY"]          # spot + fut for basis
-    cash_bars   = read_intraday([*get_constituents()["Symbol"].unique(),])
-    index_bars = read_intraday(index_symbols)
-    fut_bars = read_intraday(all_fut)
+    cash_bars, index_bars, fut_bars = intraday_bars(timeframe)
 
     nifty_bars  = index_bars[index_bars["symbol"] == "NIFTY 50"]
 
-    
+    combined = oi_reference(snap)[0]
+
     if USE_LIVE:
         # live_bars = cash_bars from earlier;  combined = the reference table
         breakout_close_df, breakout_high_df, breakdown_close_df, breakdown_low_df = scan_prev_expiry_cross(
         reference = combined,      # the same combined table
         live_bars = cash_bars      # today’s minute data
     )
-      
-        
+
+
     else:
-        
+
         breakout_close_df, breakout_high_df, breakdown_close_df, breakdown_low_df = scan_prev_expiry_cross(
         reference = combined,      # live_bars=None → EOD mode
     )
-        
-            
+
+
     cols = ["now_price", "prev_expiry_high", "prev_expiry_close"]
-        
+
     st.subheader("🔔 Intraday Break-outs (prev-expiry levels)")
     st.write('Price Crossing Above Previous Expiry Highest Close')
     st.write(breakout_high_df.index)
     st.write(breakout_high_df[cols])
     st.write('Price Crossing Above Previous Expiry Close')
-    st.write(breakout_close_df[cols]) 
+    st.write(breakout_close_df[cols])
     st.write('Price Crossing Below Previous Expiry Close')
     st.write(breakdown_close_df[cols])
     st.write('Price Crossing Below Previous Expiry Lowest Close')
     st.write(breakdown_low_df[cols])
 
+    custom_scans_section(combined, cash_bars, fut_bars)
+
 
     # ------------------------------------------------------------------
     # 3️⃣  Intraday Advance / Decline  vs  Nifty spot
     # ------------------------------------------------------------------
-    
+
     # ---- 3.1  yesterday’s closes -------------------------------------
     if USE_LIVE:
-        prev_eod_date = cash_df["date"].iloc[:-1].max()   # cash_df is your 400-day EOD frame
+        prev_eod_date = previous_session(TODAY)           # cash_df is your 400-day EOD frame
     else:
         prev_eod_date = cash_df["date"].max()
     prev_closes = (
         cash_df[cash_df["date"] == prev_eod_date]
         .set_index("symbol")["close"]
     )
-    
+
     # keep only symbols that also appear in today’s minute feed
     cash_bars = cash_bars[cash_bars["symbol"].isin(prev_closes.index)]
-    cash_bars["prev_close"] = cash_bars["symbol"].map(prev_closes)
-    
-    # ---- 3.2  classify each minute -----------------------------------
-    cash_bars["dir"] = cash_bars["close"] - cash_bars["prev_close"]  # +, 0, −
-    
-    adv = (
-        cash_bars.groupby("datetime")["dir"]
-                 .apply(lambda s: (s > 0).sum())
-    )
-    dec = (
-        cash_bars.groupby("datetime")["dir"]
-                 .apply(lambda s: (s < 0).sum())
-    )
-    ad_ratio = (adv - dec).rename("A/D").reset_index()
-    
+
+    # ---- 3.2  breadth per universe (core/intraday_breadth.py) -------
+    const = get_constituents()
+    universes = {"Nifty 500": const["Symbol"].tolist(), "F&O": combined.index.tolist(),
+                 **const.groupby("Industry")["Symbol"].agg(list).to_dict()}
+    breadth = intraday_breadth(cash_bars, prev_closes, universes,
+                               ref_close=combined["prev_expiry_close"],
+                               key=f"cash-{timeframe}")
+    intraday_breadth_section(breadth)
+    ad_ratio = breadth["Nifty 500"]["A-D"].rename("A/D").reset_index()
+
     # ---- 3.3  plot ---------------------------------------------------
     fig2 = go.Figure()
     fig2.add_trace(
-        go.Scatter(x=ad_ratio["datetime"], y=ad_ratio["A/D"],
-                   name="Advance-Decline", yaxis="y1")
+        line(ad_ratio["datetime"], ad_ratio["A/D"],
+             name="Advance-Decline", yaxis="y1")
     )
     fig2.add_trace(
-        go.Scatter(x=nifty_bars["datetime"], y=nifty_bars["close"],
-                   name="Nifty spot", yaxis="y2", line=dict(dash="dot"))
+        line(nifty_bars["datetime"], nifty_bars["close"],
+             name="Nifty spot", yaxis="y2", line=dict(dash="dot"))
     )
     fig2.update_layout(
         title="Intraday A/D vs Nifty (vs yesterday’s close)",
@@ -412,65 +698,110 @@ with tabs[5]:
         yaxis2=dict(title="Nifty", overlaying="y", side="right"),
         height=300, legend=dict(orientation="h")
     )
-    st.plotly_chart(fig2, use_container_width=True)
-    
+    chart(fig2)
+
     # 4️⃣  Basis chart --------------------------------------------------------
-  
 
-# ---- 4.1  pick a future symbol ------------------------------------
-    all_futs = sorted(fut_bars["symbol"].unique())          # e.g.  RELIANCE25JUNFUT
+
+# ---- 4.1  basis for every future in one pass -----------------------
+    spot_bars = pd.concat([cash_bars[["datetime", "symbol", "close"]],
+                           index_bars[["datetime", "symbol", "close"]]])
+    basis_pts, basis_pct = intraday_basis_matrix(fut_bars, spot_bars)
+
+    spikes = basis_spikes(basis_pct)
+    if not spikes.empty:
+        st.subheader(f"⚡ Basis spikes (latest {timeframe} bar vs last 30)")
+        st.html(gradient_table(spikes, "{:.2f}", subset=["zscore"]))
+
+    intraday_basis_section(basis_pts, spot_bars)
+
+
+@st.fragment
+def intraday_breadth_section(breadth):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    from plots.downsample import line
+
+    latest = pd.DataFrame({u: f.iloc[-1] for u, f in breadth.items() if not f.empty}).T
+    st.subheader("📶 Intraday breadth by universe")
+    st.html(gradient_table(latest, {"% > VWAP": "{:.0f}", "% > prev expiry": "{:.0f}"},
+                           subset=["A-D", "% > VWAP", "% > prev expiry", "Cum tick"],
+                           height=300))
+
+    universe = st.selectbox("Universe", list(breadth), key="breadth_universe")
+    panel = breadth[universe]
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05)
+    for col in ["% > VWAP", "% > prev expiry"]:
+        fig.add_trace(line(panel.index, panel[col], name=col), row=1, col=1)
+    fig.add_trace(line(panel.index, panel["Cum tick"], name="Cum tick"), row=2, col=1)
+    fig.update_layout(height=420, legend=dict(orientation="h"),
+                      title=f"{universe}: participation and cumulative tick")
+    chart(fig)
+
+
+@st.fragment
+def custom_scans_section(combined, cash_bars, fut_bars):
+    # ---- custom scans: one "name: rule" per line ---------------------
+    with st.expander("Custom scans"):
+        rule_text = st.text_area(
+            "Rules (e.g. `hot: now_price > prev_expiry_high AND oi_change > 10`)",
+            value="oi_breakout: now_price > prev_expiry_high AND oi_change > 10",
+        )
+        rules = dict(
+            (name.strip(), expr.strip())
+            for name, expr in (ln.split(":", 1) for ln in rule_text.splitlines() if ":" in ln)
+        )
+        if rules:
+            try:
+                scan_hits = run_scans(
+                    rules, combined,
+                    live_bars=cash_bars if USE_LIVE else None,
+                    basis_tbl=current_basis_table(cash_df, idx_df, fut_bars),
+                )
+            except (ValueError, KeyError) as e:
+                st.warning(f"Scan error: {e}")
+            else:
+                st.dataframe(scan_hits.sum().rename("hits"))
+                for name in rules:
+                    st.write(name, scan_hits.index[scan_hits[name]].tolist())
+
+
+@st.fragment
+def intraday_basis_section(basis_pts, spot_bars):
+    import plotly.graph_objects as go
+    from plots.downsample import line
+
+# ---- 4.2  pick a future symbol ------------------------------------
+    all_futs = basis_pts.columns.tolist()          # e.g.  RELIANCE25JUNFUT
+    if not all_futs:
+        st.warning("No intraday data for that selection yet.")
+        return
     sel_fut  = st.selectbox("Choose a future", all_futs, index=0)
 
-# ---- 4.2  derive the spot/underlying symbol -----------------------
-    def underlying(sym_fut: str) -> str:
-        """
-        Strip the YYMONFUT suffix, then map index aliases to cash symbol.
-        """
-        base = re.sub(r"\d{2}[A-Z]{3}FUT$", "", sym_fut)   # RELIANCE, NIFTY,…
-    
-        index_map = {
-            "NIFTY": "NIFTY 50",
-            "BANKNIFTY": "NIFTY BANK",
-            "FINNIFTY": "NIFTY FIN SERVICE",
-        }
-        return index_map.get(base, base)                  # stocks stay unchanged
-
-    spot_sym = underlying(sel_fut)
-
-# ---- 4.3  slice todays minute bars -------------------------------
-    fut_sel  = fut_bars[fut_bars["symbol"] == sel_fut]
-    spot_sel = (index_bars if spot_sym in index_symbols else cash_bars)
-    spot_sel = spot_sel[spot_sel["symbol"] == spot_sym]
-    
-    if fut_sel.empty or spot_sel.empty:
+    und      = futures_underlying(all_futs)[sel_fut]
+    spot_sym = INDEX_SPOT.get(und, und)
+
+# ---- 4.3  column lookup --------------------------------------------
+    basis_sel = basis_pts[sel_fut].dropna()
+    spot_sel  = spot_bars[spot_bars["symbol"] == spot_sym].sort_values("datetime")
+
+    if basis_sel.empty or spot_sel.empty:
         st.warning("No intraday data for that selection yet.")
-        st.stop()
-    
-    # Align on common timestamps
-    merged = pd.merge(
-        fut_sel[["datetime", "close"]],
-        spot_sel[["datetime", "close"]],
-        on="datetime", how="inner", suffixes=("_fut", "_spot")
-    )
-    merged["basis"] = merged["close_fut"] - merged["close_spot"]
+        return
 
     # ---- 4.4  plot basis (y1) + spot price (y2) ----------------------
     fig3 = go.Figure()
-    
+
+    # min/max buckets keep the basis spikes visible after thinning
     fig3.add_trace(
-        go.Scatter(
-            x=merged["datetime"], y=merged["basis"],
-            mode="lines", name=f"{sel_fut} basis", yaxis="y1"
-        )
+        line(basis_sel.index, basis_sel.values, method="minmax",
+             name=f"{sel_fut} basis", yaxis="y1")
     )
     fig3.add_trace(
-        go.Scatter(
-            x=merged["datetime"], y=merged["close_spot"],
-            mode="lines", line=dict(dash="dot"),
-            name=f"{spot_sym} spot", yaxis="y2"
-        )
+        line(spot_sel["datetime"], spot_sel["close"],
+             line=dict(dash="dot"), name=f"{spot_sym} spot", yaxis="y2")
     )
-    
+
     fig3.update_layout(
         title=f"Intraday Basis – {sel_fut} vs {spot_sym}",
         yaxis=dict(title="Basis (₹)"),
@@ -479,37 +810,83 @@ with tabs[5]:
         legend=dict(orientation="h"),
         margin=dict(t=40, b=20, l=20, r=20),
     )
-    
-    st.plotly_chart(fig3, use_container_width=True)
-    
-    
+
+    chart(fig3)
+
+
 
 # ────────────── Backwardation tab ─────────────────────────
-with tabs[6]:
+def basis_tab():
     st.header("📉 Futures Backwardation Screener")
 
+    live_fragment("basis", basis_table_section)
+
+    daily_basis_section(live_basis_table().index.tolist())
+
+
+def live_basis_table():
     # live dataframes you already have
     spot_df = cash_df       # includes live candle when toggle on
-    idx_df  = idx_df        # live via index_with_live
-    fut_df  = fut_bars      # intraday future minute bars we pulled earlier
+    fut_df  = intraday_bars()[2]      # intraday future minute bars
+    return current_basis_table(spot_df, idx_df, fut_df)
+
+
+def basis_table_section(snap=None):
+    basis_tbl = live_basis_table()
+    st.html(gradient_table(basis_tbl, "{:.2f}", subset=["front_pct", "back_pct", "far_pct"]))
+
+
+@st.fragment
+def daily_basis_section(basis_syms):
+    from plots.basis import basis_daily_figure
 
-    basis_tbl = current_basis_table(spot_df, idx_df, fut_df)
-    st.dataframe(
-        basis_tbl.style.format("{:.2f}").background_gradient(cmap="RdYlGn", axis=0, subset = ['front_pct', 'back_pct', 'far_pct']),
-        height=400
-    )
-    
-        
-    sel = st.selectbox("Plot daily series", basis_tbl.index.tolist(), index=0)
-    
     cash_eod = cash_df.drop_duplicates(subset=["symbol","date"])
-    price_df, basis_df = daily_basis_series(
-        sel, cash_eod, idx_df, fno_df      # fno_df is your daily F&O snapshot
-    )
-    
+    if SNAP_VERSION and "basis_panel" in SNAP_META:
+        fields = SNAP_META["basis_panel"]
+        basis_panel = dict(zip(fields, from_snapshot([f"basis_{f}" for f in fields], None)))
+    else:
+        basis_panel = daily_basis_panel(cash_eod, idx_df, fno_df)   # fno_df is your daily F&O snapshot
+
+    bw_cut = st.slider("Backwardation below (front basis %)", -3.0, 0.0, -0.5, 0.1)
+    st.subheader("Stocks in backwardation (latest EOD)")
+    st.dataframe(basis_screen(basis_panel, below=bw_cut).round(2))
+
+    sel = st.selectbox("Plot daily series", basis_syms, index=0)
+
+    price_df, basis_df = daily_basis_series(sel, cash_eod, idx_df, fno_df, panel=basis_panel)
+
     if price_df.empty or basis_df.empty:
         st.info("No data for that window.")
     else:
         st.write(basis_df)
-        st.plotly_chart(basis_daily_figure(sel, price_df, basis_df),
-                        use_container_width=True)
\ No newline at end of file
+        chart(basis_daily_figure(sel, price_df, basis_df))
+
+
+TAB_RENDERERS = dict(zip(TAB_NAMES, [
+    breadth_tab,
+    oi_tab,
+    stock_explorer_tab,
+    sector_tab,
+    straddle_tab,
+    intraday_tab,
+    basis_tab,
+]))
+
+with perf.span(f"tab:{active_tab}"):
+    TAB_RENDERERS[active_tab]()
+
+
+# ---------- admin: instrumentation for this rerun ----------
+perf.finish()
+if PERF_PANEL:
+    with st.sidebar.expander("🛠️ Perf – this rerun", expanded=True):
+        summary = perf.run_summary(RUN)
+        st.caption(
+            f"{summary['calls']} calls · {summary['ms']:,.0f} ms top-level · "
+            f"{summary['bytes'] / 1024**2:,.1f} MB fetched · "
+            f"{summary['kite_calls']} Kite calls · "
+            f"{summary['cache_hits']} hits / {summary['cache_miss']} misses"
+        )
+        st.dataframe(perf.events_frame(RUN), hide_index=True)
+        st.caption("Fragment reruns are not included; they log to the `perf` logger.")
+        st.dataframe(cache_stats())
@@ -23,7 +23,25 @@ DB_CONFIG = {
 
 CACHE_SQL_TTL  = "6h"   # long cache for SQL API pulls
 CACHE_LIVE_TTL = 900    # 15 min cache for live calls
-CACHE_INTRADAY_LIVE_TTL = 60
+CACHE_INTRADAY_LIVE_TTL = 30   # = the intraday / basis auto-refresh below
+
+# on-disk tier of core/cache.py (survives restarts)
+CACHE_DIR            = "data/cache"
+DISK_CACHE_MAX_BYTES = 2 * 1024**3
+
+# snapshots published by worker.py (see core/snapshots.py)
+SNAPSHOT_DIR     = "data/snapshots"
+SNAPSHOT_KEEP    = 3          # versions kept on disk
+SNAPSHOT_MAX_AGE = "30min"    # older snapshots are ignored → compute in-session
+EOD_SNAPSHOT_MAX_AGE = "20h"  # nightly build (worker.py --nightly) lasts the day
+
+# fragment auto-refresh intervals (seconds) for the live panels; the
+# caches behind each panel expire on the same clock (shared by all viewers)
+AUTO_REFRESH_SECS = {
+    "intraday": 30,
+    "basis":    30,
+    "straddle": 60,
+}
 
 
 INDEX_SYMBOLS = ['NIFTY FIN SERVICE',
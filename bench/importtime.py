@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:05:00 2026
+
+@author: varun
+"""
+
+# bench/importtime.py
+#
+# Cold-import benchmark built on `python -X importtime`.
+#
+#   python -m bench.importtime                   # default module set
+#   python -m bench.importtime core.fetch --top 20
+#
+# Each module is imported in a fresh interpreter `--repeat` times; the best
+# total is reported with the heaviest imports it pulled in (by self time),
+# so a new import-time side effect or an eager heavy dependency shows up
+# as a line here.
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "core.fetch",
+    "core.fno_utils",
+    "core.preprocess",
+    "core.straddles",
+    "core.live_zerodha",
+    "core.basis_screener",
+    "worker",
+]
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module: str) -> list[tuple[str, int, int, int]]:
+    """[(name, self_us, cumulative_us, depth)] for one cold import of `module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO, capture_output=True, text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return rows
+
+
+def report(module: str, repeat: int, top: int) -> float:
+    runs = [import_profile(module) for _ in range(repeat)]
+    best = min(runs, key=lambda rows: rows[-1][2])
+    total_ms = best[-1][2] / 1000
+
+    print(f"\n{module}: {total_ms:,.0f} ms  ({len(best)} modules)")
+    for name, self_us, cum_us, _ in sorted(best, key=lambda r: r[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f} ms self  {cum_us / 1000:8.1f} ms cum  {name}")
+    return total_ms
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Cold import time per module (python -X importtime)")
+    ap.add_argument("modules", nargs="*", default=MODULES)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--top", type=int, default=8, help="heaviest imports to list")
+    args = ap.parse_args()
+
+    totals = {m: report(m, args.repeat, args.top) for m in args.modules}
+    print("\nsummary")
+    for m, ms in totals.items():
+        print(f"  {m:<24} {ms:8,.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:40:00 2026
+
+@author: varun
+"""
+
+# bench/run.py
+#
+# Offline benchmark of the core pipeline on synthetic data (bench/synthetic.py).
+#
+#   python -m bench.run                          # 500 / 2000 / 5000 symbols
+#   python -m bench.run --symbols 500 --repeat 5
+#   python -m bench.run --save-baseline          # record outputs before a change
+#   python -m bench.run                          # ...then compare after it
+#
+# Functions run uncached (the @traced / @cached layers are unwrapped) and
+# each output is compared against the saved baseline for the same size and
+# seed: "ok" = unchanged (floats to rtol 1e-9), "CHANGED" = fix it or
+# re-baseline deliberately.  Exit status is 1 when any output changed.
+import argparse
+import inspect
+import json
+import os
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+
+from bench.synthetic import synthetic_market, write_workdir   # noqa: E402
+
+BASELINE_DIR = REPO / "bench" / ".baseline"
+
+CASES = [
+    "breadth_panels",
+    "compute_adv_decl",
+    "equal_weight_sector",
+    "official_sector",
+    "fno_oi_processing",
+    "straddle_tables",
+    "current_basis_table",
+    "scan_prev_expiry_cross",
+    "resample_bars",
+]
+
+
+def _load_core():
+    """Import the pipeline (after chdir into the synthetic workdir)."""
+    from core import preprocess, straddles, basis_screener, live_scanner, resample
+    return {
+        "breadth_panels":         inspect.unwrap(preprocess.breadth_panels),
+        "compute_adv_decl":       inspect.unwrap(preprocess.compute_adv_decl),
+        "equal_weight_sector":    inspect.unwrap(preprocess.equal_weight_sector),
+        "official_sector":        inspect.unwrap(preprocess.official_sector),
+        "fno_oi_processing":      inspect.unwrap(preprocess.fno_oi_processing),
+        "straddle_tables":        inspect.unwrap(straddles.straddle_tables),
+        "current_basis_table":    inspect.unwrap(basis_screener.current_basis_table),
+        "scan_prev_expiry_cross": live_scanner.scan_prev_expiry_cross,
+        "resample_bars":          resample.aggregate,
+    }, straddles
+
+
+def _calls(fns: dict, mkt: dict) -> dict:
+    """Case name → zero-arg callable over the synthetic frames."""
+    reference = fns["fno_oi_processing"](mkt["fno_stock"], mkt["cash"])[0]
+    return {
+        "breadth_panels":      lambda: fns["breadth_panels"](mkt["cash"]),
+        "compute_adv_decl":    lambda: fns["compute_adv_decl"](mkt["cash"]),
+        "equal_weight_sector": lambda: fns["equal_weight_sector"](mkt["cash"], mkt["const"],
+                                                                  mkt["index"]),
+        "official_sector":     lambda: fns["official_sector"](mkt["index"]),
+        "fno_oi_processing":   lambda: fns["fno_oi_processing"](mkt["fno_stock"], mkt["cash"]),
+        "straddle_tables":     lambda: fns["straddle_tables"](),
+        "current_basis_table": lambda: fns["current_basis_table"](mkt["cash"], mkt["index"],
+                                                                  mkt["fut_bars"]),
+        "scan_prev_expiry_cross": lambda: fns["scan_prev_expiry_cross"](
+            reference, live_bars=mkt["cash_bars"]),
+        "resample_bars":       lambda: [fns["resample_bars"](mkt[b], m)
+                                        for b in ("cash_bars", "fut_bars") for m in (5, 15, 60)],
+    }
+
+
+# ─── output comparison ──────────────────────────────────────────────────────
+def same(a, b) -> bool:
+    """Recursive equality for pipeline outputs (frames compared to rtol 1e-9)."""
+    if isinstance(a, pd.DataFrame) or isinstance(a, pd.Series):
+        if type(a) is not type(b):
+            return False
+        check = pd.testing.assert_frame_equal if isinstance(a, pd.DataFrame) \
+            else pd.testing.assert_series_equal
+        try:
+            check(a, b, rtol=1e-9)
+        except AssertionError:
+            return False
+        return True
+    if isinstance(a, (list, tuple)):
+        return (isinstance(b, (list, tuple)) and len(a) == len(b)
+                and all(same(x, y) for x, y in zip(a, b)))
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    try:
+        if pd.isna(a) and pd.isna(b):
+            return True
+    except (TypeError, ValueError):
+        pass
+    return bool(a == b)
+
+
+def _baseline_path(name: str, n: int, seed: int) -> Path:
+    return BASELINE_DIR / f"{name}-{n}-s{seed}.pkl"
+
+
+def check_output(name: str, n: int, seed: int, out, save: bool) -> str:
+    path = _baseline_path(name, n, seed)
+    if save:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(pickle.dumps(out, protocol=pickle.HIGHEST_PROTOCOL))
+        return "saved"
+    if not path.exists():
+        return "no baseline"
+    return "ok" if same(pickle.loads(path.read_bytes()), out) else "CHANGED"
+
+
+# ─── runner ─────────────────────────────────────────────────────────────────
+def bench_size(n: int, years: float, seed: int, repeat: int, only: list[str],
+               save: bool) -> list[dict]:
+    t0 = time.perf_counter()
+    mkt = synthetic_market(n, years=years, seed=seed)
+    gen_s = time.perf_counter() - t0
+
+    workdir = write_workdir(tempfile.mkdtemp(prefix=f"bench{n}-"), mkt)
+    os.chdir(workdir)
+    for mod in [m for m in sys.modules if m.startswith(("core.", "utils."))]:
+        del sys.modules[mod]                     # re-read the synthetic master
+
+    fns, straddles = _load_core()
+    # straddle_tables pulls its inputs itself – point it at the synthetic frames
+    straddles.fno_stock_all = lambda: mkt["fno_stock"]
+    straddles.fno_index_all = lambda: mkt["fno_index"]
+
+    calls = _calls(fns, mkt)
+    print(f"\n{n:,} symbols · {len(mkt['cash']):,} cash rows · "
+          f"{len(mkt['fut_bars']):,} futures bars · generated in {gen_s:.1f}s")
+
+    results = []
+    for name in only:
+        times, out = [], None
+        for _ in range(repeat):
+            s = time.perf_counter()
+            out = calls[name]()
+            times.append((time.perf_counter() - s) * 1000)
+        res = {
+            "function": name,
+            "symbols":  n,
+            "best_ms":  round(min(times), 1),
+            "median_ms": round(statistics.median(times), 1),
+            "output":   check_output(name, n, seed, out, save),
+        }
+        results.append(res)
+        print(f"  {name:<24} {res['best_ms']:>10,.1f} ms  "
+              f"(median {res['median_ms']:,.1f})  {res['output']}")
+    return results
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark core pipeline functions on synthetic data")
+    ap.add_argument("--symbols", type=int, nargs="+", default=[500, 2000, 5000])
+    ap.add_argument("--years", type=float, default=2)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--only", nargs="+", choices=CASES, default=CASES)
+    ap.add_argument("--save-baseline", action="store_true",
+                    help="store outputs as the reference for later runs")
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args()
+    out_json = Path(args.json).resolve() if args.json else None   # before chdir
+
+    results = []
+    for n in args.symbols:
+        results += bench_size(n, args.years, args.seed, args.repeat, args.only,
+                              args.save_baseline)
+
+    if out_json:
+        out_json.write_text(json.dumps(results, indent=1))
+
+    changed = [r for r in results if r["output"] == "CHANGED"]
+    for r in changed:
+        print(f"output changed: {r['function']} @ {r['symbols']} symbols")
+    return 1 if changed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:10:00 2026
+
+@author: varun
+"""
+
+# bench/synthetic.py
+#
+# Synthetic market data shaped like the API / Kite payloads, so every core
+# pipeline function can run offline.  Frames come out exactly as the fetch
+# layer returns them (parsed dates, IVs already scaled to %).
+#
+#   mkt = synthetic_market(n_symbols=2000, years=2, seed=0)
+#   mkt["cash"], mkt["index"], mkt["fno_stock"], mkt["fno_index"],
+#   mkt["const"], mkt["instruments"], mkt["cash_bars"], mkt["fut_bars"]
+#
+# EOD history ends on a fixed date so results are reproducible; futures
+# expiries are placed relative to *today* because the basis code ranks
+# contracts against the real calendar.
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app_config import INDEX_SYMBOLS
+
+END_DATE = pd.Timestamp("2026-10-16")
+
+SECTORS = [
+    "Banks", "IT Services", "Pharmaceuticals", "Automobiles", "FMCG",
+    "Metals & Mining", "Oil & Gas", "Power", "Realty", "Capital Goods",
+    "Chemicals", "Cement", "Telecom", "Media", "Insurance",
+    "Wealth Management", "Textiles", "Healthcare", "Consumer Durables",
+    "Logistics",
+]
+
+INDEX_FUTURES = ["NIFTY", "BANKNIFTY", "FINNIFTY"]
+
+FNO_FRACTION = 0.4          # share of the universe with listed futures
+MINUTES      = 375          # 09:15 – 15:30
+
+
+# ─── building blocks ────────────────────────────────────────────────────────
+def trading_days(years: float, end: pd.Timestamp = END_DATE) -> pd.DatetimeIndex:
+    start = end - pd.DateOffset(days=int(365 * years))
+    return pd.bdate_range(start, end)
+
+
+def monthly_expiries(start: pd.Timestamp, end: pd.Timestamp) -> pd.DatetimeIndex:
+    """Last Thursday of every month between `start` and `end` (+ one more)."""
+    months = pd.date_range(start.to_period("M").to_timestamp(),
+                           end + pd.DateOffset(months=2), freq="MS")
+    last_day = months + pd.offsets.MonthEnd(0)
+    return pd.DatetimeIndex(last_day - pd.to_timedelta((last_day.weekday - 3) % 7, "D"))
+
+
+def _next_expiry(dates: pd.DatetimeIndex, expiries: pd.DatetimeIndex) -> np.ndarray:
+    return expiries.to_numpy()[np.searchsorted(expiries.to_numpy(), dates.to_numpy())]
+
+
+def _walk(rng, n_days: int, n_syms: int, start, vol: float = 0.02) -> np.ndarray:
+    """Geometric random walk, days × symbols."""
+    rets = rng.normal(0.0003, vol, size=(n_days, n_syms))
+    return np.asarray(start) * np.exp(np.cumsum(rets, axis=0))
+
+
+def _long(values: dict[str, np.ndarray], dates, symbols) -> pd.DataFrame:
+    """days × symbols arrays → long frame (symbol, date, <cols>) sorted by date."""
+    n_days, n_syms = len(dates), len(symbols)
+    df = pd.DataFrame({
+        "symbol": np.tile(np.asarray(symbols, dtype=object), n_days),
+        "date":   np.repeat(np.asarray(dates), n_syms),
+    })
+    for col, arr in values.items():
+        df[col] = arr.ravel()
+    df["symbol"] = df["symbol"].astype(str)
+    return df
+
+
+def _ohlc(rng, close: np.ndarray) -> dict[str, np.ndarray]:
+    spread = np.abs(rng.normal(0, 0.01, size=close.shape))
+    open_  = close * (1 + rng.normal(0, 0.005, size=close.shape))
+    high   = np.maximum(open_, close) * (1 + spread)
+    low    = np.minimum(open_, close) * (1 - spread)
+    return {"open": open_, "high": high, "low": low, "close": close}
+
+
+# ─── frames ─────────────────────────────────────────────────────────────────
+def universe(n_symbols: int) -> pd.DataFrame:
+    """Constituents table (Symbol, Industry, Sector) like nifty_500_constituents.csv."""
+    syms = [f"SYM{i:05d}" for i in range(n_symbols)]
+    sectors = [SECTORS[i % len(SECTORS)] for i in range(n_symbols)]
+    return pd.DataFrame({"Symbol": syms, "Industry": sectors, "Sector": sectors})
+
+
+def cash_frame(rng, symbols: list[str], dates) -> pd.DataFrame:
+    close = _walk(rng, len(dates), len(symbols), rng.uniform(50, 5000, len(symbols)))
+    cols = _ohlc(rng, close)
+    cols["volume"]    = rng.integers(10_000, 5_000_000, size=close.shape).astype(float)
+    cols["deliv_pct"] = rng.uniform(10, 90, size=close.shape)
+    return _long(cols, dates, symbols)
+
+
+def index_frame(rng, dates) -> pd.DataFrame:
+    close = _walk(rng, len(dates), len(INDEX_SYMBOLS),
+                  rng.uniform(5_000, 50_000, len(INDEX_SYMBOLS)), vol=0.01)
+    return _long(_ohlc(rng, close), dates, INDEX_SYMBOLS)
+
+
+def fno_stock_frame(rng, cash: pd.DataFrame, fno_syms: list[str]) -> pd.DataFrame:
+    """Daily F&O stock rows: OI, front/back futures, ATM straddle price + IV."""
+    df = cash[cash["symbol"].isin(fno_syms)][["symbol", "date", "close"]].copy()
+    dates = pd.DatetimeIndex(df["date"])
+    expiries = monthly_expiries(dates.min(), dates.max())
+
+    front = _next_expiry(dates, expiries)
+    back  = expiries.to_numpy()[np.searchsorted(expiries.to_numpy(), front) + 1]
+    dte   = (front - dates.to_numpy()) / np.timedelta64(1, "D")
+
+    n = len(df)
+    iv = rng.uniform(15, 60, n)
+    df["front_expiry"]  = front
+    df["back_expiry"]   = back
+    df["front_fut_close"] = df["close"] * (1 + 0.0002 * dte + rng.normal(0, 0.001, n))
+    df["back_fut_close"]  = df["close"] * (1 + 0.0002 * (dte + 30) + rng.normal(0, 0.001, n))
+    df["combined_open_interest"] = rng.integers(100_000, 50_000_000, n).astype(float)
+    df["front_straddle_iv"]    = iv
+    df["front_straddle_price"] = df["close"] * iv / 100 * np.sqrt(np.maximum(dte, 1) / 365) * 0.8
+    return df.drop(columns="close").reset_index(drop=True)
+
+
+def fno_index_frame(rng, idx: pd.DataFrame) -> pd.DataFrame:
+    """Daily index F&O rows with weekly + monthly ATM straddles."""
+    spot_of = {"NIFTY": "NIFTY 50", "BANKNIFTY": "NIFTY BANK", "FINNIFTY": "NIFTY FIN SERVICE"}
+    frames = []
+    for fut, spot in spot_of.items():
+        sub = idx[idx["symbol"] == spot][["date", "close"]].copy()
+        sub.insert(0, "symbol", fut)
+        frames.append(sub)
+    df = pd.concat(frames, ignore_index=True)
+
+    dates = pd.DatetimeIndex(df["date"])
+    monthly = _next_expiry(dates, monthly_expiries(dates.min(), dates.max()))
+    weekly  = dates + pd.to_timedelta((3 - dates.weekday) % 7, "D")
+    n = len(df)
+    for kind, exp in (("weekly", weekly.to_numpy()), ("monthly", monthly)):
+        dte = np.maximum((exp - dates.to_numpy()) / np.timedelta64(1, "D"), 1)
+        iv = rng.uniform(10, 25, n)
+        df[f"front_{kind}_expiry"] = exp
+        df[f"front_{kind}_straddle_iv"] = iv
+        df[f"front_{kind}_straddle_price"] = df["close"] * iv / 100 * np.sqrt(dte / 365) * 0.8
+    df["combined_open_interest"] = rng.integers(1_000_000, 90_000_000, n).astype(float)
+    return df.drop(columns="close")
+
+
+def fut_symbol(name: str, expiry: pd.Timestamp) -> str:
+    """Kite futures tradingsymbol, e.g. RELIANCE26OCTFUT."""
+    return f"{name}{expiry:%y}{expiry:%b}".upper() + "FUT"
+
+
+def instrument_master(names: list[str], today: pd.Timestamp) -> pd.DataFrame:
+    """Kite instrument dump: NSE cash rows + three monthly futures per name."""
+    expiries = monthly_expiries(today, today + pd.DateOffset(months=3))
+    expiries = expiries[expiries >= today][:3]
+
+    cash = pd.DataFrame({"tradingsymbol": names, "name": names, "expiry": pd.NaT,
+                         "strike": 0.0, "instrument_type": "EQ", "segment": "NSE",
+                         "exchange": "NSE"})
+    fut = pd.DataFrame([
+        {"tradingsymbol": fut_symbol(n, e), "name": n, "expiry": e, "strike": 0.0,
+         "instrument_type": "FUT", "segment": "NFO-FUT", "exchange": "NFO"}
+        for n in names + INDEX_FUTURES for e in expiries
+    ])
+    master = pd.concat([cash, fut], ignore_index=True)
+    master.insert(0, "instrument_token", np.arange(1, len(master) + 1))
+    master["last_price"] = 0.0
+    return master
+
+
+def intraday_bars(rng, last_close: pd.Series, day: pd.Timestamp,
+                  minutes: int = MINUTES, premium: float = 0.0) -> pd.DataFrame:
+    """One session of minute bars starting from `last_close` per symbol."""
+    stamps = pd.date_range(day + pd.Timedelta("9h15min"), periods=minutes, freq="min")
+    close = _walk(rng, minutes, len(last_close),
+                  last_close.to_numpy() * (1 + premium), vol=0.0008)
+    cols = _ohlc(rng, close)
+    cols["volume"] = rng.integers(100, 50_000, size=close.shape).astype(float)
+    return _long(cols, stamps, last_close.index.tolist()).rename(columns={"date": "datetime"})
+
+
+# ─── everything at once ─────────────────────────────────────────────────────
+def synthetic_market(n_symbols: int = 500, years: float = 2, seed: int = 0,
+                     minutes: int = MINUTES) -> dict[str, pd.DataFrame]:
+    """
+    Consistent cash / index / F&O / intraday / instrument-master frames for
+    `n_symbols` stocks over `years` of trading days.  Same arguments → same
+    frames.
+    """
+    rng   = np.random.default_rng(seed)
+    today = pd.Timestamp.today().normalize()
+    dates = trading_days(years)
+
+    const = universe(n_symbols)
+    syms  = const["Symbol"].tolist()
+    fno_syms = syms[: max(1, int(n_symbols * FNO_FRACTION))]
+
+    cash = cash_frame(rng, syms, dates)
+    idx  = index_frame(rng, dates)
+    master = instrument_master(fno_syms, today)
+
+    last = cash[cash["date"] == dates[-1]].set_index("symbol")["close"]
+    cash_bars = intraday_bars(rng, last.loc[fno_syms], today, minutes)
+
+    # futures trade at a small premium to the last spot close
+    spot_last = idx[idx["date"] == dates[-1]].set_index("symbol")["close"]
+    fut = master[master["instrument_type"] == "FUT"]
+    base = fut["name"].map(lambda n: spot_last.get({"NIFTY": "NIFTY 50",
+                                                   "BANKNIFTY": "NIFTY BANK",
+                                                   "FINNIFTY": "NIFTY FIN SERVICE"}.get(n), last.get(n)))
+    fut_last = pd.Series(base.to_numpy(dtype=float), index=fut["tradingsymbol"].to_numpy())
+    fut_bars = intraday_bars(rng, fut_last, today, minutes, premium=0.004)
+
+    return {
+        "const":       const,
+        "cash":        cash,
+        "index":       idx,
+        "fno_stock":   fno_stock_frame(rng, cash, fno_syms),
+        "fno_index":   fno_index_frame(rng, idx),
+        "instruments": master,
+        "cash_bars":   cash_bars,
+        "fut_bars":    fut_bars,
+    }
+
+
+def write_workdir(root, mkt: dict[str, pd.DataFrame]) -> Path:
+    """
+    Lay out the files core modules read from data/ (constituents,
+    instrument dump) under `root`, so the pipeline can run from there.
+    """
+    root = Path(root)
+    (root / "data").mkdir(parents=True, exist_ok=True)
+    mkt["const"].to_csv(root / "data" / "nifty_500_constituents.csv")
+    mkt["instruments"].to_csv(root / "data" / "instruments.csv", index=False)
+    return root
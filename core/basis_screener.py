@@ -7,86 +7,81 @@ Created on Tue Jun 10 14:49:01 2025
 """
 
 # core/basis_screener.py
-import pandas as pd, re, streamlit as st
-from core.fno_utils import classify_futures          # we wrote this earlier
+import pandas as pd, numpy as np
+from core.fno_utils import futures_term_matrix, futures_underlying, TERMS, INDEX_SPOT
 from core.fetch import read_intraday          # or intraday_pg
 from core.preprocess import index_with_live, cash_with_live
-from utils.kite_auth import get_kite
+from app_config import CACHE_INTRADAY_LIVE_TTL, CACHE_SQL_TTL
+from core.cache import cached, MB
+from core.perf import traced
+from core.trading_calendar import window_start
 
-def _basis(fut_px, spot_px):
-    pts = fut_px - spot_px
-    pct = (pts / spot_px) * 100 if spot_px else None
-    return round(pts, 2), round(pct, 2) if pct is not None else None
+_BASIS_COLS = [
+    "spot",
+    "front_pts","front_pct",
+    "back_pts","back_pct",
+    "far_pts","far_pct",
+    "front_carry","back_carry","far_carry",
+]
 
-@st.cache_data(ttl=30, show_spinner=False)
+@traced
+@cached(ttl=30, max_entries=4, max_bytes=16 * MB, persist=False)
 def current_basis_table(cash_df, idx_df, fut_bars):
     """
-    Returns a dataframe indexed by tradingsymbol with columns:
-    spot, front_pts, front_pct, back_pts, … far_pct
+    Returns a dataframe indexed by underlying with columns:
+    spot, front_pts, front_pct, back_pts, … far_pct,
+    front_carry, back_carry, far_carry (annualised basis %, 365-day)
     """
     # latest spot for every symbol
     spot_latest = (
         pd.concat([cash_df[["symbol","date","close"]],
                    idx_df[["symbol","date","close"]]])
         .sort_values("date")
-        .groupby("symbol", as_index=False)
+        .groupby("symbol")["close"]
         .last()
-        .set_index("symbol")["close"]
     )
- 
-    # classify futures
-    front, back, far = classify_futures(fut_bars["symbol"].unique().tolist())
-
-
-    def latest_price(fut_list):
-        if not fut_list:
-            return pd.Series(dtype=float)
-        df = fut_bars[fut_bars["symbol"].isin(fut_list)]
-        px = (df.sort_values("datetime")
-                .groupby("symbol", as_index=False)
-                .last()[["symbol","close"]])
-        px["base"] = px["symbol"].str.replace(
-    r"\d{2}[A-Z]{3}FUT$", "", regex=True)
-        px = px.set_index('base')['close']
-        
-        return px
-
-    front_px = latest_price(front)
-    back_px  = latest_price(back)
-    far_px   = latest_price(far)
-
-    tbl = pd.DataFrame({
-        "spot": spot_latest,
-        "front_px": front_px,
-        "back_px":  back_px,
-        "far_px":   far_px,
-    }).dropna(subset=["front_px"])
-    
-    
-    tbl = tbl.copy()
-
-    # ---- compute basis columns ----------------------------------------
-    for label in ["front", "back", "far"]:
-        tbl[[f"{label}_pts", f"{label}_pct"]] = (
-            tbl.apply(
-                lambda r: _basis(r[f"{label}_px"], r["spot"]),
-                axis=1,
-                result_type="expand"     # ⇦ tells pandas to split tuple → 2 cols
-            )
-        )
-        
-    return tbl[[
-        "spot",
-        "front_pts","front_pct",
-        "back_pts","back_pct",
-        "far_pts","far_pct"
-    ]]
+
+    # latest price of every future in one pass
+    fut_latest = fut_bars.sort_values("datetime").groupby("symbol")["close"].last()
+
+    # underlying × (front, back, far) contracts
+    term = futures_term_matrix(fut_latest.index.tolist())
+    if term.empty:
+        return pd.DataFrame(columns=_BASIS_COLS)
+
+    syms = term[TERMS].to_numpy().ravel()
+    px   = fut_latest.reindex(syms).to_numpy(dtype=float).reshape(len(term), len(TERMS))
+    spot = (
+        spot_latest.reindex([INDEX_SPOT.get(u, u) for u in term.index])
+        .to_numpy(dtype=float)
+    )
+
+    today = pd.Timestamp.today().normalize()
+    expiry = term[[f"{t}_expiry" for t in TERMS]].to_numpy(dtype="datetime64[ns]")
+    days = ((expiry - today.to_datetime64()) / np.timedelta64(1, "D")).clip(min=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pts   = px - spot[:, None]
+        pct   = np.where(spot[:, None] != 0, pts / spot[:, None] * 100, np.nan)
+        carry = pct * 365 / days
+
+    tbl = pd.DataFrame({"spot": spot}, index=term.index)
+    for j, t in enumerate(TERMS):
+        tbl[f"{t}_px"]    = px[:, j]
+        tbl[f"{t}_pts"]   = pts[:, j].round(2)
+        tbl[f"{t}_pct"]   = pct[:, j].round(2)
+        tbl[f"{t}_carry"] = carry[:, j].round(2)
+
+    tbl = tbl.dropna(subset=["front_px"])
+
+    return tbl[_BASIS_COLS]
 
 # -------------------------------------------------------------------
+@traced
 def intraday_prices(symbol, fut_bars, spot_bars):
     """Return spot & three future series for plotting."""
-    patt = re.compile(rf"^{symbol}\d{{2}}[A-Z]{{3}}FUT$")
-    futs = sorted({s for s in fut_bars["symbol"].unique() if patt.match(s)})
+    term = futures_term_matrix(fut_bars["symbol"].unique().tolist())
+    futs = term.loc[symbol, TERMS].dropna().tolist() if symbol in term.index else []
 
     groups = (
         fut_bars[fut_bars["symbol"].isin(futs)]
@@ -103,46 +98,175 @@ def intraday_prices(symbol, fut_bars, spot_bars):
 
     return spot_series, fut_series
 
+
+@traced
+@cached(ttl=CACHE_INTRADAY_LIVE_TTL, max_entries=4, max_bytes=256 * MB, persist=False)
+def intraday_basis_matrix(fut_bars: pd.DataFrame,
+                          spot_bars: pd.DataFrame,
+                          tolerance: str = "3min") -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Minute-by-minute basis of every active future against its spot.
+
+    Each future bar is matched to the latest spot bar at or before it
+    (as-of join per underlying); spot bars older than `tolerance` are
+    treated as stale and give NaN instead of a stale basis.
+
+    Returns
+    -------
+    basis_pts  – datetime × future, fut − spot (₹), float32
+    basis_pct  – datetime × future, basis as % of spot, float32
+    """
+    und = futures_underlying(fut_bars["symbol"].unique().tolist())
+    if und.empty or spot_bars.empty:
+        empty = pd.DataFrame(dtype="float32")
+        return empty, empty
+
+    fut = fut_bars.loc[fut_bars["symbol"].isin(und.index), ["datetime", "symbol", "close"]]
+    spot_of = und.map(lambda u: INDEX_SPOT.get(u, u))          # one entry per future
+    fut = fut.assign(spot_sym=fut["symbol"].map(spot_of))
+
+    spot = (
+        spot_bars[["datetime", "symbol", "close"]]
+        .rename(columns={"symbol": "spot_sym", "close": "spot_close"})
+        .sort_values("datetime")
+    )
+
+    merged = pd.merge_asof(
+        fut.sort_values("datetime"), spot,
+        on="datetime", by="spot_sym",
+        direction="backward", tolerance=pd.Timedelta(tolerance),
+    ).drop_duplicates(["datetime", "symbol"], keep="last")
+
+    pts = merged["close"].to_numpy(dtype=float) - merged["spot_close"].to_numpy(dtype=float)
+    merged["pts"] = pts
+    merged["pct"] = pts / merged["spot_close"].to_numpy(dtype=float) * 100
+
+    basis_pts = merged.pivot(index="datetime", columns="symbol", values="pts").astype("float32")
+    basis_pct = merged.pivot(index="datetime", columns="symbol", values="pct").astype("float32")
+    return basis_pts, basis_pct
+
+
+@traced
+def basis_spikes(basis_pct: pd.DataFrame, window: int = 30, z: float = 3.0) -> pd.DataFrame:
+    """
+    Futures whose latest basis % sits more than `z` rolling standard
+    deviations (over the previous `window` minutes) from its rolling mean.
+    """
+    if basis_pct.empty:
+        return pd.DataFrame(columns=["basis_pct", "zscore"])
+
+    hist  = basis_pct
+    base  = hist.shift(1).rolling(window, min_periods=max(5, window // 3))
+    score = ((hist - base.mean()) / base.std()).iloc[-1]
+
+    out = pd.DataFrame({"basis_pct": hist.iloc[-1], "zscore": score}).dropna()
+    return out[out["zscore"].abs() > z].sort_values("zscore", key=abs, ascending=False)
+
 # --------------------------------------------------------------------
+_OHLC = ["open", "high", "low", "close"]
+_FUT_COLS = {"front_pct": "front_fut_close", "back_pct": "back_fut_close"}
+FUT_FILL_SESSIONS = 2          # missing futures sessions bridged before basis → NaN
+
+
+@traced
+@cached(ttl=CACHE_SQL_TTL, max_entries=2, max_bytes=256 * MB)
+def daily_basis_panel(cash_df: pd.DataFrame,
+                      idx_df: pd.DataFrame,
+                      fno_df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Date × symbol panels for every F&O underlying in `fno_df`, built once
+    per dataset version:
+
+    open / high / low / close – spot OHLC (index futures use INDEX_SPOT)
+    front_pct / back_pct      – daily basis % of front / back futures
+
+    Futures closes are forward-filled over at most FUT_FILL_SESSIONS
+    missing sessions; beyond that (a name that left F&O, a longer feed gap)
+    the basis is NaN rather than a stale future against a fresh spot.
+    """
+    fno_syms = fno_df["symbol"].unique()
+    to_fno   = {INDEX_SPOT.get(s, s): s for s in fno_syms}     # spot name → F&O name
+
+    spot = pd.concat([
+        cash_df[cash_df["symbol"].isin(to_fno)],
+        idx_df[idx_df["symbol"].isin(to_fno)],
+    ])
+    spot = (
+        spot.assign(symbol=spot["symbol"].map(to_fno))
+            .drop_duplicates(subset=["symbol", "date"], keep="last")
+    )
+
+    panel = {
+        c: spot.pivot(index="date", columns="symbol", values=c).sort_index()
+        for c in _OHLC if c in spot.columns
+    }
+    close = panel["close"].ffill()
+
+    fno = fno_df.drop_duplicates(subset=["symbol", "date"], keep="last")
+    for out_col, fut_col in _FUT_COLS.items():
+        fut = (
+            fno.pivot(index="date", columns="symbol", values=fut_col)
+               .reindex(index=close.index, columns=close.columns)
+               .ffill(limit=FUT_FILL_SESSIONS)
+        )
+        panel[out_col] = (fut - close) / close * 100
+
+    return panel
+
+
+@traced
+def basis_screen(panel: dict[str, pd.DataFrame],
+                 below: float | None = None,
+                 above: float | None = None,
+                 term: str = "front",
+                 date=None) -> pd.Series:
+    """
+    Cross-sectional basis filter on one date (default: latest), e.g.
+    `basis_screen(panel, below=-0.5)` → stocks in >0.5 % backwardation.
+    """
+    pct = panel[f"{term}_pct"]
+    if pct.empty:
+        return pd.Series(dtype=float, name=f"{term}_pct")
+    row = pct.iloc[-1] if date is None else pct.loc[pd.Timestamp(date)]
+    row = row.dropna()
+    if below is not None:
+        row = row[row < below]
+    if above is not None:
+        row = row[row > above]
+    return row.sort_values().rename(f"{term}_pct")
+
+
+@traced
 def daily_basis_series(symbol: str,
                        cash_df: pd.DataFrame,
                        idx_df: pd.DataFrame,
                        fno_df: pd.DataFrame,
-                       months_back: int = 3) -> tuple[pd.DataFrame, pd.DataFrame]:
+                       months_back: int = 3,
+                       panel: dict[str, pd.DataFrame] | None = None
+                       ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
+    `panel` – a daily_basis_panel() result already at hand (e.g. from the
+    snapshot); built from the frames when omitted.
+
     Returns
     -------
     price_df   – OHLC cash prices for the window
-    basis_df   – columns ['front_pct','back_pct','far_pct'] indexed by date
+    basis_df   – columns ['front_pct','back_pct'] indexed by date
     """
+    if panel is None:
+        panel = daily_basis_panel(cash_df, idx_df, fno_df)
+    if symbol not in panel["close"].columns:
+        return pd.DataFrame(columns=_OHLC), pd.DataFrame(columns=list(_FUT_COLS))
 
     end   = cash_df["date"].max()
-    start = end - pd.DateOffset(months=months_back)
-
-    # ---------- spot -------------------------------------------------------
-    spot = pd.concat([cash_df, idx_df])
-    spot = (spot[(spot["symbol"] == symbol) &
-                 (spot["date"].between(start, end))]
-            .set_index("date")[["open","high","low","close"]])
+    start = window_start(end, months=months_back)
 
-
-    fut_daily = (
-    fno_df[
-        (fno_df["symbol"] == symbol) &     # exact underlying name
-        (fno_df["date"].between(start, end))
-    ]
-    .set_index("date")[["front_fut_close", "back_fut_close"]]
+    # ---------- column lookups --------------------------------------------
+    spot = (
+        pd.DataFrame({c: panel[c][symbol] for c in _OHLC if c in panel})
+        .loc[start:end]
+        .dropna(subset=["close"])
     )
+    basis_pct = pd.DataFrame({c: panel[c][symbol] for c in _FUT_COLS}).loc[spot.index]
 
-    # align index and forward-fill any holiday gaps so pct calc works
-    aligned = spot.join(fut_daily).ffill()
-    
-    basis_pct = pd.DataFrame({
-        "front_pct": (aligned["front_fut_close"] - aligned["close"]) /
-                     aligned["close"] * 100,
-        "back_pct":  (aligned["back_fut_close"]  - aligned["close"]) /
-                     aligned["close"] * 100,
-
-    })
-
-    return spot, basis_pct
\ No newline at end of file
+    return spot, basis_pct
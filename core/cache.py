@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:05:00 2026
+
+@author: varun
+"""
+
+# core/cache.py
+#
+# Two-tier cache for the fetch / preprocess functions:
+#
+#   memory LRU (per process)  →  SQLite file on local disk  →  compute
+#
+# The disk tier survives deploys and crashes, so the first page view after a
+# restart reads pickles instead of re-fetching and recomputing everything.
+# Entries are keyed by function name + a hash of its bytecode (editing the
+# function invalidates old entries) + a digest of the arguments, expire after
+# the function's TTL and are evicted least-recently-used once the file grows
+# past DISK_CACHE_MAX_BYTES.
+#
+# Every cached function declares an entry budget and a byte budget for its
+# memory tier; whichever is exceeded first evicts least-recently-used
+# results.  memory_report() shows what each cache currently holds.
+#
+# Like st.cache_data every caller gets its own result: frames and series
+# come back as shallow copy-on-write copies (free until someone writes to
+# them) and arrays as read-only views, so changing a result in place never
+# reaches the cached entry.  Argument frames are re-hashed on every call,
+# so changing one in place gives a new key, not a stale hit.
+#
+# Nothing here depends on Streamlit.  Batch jobs, benchmarks and process
+# pools pick the tiers they want with configure(): e.g. memory only, no
+# caching at all, or a different disk store.
+import functools
+import hashlib
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app_config import CACHE_DIR, DISK_CACHE_MAX_BYTES
+from core import perf
+
+_DB_FILE = "cache.sqlite"
+
+MB = 1024 ** 2
+
+_stats: dict[str, dict[str, int]] = {}
+_registry: dict[str, "callable"] = {}
+
+
+def nbytes(obj) -> int:
+    """Approximate in-memory size of a cached value."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(nbytes(o) for o in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(nbytes(k) + nbytes(v) for k, v in obj.items())
+    if hasattr(obj, "to_plotly_json"):              # cached plotly figures (plots/)
+        return nbytes(obj.to_plotly_json())
+    return int(getattr(obj, "nbytes", sys.getsizeof(obj)))
+
+
+# ─── argument hashing ───────────────────────────────────────────────────────
+def _values_digest(values, h) -> None:
+    """Feed one column / index to `h` – raw buffers where the layout allows."""
+    if getattr(values.dtype, "storage", None) == "pyarrow":
+        for chunk in values.array.__arrow_array__().chunks:      # zero-copy
+            h.update(repr((chunk.offset, len(chunk))).encode())
+            for buf in chunk.buffers():
+                if buf is not None:
+                    h.update(buf)
+        return
+    arr = values.to_numpy() if values.dtype.kind in "biufcmM" else None
+    if arr is not None and arr.dtype.kind in "biufcmM":
+        h.update(np.ascontiguousarray(arr).view(np.uint8))
+    else:
+        h.update(pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes())
+
+
+def _frame_digest(obj) -> str:
+    """
+    Content hash of a DataFrame/Series.  Recomputed on every call (a few
+    ms for the 400-day cash frame), so a frame changed in place since the
+    last call gets a new key instead of a stale hit.
+    """
+    h = hashlib.sha1()
+    h.update(repr((type(obj).__name__, obj.shape)).encode())
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr(list(obj.columns)).encode())
+        h.update(repr(obj.dtypes.astype(str).tolist()).encode())
+        for _, col in obj.items():
+            _values_digest(col, h)
+    else:
+        h.update(str(obj.dtype).encode())
+        _values_digest(obj, h)
+    _values_digest(obj.index, h)
+    return h.hexdigest()
+
+
+def _digest(obj, h) -> None:
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(_frame_digest(obj).encode())
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for o in obj:
+            _digest(o, h)
+    elif isinstance(obj, dict):
+        for k in sorted(obj, key=repr):
+            _digest(k, h)
+            _digest(obj[k], h)
+    else:
+        try:
+            h.update(pickle.dumps(obj, protocol=4))
+        except Exception:
+            h.update(repr(obj).encode())
+
+
+def _code_digest(code: types.CodeType, h) -> None:
+    # nested code objects (lambdas, comprehensions, inner defs) repr with
+    # their address, and frozenset order follows the per-process str hash –
+    # hash the pieces so the ID is the same in every interpreter
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for c in code.co_consts:
+        if isinstance(c, types.CodeType):
+            _code_digest(c, h)
+        elif isinstance(c, frozenset):
+            h.update(repr(sorted(c, key=repr)).encode())
+        else:
+            h.update(repr(c).encode())
+
+
+def _func_id(func) -> str:
+    h = hashlib.sha1()
+    _code_digest(func.__code__, h)
+    return f"{func.__module__}.{func.__qualname__}:{h.hexdigest()[:12]}"
+
+
+def _detach(value):
+    """The caller's view of a cached value (see the header)."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    if type(value) in (tuple, list):
+        return type(value)(_detach(v) for v in value)
+    if type(value) is dict:
+        return {k: _detach(v) for k, v in value.items()}
+    return value
+
+
+def _ttl_seconds(ttl) -> float | None:
+    if ttl is None:
+        return None
+    if isinstance(ttl, (int, float)):
+        return float(ttl)
+    return pd.Timedelta(ttl).total_seconds()
+
+
+# ─── disk tier ──────────────────────────────────────────────────────────────
+class _DiskStore:
+    """SQLite-backed pickle store with TTL + size-bounded LRU eviction."""
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, func TEXT, expires REAL,"
+                " last_access REAL, size INTEGER, value BLOB)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_access)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str):
+        """(expires, value) or None."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT expires, value FROM entries WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[0] is not None and row[0] < now:
+                db.execute("DELETE FROM entries WHERE key=?", (key,))
+                db.commit()
+                return None
+            db.execute("UPDATE entries SET last_access=? WHERE key=?", (now, key))
+            db.commit()
+        return row[0], pickle.loads(row[1])
+
+    def put(self, key: str, func: str, value, ttl: float | None) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?,?,?,?,?,?)",
+                (key, func, now + ttl if ttl else None, now, len(blob), blob),
+            )
+            self._evict(db, now)
+            db.commit()
+
+    def _evict(self, db, now: float) -> None:
+        db.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires < ?", (now,))
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            db.execute("DELETE FROM entries WHERE key=?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self, func_prefix: str | None = None) -> None:
+        with self._lock:
+            db = self._db()
+            if func_prefix is None:
+                db.execute("DELETE FROM entries")
+            else:
+                db.execute("DELETE FROM entries WHERE substr(func, 1, ?) = ?",
+                           (len(func_prefix), func_prefix))
+            db.commit()
+
+
+_disk = _DiskStore(Path(CACHE_DIR) / _DB_FILE, DISK_CACHE_MAX_BYTES)
+
+_tiers = {"memory": True, "disk": True}
+
+
+def configure(*, memory: bool | None = None, disk: bool | None = None,
+              store=None) -> None:
+    """
+    Process-wide cache switches.
+
+    memory   False → skip the in-process LRU
+    disk     False → skip the persistent tier
+    store    replacement disk tier: any object with get(key) → (expires, value)
+             or None, put(key, func, value, ttl) and clear(func_prefix) like
+             _DiskStore
+
+    `configure(memory=False, disk=False)` makes every cached function a
+    plain call – what a benchmark or a one-shot batch job wants.
+    """
+    global _disk
+    if memory is not None:
+        _tiers["memory"] = memory
+    if disk is not None:
+        _tiers["disk"] = disk
+    if store is not None:
+        _disk = store
+
+
+# ─── decorator ──────────────────────────────────────────────────────────────
+def cached(ttl=None, *, max_entries: int = 32, max_bytes: int = 256 * MB,
+           persist: bool = True):
+    """
+    Memoise `func` in a per-process LRU bounded by `max_entries` results and
+    `max_bytes` total size, backed by the on-disk store when `persist` is
+    True.  `ttl` is seconds or a pandas-style string ("6h", "15min").  The
+    wrapper exposes `.clear()` like st.cache_data; `.clear(disk=False)`
+    drops only the memory tier.
+    """
+    ttl_s = _ttl_seconds(ttl)
+
+    def deco(func):
+        fid  = _func_id(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+        # key → (expires, value, size)
+        mem: OrderedDict[str, tuple[float | None, object, int]] = OrderedDict()
+        held = {"bytes": 0}
+        lock = threading.Lock()
+        stats = _stats.setdefault(name, {"mem_hits": 0, "disk_hits": 0, "misses": 0,
+                                         "evictions": 0})
+
+        def _drop(key):
+            held["bytes"] -= mem.pop(key)[2]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            use_mem, use_disk = _tiers["memory"], persist and _tiers["disk"]
+            if not (use_mem or use_disk):
+                stats["misses"] += 1
+                perf.note(name, cache="off")
+                return func(*args, **kwargs)
+
+            t0 = time.perf_counter()
+            h = hashlib.sha1()
+            _digest((args, kwargs), h)
+            key = f"{fid}:{h.hexdigest()}"
+            now = time.time()
+            perf.note(name, hash_ms=(time.perf_counter() - t0) * 1000)
+
+            with lock:
+                hit = mem.get(key) if use_mem else None
+                if hit is not None:
+                    if hit[0] is None or hit[0] > now:
+                        mem.move_to_end(key)
+                        stats["mem_hits"] += 1
+                        perf.note(name, cache="mem")
+                        return _detach(hit[1])
+                    _drop(key)                       # expired
+
+            stored = _disk.get(key) if use_disk else None
+            expires = now + ttl_s if ttl_s else None
+            if stored is not None:
+                expires, value = stored              # keep the disk entry's own expiry
+                stats["disk_hits"] += 1
+                perf.note(name, cache="disk")
+            else:
+                stats["misses"] += 1
+                perf.note(name, cache="miss")
+                value = func(*args, **kwargs)
+                if use_disk and value is not None:
+                    _disk.put(key, fid, value, ttl_s)
+
+            if not use_mem:
+                return _detach(value)
+            size = nbytes(value)
+            if size > max_bytes:
+                return _detach(value)                # would evict everything
+            with lock:
+                if key in mem:
+                    _drop(key)
+                mem[key] = (expires, value, size)
+                held["bytes"] += size
+                while len(mem) > max_entries or held["bytes"] > max_bytes:
+                    _drop(next(iter(mem)))
+                    stats["evictions"] += 1
+            return _detach(value)
+
+        def clear(disk: bool = True):
+            with lock:
+                mem.clear()
+                held["bytes"] = 0
+            if persist and disk:
+                _disk.clear(f"{func.__module__}.{func.__qualname__}:")
+
+        def report() -> dict:
+            with lock:
+                return {"entries": len(mem), "bytes": held["bytes"],
+                        "max_entries": max_entries, "max_bytes": max_bytes}
+
+        wrapper.clear = clear
+        wrapper.report = report
+        _registry[name] = wrapper
+        return wrapper
+
+    return deco
+
+
+def memory_report() -> pd.DataFrame:
+    """Entries / bytes held in the memory tier of every cached function."""
+    df = pd.DataFrame.from_dict({n: fn.report() for n, fn in _registry.items()},
+                                orient="index")
+    if df.empty:
+        return df
+    df["used_pct"] = (df["bytes"] / df["max_bytes"] * 100).round(1)
+    return df.sort_values("bytes", ascending=False)
+
+
+def cache_stats() -> pd.DataFrame:
+    """Hit / miss counters per cached function."""
+    df = pd.DataFrame.from_dict(_stats, orient="index")
+    if df.empty:
+        return df
+    total = df[["mem_hits", "disk_hits", "misses"]].sum(axis=1).replace(0, pd.NA)
+    df["hit_rate"] = (df["mem_hits"] + df["disk_hits"]) / total
+    return df.sort_index()
+
+
+def clear_all(disk: bool = True) -> None:
+    for fn in _registry.values():
+        fn.clear(disk=disk)
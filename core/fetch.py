@@ -7,8 +7,10 @@ Created on Mon May  5 10:20:16 2025
 """
 
 # core/fetch.py
-import pandas as pd, requests, streamlit as st
+import pandas as pd, requests
 from app_config import API_URL, API_TOKEN, CACHE_SQL_TTL, CACHE_INTRADAY_LIVE_TTL
+from core.cache import cached, MB
+from core.perf import traced, response_json
 
 def _scale_iv_cols(df: pd.DataFrame) -> pd.DataFrame:
     iv_cols = [c for c in df.columns if "iv" in c.lower()]
@@ -17,53 +19,54 @@ def _scale_iv_cols(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-@st.cache_data(show_spinner=False, ttl='6h')
+@traced
+@cached(ttl='6h', max_entries=1, max_bytes=8 * MB, persist=False)
 def get_constituents():
     return pd.read_csv("data/nifty_500_constituents.csv")
 
 
 _HDR = {"Authorization": f"Bearer {API_TOKEN}"}
 
-constituents = get_constituents()
-symbols = constituents["Symbol"].unique().tolist()
 
-
-@st.cache_data(ttl=CACHE_SQL_TTL)
+@traced
+@cached(ttl=CACHE_SQL_TTL, max_entries=1, max_bytes=1024 * MB)
 def cash_all():
     resp = requests.post(f"{API_URL}/cash_data", headers=_HDR, json={"symbols":[]})
-    df = pd.DataFrame(resp.json())
+    df = pd.DataFrame(response_json(resp))
     df["date"] = pd.to_datetime(df["date"])
-    df = df[df['symbol'].isin(symbols)]
+    df = df[df['symbol'].isin(get_constituents()["Symbol"].unique())]
     return df
 
-@st.cache_data(ttl=CACHE_SQL_TTL)
+@traced
+@cached(ttl=CACHE_SQL_TTL, max_entries=1, max_bytes=256 * MB)
 def index_all():
     resp = requests.post(f"{API_URL}/index_data", headers=_HDR, json={"symbol":"ALL"})
-    df = pd.DataFrame(resp.json())
+    df = pd.DataFrame(response_json(resp))
     df["date"] = pd.to_datetime(df["date"])
     return df
 
-@st.cache_data(ttl=CACHE_SQL_TTL)
+@traced
+@cached(ttl=CACHE_SQL_TTL, max_entries=1, max_bytes=512 * MB)
 def fno_stock_all():
     resp = requests.get(f"{API_URL}/fno_stock_data", headers=_HDR)
-    df = pd.DataFrame(resp.json())
+    df = pd.DataFrame(response_json(resp))
     df["date"] = pd.to_datetime(df["date"])
     df = _scale_iv_cols(df) 
     return df
 
 
-@st.cache_data(ttl=CACHE_SQL_TTL)
+@traced
+@cached(ttl=CACHE_SQL_TTL, max_entries=1, max_bytes=256 * MB)
 def fno_index_all():
     resp = requests.post(f"{API_URL}/fno_index_data", headers=_HDR, json={"symbol": "ALL"})
-    df = pd.DataFrame(resp.json())
+    df = pd.DataFrame(response_json(resp))
     df["date"] = pd.to_datetime(df["date"])
     df = _scale_iv_cols(df) 
     return df
 
 
-_HDR = {"Authorization": f"Bearer {API_TOKEN}"}
-
-@st.cache_data(ttl=CACHE_INTRADAY_LIVE_TTL, show_spinner=False)
+@traced
+@cached(ttl=CACHE_INTRADAY_LIVE_TTL, max_entries=8, max_bytes=512 * MB, persist=False)
 def read_intraday(symbols: list[str], days: int = 1) -> pd.DataFrame:
     """
     Fetch intraday minute bars for `symbols` (empty list ⇒ all),
@@ -72,7 +75,7 @@ def read_intraday(symbols: list[str], days: int = 1) -> pd.DataFrame:
     payload = {"symbols": symbols, "days": days}
     r = requests.post(f"{API_URL}/intraday_bars", headers=_HDR, json=payload, timeout=30)
     r.raise_for_status()
-    df = pd.DataFrame(r.json())
+    df = pd.DataFrame(response_json(r))
     if not df.empty:
         df["datetime"] = pd.to_datetime(
             df["datetime"],
@@ -83,10 +86,9 @@ def read_intraday(symbols: list[str], days: int = 1) -> pd.DataFrame:
         
     return df
 
-_HDR = {"Authorization": f"Bearer {API_TOKEN}"}
-
-@st.cache_data(ttl=300, show_spinner=False)   # refresh list every 5 min
+@traced
+@cached(ttl=300, max_entries=1, max_bytes=4 * MB, persist=False)   # refresh list every 5 min
 def get_intraday_symbols():
     r = requests.get(f"{API_URL}/intraday_symbols", headers=_HDR, timeout=15)
     r.raise_for_status()
-    return r.json()          # plain list
\ No newline at end of file
+    return response_json(r)  # plain list
\ No newline at end of file
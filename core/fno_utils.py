@@ -9,13 +9,18 @@ Created on Wed May 14 14:09:42 2025
 # core/fno_utils.py
 import pandas as pd, datetime as dt
 from calendar import month_abbr
+from functools import lru_cache
 
 _INSTR_CSV = "data/instruments.csv"          # same file as collector
 _month_map = {m.upper(): i for i, m in enumerate(month_abbr) if m}
 
-# cache the master once
-_master = pd.read_csv(_INSTR_CSV)[["tradingsymbol", "expiry"]]
-_master["expiry"] = pd.to_datetime(_master["expiry"])
+# read the master once, on first use
+@lru_cache(maxsize=1)
+def _instrument_master() -> pd.DataFrame:
+    master = pd.read_csv(_INSTR_CSV, usecols=["tradingsymbol", "name", "expiry"])
+    master["expiry"] = pd.to_datetime(master["expiry"])
+    return master
+
 
 def classify_futures(symbols: list[str]) -> tuple[list[str], list[str], list[str]]:
     """
@@ -25,7 +30,8 @@ def classify_futures(symbols: list[str]) -> tuple[list[str], list[str], list[str
     Front = nearest expiry ≥ today; Back = next; Far = third.
     """
     today = pd.Timestamp.today().normalize()
-    fut = _master[_master.tradingsymbol.isin([s for s in symbols if s.endswith("FUT")])]
+    master = _instrument_master()
+    fut = master[master.tradingsymbol.isin([s for s in symbols if s.endswith("FUT")])]
 
     # pick one row per tradingsymbol (duplicates per exchange not expected here)
     fut = fut.groupby("tradingsymbol", as_index=False).first()
@@ -50,3 +56,62 @@ def classify_futures(symbols: list[str]) -> tuple[list[str], list[str], list[str
     return front, back, far
 
 
+TERMS = ["front", "back", "far"]
+
+# futures underlying → spot symbol in index_all()
+INDEX_SPOT = {
+    "NIFTY":     "NIFTY 50",
+    "BANKNIFTY": "NIFTY BANK",
+    "FINNIFTY":  "NIFTY FIN SERVICE",
+}
+
+
+@lru_cache(maxsize=8)
+def _term_matrix(fut_syms: tuple[str, ...], today: pd.Timestamp) -> pd.DataFrame:
+    master = _instrument_master()
+    fut = (
+        master[master.tradingsymbol.isin(fut_syms)]
+        .groupby("tradingsymbol", as_index=False).first()
+    )
+    fut = fut[fut["expiry"] >= today].copy()
+    if fut.empty:                                   # nothing collected yet
+        out = pd.DataFrame(index=pd.Index([], name="underlying", dtype=object))
+        for t in TERMS:
+            out[t] = pd.Series(dtype=object)
+            out[f"{t}_expiry"] = pd.Series(dtype="datetime64[ns]")
+        return out
+
+    fut["slot"] = fut.groupby("name")["expiry"].rank(method="first").astype(int) - 1
+    fut = fut[fut["slot"] < len(TERMS)].copy()
+    fut["term"] = fut["slot"].map(dict(enumerate(TERMS)))
+
+    wide = fut.pivot(index="name", columns="term", values=["tradingsymbol", "expiry"])
+    out = pd.DataFrame(index=wide.index)
+    for t in TERMS:
+        out[t] = wide["tradingsymbol"].get(t)
+        out[f"{t}_expiry"] = pd.to_datetime(wide["expiry"].get(t))
+    out.index.name = "underlying"
+    return out
+
+
+def futures_term_matrix(symbols: list[str]) -> pd.DataFrame:
+    """
+    Underlying × (front, back, far) table of futures tradingsymbols,
+    plus matching `<term>_expiry` columns, for the FUT symbols in `symbols`.
+
+    Expiries are ranked per underlying (nearest ≥ today = front).  The
+    matrix is memoised per (symbol set, day); callers get their own copy.
+    """
+    fut_syms = tuple(sorted({s for s in symbols if s.endswith("FUT")}))
+    return _term_matrix(fut_syms, pd.Timestamp.today().normalize()).copy()
+
+
+def futures_underlying(symbols: list[str]) -> pd.Series:
+    """tradingsymbol → underlying name for the active FUT symbols in `symbols`."""
+    term = futures_term_matrix(symbols)
+    return (
+        term[TERMS].reset_index()
+        .melt(id_vars="underlying", value_name="tradingsymbol")
+        .dropna(subset=["tradingsymbol"])
+        .set_index("tradingsymbol")["underlying"]
+    )
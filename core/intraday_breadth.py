@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 19:45:00 2026
+
+@author: varun
+"""
+
+# core/intraday_breadth.py
+#
+# Intraday breadth for several universes at once.
+#
+#   panels = intraday_breadth(cash_bars, prev_close,
+#                             universes={"Nifty 500": syms, "F&O": fno_syms},
+#                             ref_close=combined["prev_expiry_close"], key="cash")
+#   panels["F&O"]            # datetime × METRICS
+#
+# Bars are laid out as a minute × symbol matrix (last close carried
+# forward through minutes a symbol didn't print).  Every metric is a
+# boolean matrix reduced with one matmul against a symbol × universe
+# membership matrix, so adding universes costs a column, not a pass.
+#
+#   Adv / Dec / A-D     close vs yesterday's close
+#   % > VWAP            close above the session VWAP ((H+L+C)/3 · volume)
+#   % > prev expiry     close above `ref_close` (previous-expiry close)
+#   Tick / Cum tick     upticks − downticks vs the previous minute, running sum
+#
+# With a `key` the finished minutes and the running state (last close,
+# VWAP sums, cumulative tick) are kept between polls, so a refresh only
+# processes the minutes from the last (possibly still forming) one on.
+# The state is shared by every session (under a lock) and kept for the
+# MAX_STREAMS most recently used keys.
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from core.perf import traced, note
+
+METRICS = ["Adv", "Dec", "A-D", "% > VWAP", "% > prev expiry", "Tick", "Cum tick"]
+MAX_STREAMS = 16
+
+# key → state dict (see _empty_state), LRU order
+_state: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+def _empty_state(n_sym: int, n_uni: int) -> dict:
+    return {
+        "n_rows":   0,                          # raw bars before `start`
+        "start":    None,                       # first minute still to process
+        "close":    np.full(n_sym, np.nan),     # last close per symbol
+        "pv":       np.zeros(n_sym),            # Σ typical·volume
+        "vol":      np.zeros(n_sym),            # Σ volume
+        "cum_tick": np.zeros(n_uni),
+        "done":     None,                       # finished per-universe frames
+    }
+
+
+def membership(symbols: pd.Index, universes: dict[str, list[str]]) -> np.ndarray:
+    """symbol × universe 0/1 matrix."""
+    m = np.zeros((len(symbols), len(universes)))
+    for j, members in enumerate(universes.values()):
+        pos = symbols.get_indexer(pd.Index(list(members)).unique())
+        m[pos[pos >= 0], j] = 1.0
+    return m
+
+
+def _matrix(values: np.ndarray, at: tuple, shape: tuple) -> np.ndarray:
+    m = np.full(shape, np.nan)
+    m[at] = values
+    return m
+
+
+def _step(chunk: pd.DataFrame, col: np.ndarray, member: np.ndarray,
+          prev: np.ndarray, ref: np.ndarray, st: dict):
+    """
+    Metrics for the minutes in `chunk` (`col` = each bar's symbol position);
+    returns (times, metrics[T, U, M], running state per minute).
+    """
+    ri, times = pd.factorize(chunk["datetime"], sort=True)
+    at, shape = (ri, col), (len(times), len(prev))
+    times = pd.DatetimeIndex(times)
+
+    def matrix(col):
+        return _matrix(chunk[col].to_numpy(dtype=float), at, shape)
+
+    close = matrix("close")
+
+    # carry the last close forward (across the chunk boundary too)
+    filled = pd.DataFrame(np.vstack([st["close"], close])).ffill().to_numpy()
+    before, close = filled[:-1], filled[1:]
+
+    has_vol = {"high", "low", "volume"} <= set(chunk.columns)
+    if has_vol:
+        vol = np.nan_to_num(matrix("volume"))
+        typ = (matrix("high") + matrix("low") + matrix("close")) / 3
+        pv = st["pv"] + np.cumsum(np.nan_to_num(typ) * vol, axis=0)
+        cv = st["vol"] + np.cumsum(vol, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vwap = np.where(cv > 0, pv / cv, np.nan)
+    else:
+        pv = cv = vwap = np.full(close.shape, np.nan)
+
+    def count(mask):
+        return mask.astype(float) @ member
+
+    def pct(mask, valid):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return count(mask) / count(valid) * 100
+
+    adv, dec = count(close > prev), count(close < prev)
+    tick = count(close > before) - count(close < before)
+    cum_tick = st["cum_tick"] + np.cumsum(tick, axis=0)
+    ok = ~np.isnan(close)
+    out = np.stack([adv, dec, adv - dec,
+                    pct(close > vwap, ok & ~np.isnan(vwap)),
+                    pct(close > ref, ok & ~np.isnan(ref)),
+                    tick, cum_tick], axis=-1)
+    return times, out, {"close": close, "pv": pv, "vol": cv, "cum_tick": cum_tick}
+
+
+@traced
+def intraday_breadth(bars: pd.DataFrame, prev_close: pd.Series,
+                     universes: dict[str, list[str]] | None = None,
+                     ref_close: pd.Series | None = None,
+                     key: str | None = None) -> dict[str, pd.DataFrame]:
+    """
+    {universe: datetime × METRICS} for long intraday `bars` (datetime,
+    symbol, close; high/low/volume for VWAP).  Symbols are those in
+    `prev_close` (yesterday's close per symbol); `universes` defaults to
+    {"All": prev_close.index}.  Pass a `key` per stream to update
+    incrementally across polls.
+    """
+    symbols = pd.Index(prev_close.index.unique())
+    universes = universes or {"All": symbols}
+    member = membership(symbols, universes)
+    prev = prev_close.groupby(level=0).last().reindex(symbols).to_numpy(dtype=float)
+    ref = (np.full(len(symbols), np.nan) if ref_close is None
+           else ref_close.groupby(level=0).last().reindex(symbols).to_numpy(dtype=float))
+
+    col = symbols.get_indexer(bars["symbol"])
+    keep = col >= 0
+    bars, col = bars[keep], col[keep]
+    if bars.empty:
+        return {u: pd.DataFrame(columns=METRICS, dtype=float) for u in universes}
+
+    # resume from the cached state when the stream is unchanged up to `start`
+    sig = (tuple(symbols), tuple(universes), prev.tobytes(), ref.tobytes())
+    with _lock:
+        st = _state.get(key) if key is not None else None
+    t = bars["datetime"]
+    if st is None or st["sig"] != sig or (st["start"] is not None and
+                                          int((t < st["start"]).sum()) != st["n_rows"]):
+        st = {**_empty_state(len(symbols), len(universes)), "sig": sig}
+    new = np.ones(len(bars), dtype=bool) if st["start"] is None else (t >= st["start"]).to_numpy()
+    chunk = bars[new]
+
+    times, out, run = _step(chunk, col[new], member, prev, ref, st)
+    note(rows_in=len(chunk), rows_out=len(times))
+
+    frames = {u: pd.DataFrame(out[:, j, :], index=times, columns=METRICS)
+              for j, u in enumerate(universes)}
+    if st["done"] is not None:
+        frames = {u: pd.concat([st["done"][u], f]) for u, f in frames.items()}
+
+    if key is not None:
+        # everything but the latest minute is final; keep the state just before it
+        last = times[-1]
+        new_state = {
+            "sig":      sig,
+            "n_rows":   int((t < last).sum()),
+            "start":    last,
+            "close":    run["close"][-2] if len(times) > 1 else st["close"],
+            "pv":       run["pv"][-2] if len(times) > 1 else st["pv"],
+            "vol":      run["vol"][-2] if len(times) > 1 else st["vol"],
+            "cum_tick": run["cum_tick"][-2] if len(times) > 1 else st["cum_tick"],
+            "done":     {u: f.iloc[:-1] for u, f in frames.items()},
+        }
+        with _lock:
+            _state[key] = new_state
+            _state.move_to_end(key)
+            while len(_state) > MAX_STREAMS:
+                _state.popitem(last=False)
+    for f in frames.values():
+        f.index.name = "datetime"
+    return frames
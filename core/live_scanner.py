@@ -7,14 +7,303 @@ Created on Fri Jun  6 12:06:41 2025
 """
 
 # core/live_scanner.py
+import re
+import numpy as np
 import pandas as pd
 
+
+# ─── declarative scan engine ────────────────────────────────────────────────
+#
+# Rules are plain strings such as
+#     "now_price > prev_expiry_high AND oi_change > 10"
+# over the columns of a symbols × fields float matrix.  Every rule is parsed
+# once into a small AST; all rules are then evaluated together against the
+# matrix, sharing any sub-expression that appears in more than one rule.
+
+PREV_EXPIRY_SCANS = {
+    "breakout_close":  "cash_close_latest <= prev_expiry_close AND now_price > prev_expiry_close",
+    "breakout_high":   "cash_close_latest <= prev_expiry_high  AND now_price > prev_expiry_high",
+    "breakdown_close": "cash_close_latest >= prev_expiry_close AND now_price < prev_expiry_close",
+    "breakdown_low":   "cash_close_latest >= prev_expiry_low   AND now_price < prev_expiry_low",
+}
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:(?P<num>\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)"
+    r"|(?P<name>[A-Za-z_][A-Za-z0-9_]*)"
+    r"|(?P<op>>=|<=|==|!=|>|<|\(|\)|\+|-|\*|/))"
+)
+_KEYWORDS = {"AND", "OR", "NOT"}
+_CMP_OPS  = {">", "<", ">=", "<=", "==", "!="}
+
+
+def _slug(val) -> str:
+    return re.sub(r"[^0-9a-z]+", "_", str(val).lower()).strip("_")
+
+
+def _tokenize(expr: str) -> list[tuple[str, str]]:
+    pos, out = 0, []
+    expr = expr.rstrip()
+    while pos < len(expr):
+        m = _TOKEN_RE.match(expr, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"bad token at {pos} in rule: {expr!r}")
+        pos = m.end()
+        if m.group("num"):
+            out.append(("num", m.group("num")))
+        elif m.group("name"):
+            word = m.group("name")
+            out.append(("kw", word.upper()) if word.upper() in _KEYWORDS else ("name", word))
+        else:
+            out.append(("op", m.group("op")))
+    return out
+
+
+class _Parser:
+    """Recursive-descent parser: rule string → nested-tuple AST."""
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        self.toks = _tokenize(expr)
+        self.i = 0
+
+    def _peek(self):
+        return self.toks[self.i] if self.i < len(self.toks) else (None, None)
+
+    def _take(self):
+        tok = self._peek()
+        self.i += 1
+        return tok
+
+    def parse(self):
+        node = self._or()
+        if self.i != len(self.toks):
+            raise ValueError(f"unexpected {self._peek()[1]!r} in rule: {self.expr!r}")
+        return node
+
+    def _or(self):
+        node = self._and()
+        while self._peek() == ("kw", "OR"):
+            self._take()
+            node = ("or", node, self._and())
+        return node
+
+    def _and(self):
+        node = self._not()
+        while self._peek() == ("kw", "AND"):
+            self._take()
+            node = ("and", node, self._not())
+        return node
+
+    def _not(self):
+        if self._peek() == ("kw", "NOT"):
+            self._take()
+            return ("not", self._not())
+        return self._cmp()
+
+    def _cmp(self):
+        node = self._sum()
+        kind, val = self._peek()
+        if kind == "op" and val in _CMP_OPS:
+            self._take()
+            node = (val, node, self._sum())
+        return node
+
+    def _sum(self):
+        node = self._term()
+        while self._peek() in (("op", "+"), ("op", "-")):
+            node = (self._take()[1], node, self._term())
+        return node
+
+    def _term(self):
+        node = self._unary()
+        while self._peek() in (("op", "*"), ("op", "/")):
+            node = (self._take()[1], node, self._unary())
+        return node
+
+    def _unary(self):
+        if self._peek() == ("op", "-"):
+            self._take()
+            return ("neg", self._unary())
+        return self._atom()
+
+    def _atom(self):
+        kind, val = self._take()
+        if kind == "num":
+            return ("num", float(val))
+        if kind == "name":
+            return ("field", val)
+        if (kind, val) == ("op", "("):
+            node = self._or()
+            if self._take() != ("op", ")"):
+                raise ValueError(f"missing ')' in rule: {self.expr!r}")
+            return node
+        raise ValueError(f"unexpected {val!r} in rule: {self.expr!r}")
+
+
+def compile_rule(expr: str) -> tuple:
+    """Parse a rule string into an AST (raises ValueError on bad syntax)."""
+    return _Parser(expr).parse()
+
+
+def _fields_of(node: tuple) -> set[str]:
+    if node[0] == "field":
+        return {node[1]}
+    if node[0] == "num":
+        return set()
+    return set().union(*(_fields_of(n) for n in node[1:]))
+
+
+def _as_bool(x: np.ndarray) -> np.ndarray:
+    if x.dtype == bool:
+        return x
+    return np.nan_to_num(x, nan=0.0) != 0
+
+
+def _truth(x: np.ndarray) -> np.ndarray:
+    """Three-valued truth as float: 1 true, 0 false, NaN unknown (missing)."""
+    if x.dtype == bool:
+        return x.astype(float)
+    return np.where(np.isnan(x), np.nan, x != 0)
+
+
+_BINARY = {
+    ">":  np.greater,
+    "<":  np.less,
+    ">=": np.greater_equal,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+    "+":  np.add,
+    "-":  np.subtract,
+    "*":  np.multiply,
+    "/":  np.divide,
+}
+
+
+def _eval(node: tuple, mat: np.ndarray, col: dict[str, int], memo: dict) -> np.ndarray:
+    if node in memo:
+        return memo[node]
+
+    op = node[0]
+    if op == "field":
+        out = mat[:, col[node[1]]]
+    elif op == "num":
+        out = np.full(mat.shape[0], node[1])
+    elif op == "neg":
+        out = -_eval(node[1], mat, col, memo)
+    elif op == "not":
+        out = 1 - _truth(_eval(node[1], mat, col, memo))
+    elif op in ("and", "or"):
+        a = _truth(_eval(node[1], mat, col, memo))
+        b = _truth(_eval(node[2], mat, col, memo))
+        decided = 0.0 if op == "and" else 1.0      # False AND x / True OR x
+        unknown = np.isnan(a) | np.isnan(b)
+        out = np.where((a == decided) | (b == decided), decided,
+                       np.where(unknown, np.nan, 1 - decided))
+    else:
+        a, b = _eval(node[1], mat, col, memo), _eval(node[2], mat, col, memo)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = _BINARY[op](a, b)
+        if op in _CMP_OPS:                          # missing operand → unknown
+            out = np.where(np.isnan(a) | np.isnan(b), np.nan, out)
+
+    memo[node] = out
+    return out
+
+
+def _latest_close(live_bars: pd.DataFrame) -> pd.Series:
+    return (
+        live_bars.sort_values("datetime")
+                 .groupby("symbol")["close"]
+                 .last()
+                 .rename("now_price")
+    )
+
+
+def build_field_matrix(
+    reference: pd.DataFrame,
+    *,
+    live_bars: pd.DataFrame | None = None,
+    basis_tbl: pd.DataFrame | None = None,
+) -> tuple[pd.Index, dict[str, int], np.ndarray]:
+    """
+    Assemble the symbols × fields float matrix the scan engine runs on.
+
+    reference   OI/quadrant table from `fno_oi_processing` (index = symbol)
+    live_bars   optional minute bars; latest close becomes `now_price`,
+                otherwise an existing `now_price` column is kept or
+                `cash_close_latest` is used
+    basis_tbl   optional `current_basis_table` output; its columns are
+                added as `basis_<col>` (e.g. `basis_front_pct`)
+
+    Text columns (`quadrant`, `price_signal`) are one-hot encoded as
+    `<col>_<slug(value)>`, e.g. `quadrant_oi_up_price_up`.
+
+    Returns (symbols, {field: column}, matrix).
+    """
+    frame = reference.copy()
+    if live_bars is not None and not live_bars.empty:
+        frame = frame.drop(columns="now_price", errors="ignore")
+        frame = frame.join(_latest_close(live_bars), how="inner")
+    elif "now_price" not in frame.columns:
+        frame["now_price"] = frame["cash_close_latest"]
+
+    if basis_tbl is not None and not basis_tbl.empty:
+        frame = frame.join(basis_tbl.add_prefix("basis_"), how="left")
+
+    blocks = {}
+    for name, s in frame.items():
+        if pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+            blocks[name] = s.astype(float)
+        elif pd.api.types.is_datetime64_any_dtype(s):
+            continue
+        else:
+            for val in s.dropna().unique():
+                blocks[f"{name}_{_slug(val)}"] = (s == val).astype(float)
+
+    fields = pd.DataFrame(blocks, index=frame.index)
+    col = {name: i for i, name in enumerate(fields.columns)}
+    return fields.index, col, fields.to_numpy(dtype=float, na_value=np.nan)
+
+
+def run_scans(
+    rules: dict[str, str],
+    reference: pd.DataFrame,
+    *,
+    live_bars: pd.DataFrame | None = None,
+    basis_tbl: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """
+    Evaluate every rule in `rules` ({name: expression}) in one pass.
+
+    Returns a boolean dataframe indexed by symbol with one column per rule.
+    Missing values follow SQL's three-valued logic: a comparison with a
+    missing operand is unknown, NOT unknown stays unknown, False AND
+    unknown is False, True OR unknown is True, and a rule that ends up
+    unknown does not match.
+    """
+    symbols, col, mat = build_field_matrix(reference, live_bars=live_bars,
+                                           basis_tbl=basis_tbl)
+    asts = {name: compile_rule(expr) for name, expr in rules.items()}
+
+    unknown = set().union(set(), *(_fields_of(a) for a in asts.values())) - col.keys()
+    if unknown:
+        raise KeyError(f"unknown scan fields: {sorted(unknown)}")
+
+    memo: dict = {}
+    hits = np.empty((len(symbols), len(asts)), dtype=bool)
+    for j, ast in enumerate(asts.values()):
+        hits[:, j] = _as_bool(_eval(ast, mat, col, memo))
+
+    return pd.DataFrame(hits, index=symbols, columns=list(asts))
+
+
 def scan_prev_expiry_cross(
     reference: pd.DataFrame,
     *,
     live_bars: pd.DataFrame | None = None
-) -> tuple[pd.DataFrame, pd.DataFrame]:
-    
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+
     """
     Parameters
     ----------
@@ -29,45 +318,22 @@ def scan_prev_expiry_cross(
 
     Returns
     -------
-    breakout_df  rows that crossed above prev-expiry high OR close *today*
-    breakdown_df rows that crossed below prev-expiry low  OR close *today*
+    breakout_close, breakout_high, breakdown_close, breakdown_low
+    – rows of `reference` (+ now_price) that crossed each level *today*
     """
        # -------- 1. choose “now” price ----------------------------------------
     if live_bars is None:
         now_price = reference["cash_close_latest"].rename("now_price")
     else:
-        now_price = (
-            live_bars.sort_values("datetime")
-                     .groupby("symbol", as_index=False)
-                     .last()[["symbol", "close"]]
-                     .set_index("symbol")["close"]
-                     .rename("now_price")
-        )
-       
+        now_price = _latest_close(live_bars)
+
     joined = reference.join(now_price, how="inner").dropna()
-       
+
     # yesterday’s settle (needed to detect *new* cross)
     prev_price = reference["cash_close_prev"].rename("prev_price")
     joined = joined.join(prev_price, how="inner")
 
+    # -------- 2. conditions (one pass over the field matrix) ----------------
+    hits = run_scans(PREV_EXPIRY_SCANS, joined)
 
-    # -------- 2. conditions -------------------------------------------------
-    breakout_close = joined[
-        (joined["cash_close_latest"] <= joined["prev_expiry_close"]) &    # was ≤
-        (joined["now_price"]          > joined["prev_expiry_close"])].copy()
-    
-    breakout_high = joined[
-        (joined["cash_close_latest"] <= joined["prev_expiry_high"])  &
-        (joined["now_price"]          > joined["prev_expiry_high"])
-    ].copy()
-
-    breakdown_close = joined[
-        (joined["cash_close_latest"] >= joined["prev_expiry_close"]) &    # was ≥
-        (joined["now_price"]          < joined["prev_expiry_close"])].copy()
-    
-    breakdown_low = joined[
-        (joined["cash_close_latest"] >= joined["prev_expiry_low"])    &
-        (joined["now_price"]          < joined["prev_expiry_low"])
-    ].copy()
-
-    return breakout_close, breakout_high, breakdown_close, breakdown_low
\ No newline at end of file
+    return tuple(joined[hits[name].to_numpy()].copy() for name in PREV_EXPIRY_SCANS)
@@ -7,19 +7,24 @@ Created on Thu May  8 12:26:21 2025
 """
 
 # core/live_zerodha.py
-import pandas as pd, streamlit as st, requests, time
+import pandas as pd, requests, time, logging
 from pathlib import Path
 from utils.kite_auth import get_kite
 import datetime as dt
 import numpy as np
-from app_config import CACHE_LIVE_TTL
+from app_config import CACHE_LIVE_TTL, AUTO_REFRESH_SECS
+from core.cache import cached, MB
+from core.perf import traced, note
 
 MASTER_URL   = "https://api.kite.trade/instruments"
 MASTER_FILE  = Path("data/instruments.csv")
 REFRESH_SECS = 24 * 3600
 
+log = logging.getLogger(__name__)
+
 # ── instrument dump (auto-refresh daily) ───────────────────────────────────
-@st.cache_data(ttl=REFRESH_SECS, show_spinner=False)
+@traced
+@cached(ttl=REFRESH_SECS, max_entries=1, max_bytes=256 * MB, persist=False)
 def instrument_master() -> pd.DataFrame:
     need = (
         not MASTER_FILE.exists()
@@ -29,11 +34,13 @@ def instrument_master() -> pd.DataFrame:
         MASTER_FILE.parent.mkdir(parents=True, exist_ok=True)
         r = requests.get(MASTER_URL, timeout=30)
         r.raise_for_status()
+        note(bytes=len(r.content), net_ms=r.elapsed.total_seconds() * 1000)
         MASTER_FILE.write_bytes(r.content)
     return pd.read_csv(MASTER_FILE)
 
 
-@st.cache_data(ttl=CACHE_LIVE_TTL, show_spinner=False)
+@traced
+@cached(ttl=CACHE_LIVE_TTL, max_entries=4, max_bytes=64 * MB, persist=False)
 def live_quotes(symbols: list[str]) -> pd.DataFrame:
     """
     Robust live quote fetch:
@@ -52,7 +59,7 @@ def live_quotes(symbols: list[str]) -> pd.DataFrame:
         .drop_duplicates("tradingsymbol")
     )
     if map_df.empty:
-        st.warning("No instrument tokens found for requested symbols.")
+        log.warning("No instrument tokens found for requested symbols.")
         return pd.DataFrame()
 
     token_list = map_df["instrument_token"].astype(int).tolist()
@@ -95,7 +102,8 @@ def live_quotes(symbols: list[str]) -> pd.DataFrame:
 
 
 # -------------------------------------------------------------------------
-@st.cache_data(ttl=CACHE_LIVE_TTL, show_spinner=False)        # one REST hit every 20 s
+@traced
+@cached(ttl=CACHE_LIVE_TTL, max_entries=4, max_bytes=4 * MB, persist=False)        # one REST hit every 20 s
 def live_index_quotes(symbols: list[str]) -> pd.DataFrame:
     """
     Returns dataframe ['symbol','date','close'] with today's live close
@@ -106,7 +114,7 @@ def live_index_quotes(symbols: list[str]) -> pd.DataFrame:
     try:
         q = kite.quote(tags)
     except Exception as e:
-        st.warning(f"Index live quote error: {e}")
+        log.warning(f"Index live quote error: {e}")
         return pd.DataFrame()
 
     rows, today = [], pd.Timestamp.today().normalize()
@@ -117,7 +125,8 @@ def live_index_quotes(symbols: list[str]) -> pd.DataFrame:
 
 
 
-@st.cache_data(ttl=CACHE_LIVE_TTL)               # refresh once per minute
+@traced
+@cached(ttl=AUTO_REFRESH_SECS["straddle"], max_entries=512, max_bytes=1 * MB, persist=False)   # refresh once per minute
 def atm_straddle(symbol: str, weekly=False) -> dict | None:
     """
     Return {'strike':int, 'price':float, 'iv':float} for the current-expiry
@@ -181,7 +190,7 @@ def atm_straddle(symbol: str, weekly=False) -> dict | None:
     
     except Exception as e:
         # silently skip illiquid symbols (IDEA etc.) or log if you prefer
-        st.warning(f"{symbol}: {e}")
+        log.warning(f"{symbol}: {e}")
         #return {"strike": None, "price": None, "iv": None}
         
     
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:40:00 2026
+
+@author: varun
+"""
+
+# core/option_chain.py
+#
+# Full front-expiry option chain for every F&O underlying in one pass.
+#
+#   chain   = chain_snapshot()            # long: name, type, strike, ltp, oi, volume
+#   summary = chain_summary(chain)        # one row per underlying: PCR, max pain, walls
+#
+# The chain is resolved from instrument_master() once per day, then every
+# strike (plus each name's front future) is quoted in QUOTE_BATCH-token
+# requests paced to QUOTE_RATE – ~35k instruments ≈ 70 requests ≈ 70 s,
+# well inside the worker's refresh interval.  atm_straddle() stays the
+# cheap two-leg path for the straddle tables.
+#
+# The summary is computed on a (name, strike) × CE/PE frame with group
+# cumsums, so max pain for the whole universe is a handful of vector ops:
+#
+#   pain(K) = Σ_CE oi·max(K − k, 0) + Σ_PE oi·max(k − K, 0)
+import datetime as dt
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from app_config import CACHE_LIVE_TTL
+from core.cache import cached, MB
+from core.live_zerodha import instrument_master, get_kite, REFRESH_SECS
+from core.perf import traced, note
+
+QUOTE_BATCH = 500       # instruments per kite.quote call (API maximum)
+QUOTE_RATE  = 1.0       # quote requests per second (Kite limit)
+RETRIES     = 2
+
+log = logging.getLogger(__name__)
+
+
+# ─── instruments ────────────────────────────────────────────────────────────
+@traced
+@cached(ttl=REFRESH_SECS, max_entries=2, max_bytes=64 * MB, persist=False)
+def chain_instruments(day: str) -> pd.DataFrame:
+    """
+    Front-expiry (nearest ≥ `day`) options of every F&O underlying plus its
+    front future: instrument_token, name, type (CE/PE/FUT), strike, expiry.
+    """
+    m = instrument_master()
+    m = m.loc[m["segment"].isin(["NFO-OPT", "NFO-FUT"]) & (m["expiry"] >= day),
+              ["instrument_token", "name", "segment", "instrument_type", "strike", "expiry"]]
+    front = m.groupby(["name", "segment"])["expiry"].transform("min")
+    m = m[m["expiry"] == front]
+    return pd.DataFrame({
+        "instrument_token": m["instrument_token"].astype("int64"),
+        "name":   m["name"].astype("category"),
+        "type":   m["instrument_type"].astype("category"),
+        "strike": m["strike"].astype("float32"),
+        "expiry": pd.to_datetime(m["expiry"]),
+    }).reset_index(drop=True)
+
+
+# ─── quotes ─────────────────────────────────────────────────────────────────
+def _quote(kite, tokens: list[int]) -> dict:
+    for attempt in range(RETRIES + 1):
+        try:
+            return kite.quote(tokens)
+        except Exception as e:
+            if attempt == RETRIES:
+                log.warning(f"chain quote batch of {len(tokens)} failed: {e}")
+                return {}
+            time.sleep(1 / QUOTE_RATE)
+
+
+def quote_batches(tokens: list[int]) -> pd.DataFrame:
+    """ltp / oi / volume for `tokens`, QUOTE_BATCH per request at ≤ QUOTE_RATE req/s."""
+    kite = get_kite()
+    rows, last = [], 0.0
+    for i in range(0, len(tokens), QUOTE_BATCH):
+        wait = last + 1 / QUOTE_RATE - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        last = time.monotonic()
+        q = _quote(kite, tokens[i:i + QUOTE_BATCH])
+        rows += [(int(tok), d["last_price"], d.get("oi", 0), d.get("volume", 0))
+                 for tok, d in q.items()]
+    note(rows_out=len(rows))
+    return pd.DataFrame(rows, columns=["instrument_token", "ltp", "oi", "volume"])
+
+
+@traced
+@cached(ttl=CACHE_LIVE_TTL, max_entries=2, max_bytes=64 * MB, persist=False)
+def chain_snapshot(underlyings: list[str] | None = None) -> pd.DataFrame:
+    """
+    Live front-expiry chain for `underlyings` (default: all F&O names),
+    compact dtypes so it can go straight into a snapshot.
+    """
+    inst = chain_instruments(dt.date.today().isoformat())
+    if underlyings is not None:
+        inst = inst[inst["name"].isin(underlyings)]
+    quotes = quote_batches(inst["instrument_token"].tolist())
+    chain = inst.merge(quotes, on="instrument_token", how="inner")
+    return chain.astype({"ltp": "float32", "oi": "int64", "volume": "int64"})
+
+
+# ─── per-underlying reductions ──────────────────────────────────────────────
+@traced
+@cached(ttl=CACHE_LIVE_TTL, max_entries=4, max_bytes=4 * MB, persist=False)
+def chain_summary(chain: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per underlying:
+
+    Fut, ATM, Straddle        – front future, nearest strike, CE+PE there
+    PCR OI, PCR Vol           – Σ PE / Σ CE open interest and volume
+    Max pain, Max pain %      – strike minimising writers' payout, vs Fut
+    Call wall, Put wall       – strike with the most CE / PE OI
+    CE OI strike, PE OI strike – OI-weighted average strike per side
+    """
+    fut = chain[chain["type"] == "FUT"].groupby("name", observed=True)["ltp"].first()
+    opt = chain[chain["type"].isin(["CE", "PE"])]
+
+    w = (opt.groupby(["name", "strike", "type"], observed=True)[["oi", "volume", "ltp"]]
+            .sum()
+            .unstack("type", fill_value=0))
+    w.columns = [f"{t.lower()}_{f}" for f, t in w.columns]
+    w = w.reindex(columns=[f"{t}_{f}" for f in ("oi", "volume", "ltp") for t in ("ce", "pe")],
+                  fill_value=0).astype("float64")
+    names = w.index.get_level_values("name")
+    k = w.index.get_level_values("strike").to_numpy(dtype=float)
+    g = w.groupby(level="name", observed=True)
+
+    # max pain via cumulative sums over ascending strikes
+    ce_koi = pd.Series(k * w["ce_oi"].to_numpy(), index=w.index)
+    pe_koi = pd.Series(k * w["pe_oi"].to_numpy(), index=w.index)
+    ce_pain = k * g["ce_oi"].cumsum() - ce_koi.groupby(level="name", observed=True).cumsum()
+    pe_le_oi = g["pe_oi"].cumsum()
+    pe_le_koi = pe_koi.groupby(level="name", observed=True).cumsum()
+    pe_pain = ((pe_koi.groupby(level="name", observed=True).transform("sum") - pe_le_koi)
+               - k * (g["pe_oi"].transform("sum") - pe_le_oi))
+    pain = ce_pain + pe_pain
+
+    def strike_at(pos: pd.Series) -> pd.Series:
+        return pd.Series(k[w.index.get_indexer(pos)], index=pos.index)
+
+    tot = g[["ce_oi", "pe_oi", "ce_volume", "pe_volume"]].sum()
+    out = pd.DataFrame({
+        "Expiry":       opt.groupby("name", observed=True)["expiry"].first(),
+        "Fut":          fut,
+        "PCR OI":       tot["pe_oi"] / tot["ce_oi"].replace(0, np.nan),
+        "PCR Vol":      tot["pe_volume"] / tot["ce_volume"].replace(0, np.nan),
+        "Max pain":     strike_at(pain.groupby(level="name", observed=True).idxmin()),
+        "Call wall":    strike_at(g["ce_oi"].idxmax()),
+        "Put wall":     strike_at(g["pe_oi"].idxmax()),
+        "CE OI strike": ce_koi.groupby(level="name", observed=True).sum()
+                        / tot["ce_oi"].replace(0, np.nan),
+        "PE OI strike": pe_koi.groupby(level="name", observed=True).sum()
+                        / tot["pe_oi"].replace(0, np.nan),
+    })
+
+    # ATM straddle off the same frame
+    spot = out["Fut"].reindex(names).to_numpy()
+    dist = pd.Series(np.abs(k - spot), index=w.index).dropna()
+    atm = dist.groupby(level="name", observed=True).idxmin()
+    legs = w.loc[atm.to_list(), ["ce_ltp", "pe_ltp"]].sum(axis=1).to_numpy()
+    out["ATM"] = strike_at(atm)
+    out["Straddle"] = pd.Series(legs, index=atm.index)
+    out["Max pain %"] = (out["Max pain"] / out["Fut"] - 1) * 100
+
+    out.index.name = None
+    return out[["Expiry", "Fut", "ATM", "Straddle", "PCR OI", "PCR Vol", "Max pain",
+                "Max pain %", "Call wall", "Put wall", "CE OI strike", "PE OI strike"]
+               ].sort_index()
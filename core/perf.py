@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:20:00 2026
+
+@author: varun
+"""
+
+# core/perf.py
+#
+# Lightweight instrumentation for the compute layer.
+#
+#   with perf.run("app"):             # one Streamlit rerun / worker refresh
+#       cash_all()                    # @traced → one event
+#
+# Every @traced call records wall time, rows in / out, the cache outcome
+# and argument-hashing time (noted by core.cache), bytes fetched from the
+# API and the number of Kite calls.  Nested calls keep their depth so a run
+# reads like a call tree; `self_ms` excludes time spent in traced children.
+#
+# A finished run is written to the "perf" logger as one JSON line per event.
+# Calls made outside a run (fragment reruns, scripts) are logged as they
+# finish.  Nothing is printed unless that logger is enabled.
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+log = logging.getLogger("perf")
+
+_local = threading.local()
+
+_COLUMNS = ["fn", "depth", "ms", "self_ms", "rows_in", "rows_out", "cache",
+            "hash_ms", "bytes", "net_ms", "parse_ms", "kite_calls", "error"]
+
+
+def _stack() -> list[dict]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _rows(obj) -> int:
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return len(obj)
+    if isinstance(obj, (list, tuple)):
+        return sum(_rows(o) for o in obj)
+    if isinstance(obj, dict):
+        return sum(_rows(v) for v in obj.values())
+    return 0
+
+
+def _emit(run_id: str | None, ev: dict) -> None:
+    if log.isEnabledFor(logging.INFO):
+        log.info(json.dumps(dict(ev, run_id=run_id), default=str))
+
+
+# ─── recording ──────────────────────────────────────────────────────────────
+@contextmanager
+def span(name: str, rows_in: int = 0):
+    """Time a block as one event; yields the event dict for extra fields."""
+    stack = _stack()
+    ev = {"fn": name, "depth": len(stack), "rows_in": rows_in, "rows_out": 0,
+          "cache": None, "kite_calls": 0, "bytes": 0, "error": None}
+    current = getattr(_local, "run", None)
+    if current is not None:
+        current["events"].append(ev)
+
+    stack.append(ev)
+    t0 = time.perf_counter()
+    try:
+        yield ev
+    except Exception as e:
+        ev["error"] = type(e).__name__
+        raise
+    finally:
+        stack.pop()
+        ev["ms"] = (time.perf_counter() - t0) * 1000
+        ev["self_ms"] = ev["ms"] - ev.pop("_child_ms", 0.0)
+        if stack:
+            stack[-1]["_child_ms"] = stack[-1].get("_child_ms", 0.0) + ev["ms"]
+        if current is None:
+            _emit(None, ev)
+
+
+def traced(func):
+    """Record every call of `func` (wall time, rows in / out, notes)."""
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(name, _rows((args, kwargs))) as ev:
+            out = func(*args, **kwargs)
+            ev["rows_out"] = _rows(out)
+        return out
+
+    return wrapper
+
+
+def note(fn: str | None = None, **fields) -> None:
+    """
+    Attach fields to the innermost running event.  Numbers accumulate,
+    anything else overwrites.  With `fn` the note is dropped unless the
+    innermost event is that function (so an untraced cached function does
+    not report its cache hit against its caller).
+    """
+    stack = _stack()
+    if not stack or (fn is not None and stack[-1]["fn"] != fn):
+        return
+    ev = stack[-1]
+    for k, v in fields.items():
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            ev[k] = ev.get(k, 0) + v
+        else:
+            ev[k] = v
+
+
+def response_json(resp):
+    """`resp.json()` with payload size, network and parse time noted."""
+    t0 = time.perf_counter()
+    data = resp.json()
+    note(bytes=len(resp.content),
+         net_ms=resp.elapsed.total_seconds() * 1000,
+         parse_ms=(time.perf_counter() - t0) * 1000)
+    return data
+
+
+# ─── runs ───────────────────────────────────────────────────────────────────
+def begin(label: str) -> dict:
+    """
+    Start collecting events on this thread.  For code that cannot sit in a
+    `with` block (a Streamlit script); an unfinished run left behind by an
+    interrupted rerun is flushed first.
+    """
+    finish()
+    _stack().clear()
+    rec = {"run_id": uuid.uuid4().hex[:12], "label": label,
+           "started": time.time(), "events": []}
+    _local.run = rec
+    return rec
+
+
+def finish() -> dict | None:
+    """Stop the current run, log its events and return it."""
+    rec = getattr(_local, "run", None)
+    _local.run = None
+    if rec is not None:
+        for ev in rec["events"]:
+            _emit(rec["run_id"], dict(ev, label=rec["label"]))
+    return rec
+
+
+@contextmanager
+def run(label: str):
+    """
+    Collect every event in the block into one run, then log it.  A run
+    opened inside another one is logged on its own and the outer run
+    resumes afterwards (use span() to record a block into the outer run).
+    """
+    outer, outer_stack = getattr(_local, "run", None), _stack()
+    _local.run, _local.stack = None, []
+    rec = begin(label)
+    try:
+        yield rec
+    finally:
+        finish()
+        _local.run, _local.stack = outer, outer_stack
+
+
+def current_run() -> dict | None:
+    return getattr(_local, "run", None)
+
+
+def events_frame(rec: dict | None = None) -> pd.DataFrame:
+    """Events of `rec` (default: the current run) in call order."""
+    rec = rec or current_run()
+    df = pd.DataFrame((rec or {}).get("events", []))
+    if df.empty:
+        return pd.DataFrame(columns=_COLUMNS)
+    df = df.reindex(columns=_COLUMNS)
+    df["fn"] = ["· " * d + f for d, f in zip(df["depth"], df["fn"])]
+    return df.drop(columns="depth")
+
+
+def run_summary(rec: dict | None = None) -> dict:
+    """Totals for one run: wall time in top-level calls, bytes, Kite calls, hits."""
+    rec = rec or current_run()
+    evs = (rec or {}).get("events", [])
+    top = [e for e in evs if e["depth"] == 0]
+    return {
+        "calls":      len(evs),
+        "ms":         sum(e.get("ms", 0.0) for e in top),
+        "bytes":      sum(e.get("bytes", 0) for e in evs),
+        "kite_calls": sum(e.get("kite_calls", 0) for e in evs),
+        "cache_hits": sum(e.get("cache") in ("mem", "disk") for e in evs),
+        "cache_miss": sum(e.get("cache") == "miss" for e in evs),
+    }
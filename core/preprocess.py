@@ -7,8 +7,11 @@ Created on Mon May  5 10:26:45 2025
 """
 
 # core/preprocess.py
-import pandas as pd, streamlit as st, datetime as dt
+import pandas as pd, datetime as dt
 from app_config import CACHE_LIVE_TTL, CACHE_SQL_TTL
+from core.cache import cached, MB
+from core.perf import traced
+from core.trading_calendar import window_start
 from core.fetch import cash_all, index_all
 from core.live_zerodha import live_quotes, live_index_quotes
 
@@ -17,7 +20,8 @@ TODAY_STR  = TODAY.strftime("%d %b %Y")
 
 
     
-@st.cache_data(ttl=CACHE_LIVE_TTL)
+@traced
+@cached(ttl=CACHE_LIVE_TTL, max_entries=2, max_bytes=1024 * MB)
 def cash_with_live(use_live: bool):
     df = cash_all()
     if not use_live:
@@ -36,7 +40,8 @@ def cash_with_live(use_live: bool):
 
 
 
-@st.cache_data(ttl=CACHE_LIVE_TTL, show_spinner=False)
+@traced
+@cached(ttl=CACHE_LIVE_TTL, max_entries=2, max_bytes=256 * MB)
 def index_with_live(use_live: bool) -> pd.DataFrame:
     """
     Historical index data (+today's live close if use_live==True).
@@ -60,9 +65,10 @@ def index_with_live(use_live: bool) -> pd.DataFrame:
 
 
 
-@st.cache_data(ttl=CACHE_LIVE_TTL, show_spinner=False)
 # ─── Breadth helpers ─────────────────────────────────────────────────────────
 
+@traced
+@cached(ttl=CACHE_LIVE_TTL, max_entries=2, max_bytes=64 * MB)
 def breadth_panels(cash_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     work = cash_df.copy().sort_values(["symbol", "date"])
 
@@ -99,10 +105,11 @@ def breadth_panels(cash_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     )
 
     # keep last 12 months
-    cut = work["date"].max() - pd.DateOffset(months=12)
+    cut = window_start(work["date"].max(), months=12)
     return ema_pct.loc[cut:], nnhl.loc[cut:]
 
-@st.cache_data(ttl=CACHE_LIVE_TTL, show_spinner=False)
+@traced
+@cached(ttl=CACHE_LIVE_TTL, max_entries=2, max_bytes=64 * MB)
 def compute_adv_decl(cash_df: pd.DataFrame):
     """
     Return two dataframes:
@@ -117,7 +124,7 @@ def compute_adv_decl(cash_df: pd.DataFrame):
             work.groupby("symbol")["close"].transform(lambda x: x.ewm(span=span).mean())
         )
 
-    cutoff = work["date"].max() - pd.DateOffset(months=3)
+    cutoff = window_start(work["date"].max(), months=3)
     last_12m = work[work["date"] >= cutoff].copy()
 
     last_12m["direction"] = last_12m.groupby("symbol")["close"].diff()
@@ -146,10 +153,11 @@ def compute_adv_decl(cash_df: pd.DataFrame):
 
 
 
-@st.cache_data(ttl=CACHE_LIVE_TTL, show_spinner=False)
+@traced
+@cached(ttl=CACHE_LIVE_TTL, max_entries=2, max_bytes=64 * MB)
 def official_sector(idx_df: pd.DataFrame):
     # restrict to 400-day window
-    idx_400 = idx_df[idx_df["date"] >= idx_df["date"].max() - pd.Timedelta(days=400)]
+    idx_400 = idx_df[idx_df["date"] >= window_start(idx_df["date"].max(), days=400)]
 
     nifty_close = (
         idx_400[idx_400["symbol"] == "NIFTY 50"]
@@ -186,7 +194,8 @@ def official_sector(idx_df: pd.DataFrame):
 
 
 
-@st.cache_data(ttl=CACHE_LIVE_TTL, show_spinner=False)
+@traced
+@cached(ttl=CACHE_LIVE_TTL, max_entries=2, max_bytes=64 * MB)
 def equal_weight_sector(cash_df: pd.DataFrame, const_df: pd.DataFrame, idx_df: pd.DataFrame):
     """
     Returns:
@@ -195,7 +204,7 @@ def equal_weight_sector(cash_df: pd.DataFrame, const_df: pd.DataFrame, idx_df: p
     """
     lookbacks = [1, 3, 5, 20, 60, 250]
 
-    cash_400 = cash_df[cash_df["date"] >= cash_df["date"].max() - pd.Timedelta(days=400)]
+    cash_400 = cash_df[cash_df["date"] >= window_start(cash_df["date"].max(), days=400)]
     cash_400 = cash_400.merge(const_df[["Symbol", "Sector"]],
                               left_on="symbol", right_on="Symbol")
 
@@ -239,9 +248,10 @@ def equal_weight_sector(cash_df: pd.DataFrame, const_df: pd.DataFrame, idx_df: p
 
 
 
-@st.cache_data(ttl=CACHE_LIVE_TTL, show_spinner=False)
+@traced
+@cached(ttl=CACHE_LIVE_TTL, max_entries=2, max_bytes=32 * MB)
 def fno_oi_processing(fno_df, cash_df):
-    fno_df.sort_values(["symbol", "date"], inplace=True)
+    fno_df = fno_df.sort_values(["symbol", "date"])     # input may be a shared snapshot
   
     latest_date = fno_df['date'].max()
     fno_syms = fno_df[fno_df['date']==latest_date]['symbol'].to_list()
@@ -360,7 +370,8 @@ def fno_oi_processing(fno_df, cash_df):
     return combined, prev_expiry, latest_expiry, cash_latest_date
 
 
-@st.cache_data(ttl=CACHE_LIVE_TTL, show_spinner=False)
+@traced
+@cached(ttl=CACHE_LIVE_TTL, max_entries=32, max_bytes=128 * MB, persist=False)
 def stock_explorer_processing(cash_df, choice, fno_df, win_days, nifty_df, prev_expiry):
     price_df = cash_df.copy()
     price_df = price_df[price_df["symbol"] == choice.upper()]
@@ -368,8 +379,7 @@ def stock_explorer_processing(cash_df, choice, fno_df, win_days, nifty_df, prev_
     
     
     if price_df.empty:
-        st.warning("No price data found for this symbol.")
-        st.stop()
+        raise LookupError(f"No price data found for {choice}.")
 
 
     # ----------- prep & filtering -------------------------------------------
@@ -384,7 +394,7 @@ def stock_explorer_processing(cash_df, choice, fno_df, win_days, nifty_df, prev_
     )
 
     # window filter
-    cutoff = price_df["date"].max() - pd.Timedelta(days=win_days)
+    cutoff = window_start(price_df["date"].max(), days=win_days)
     price_df = price_df[price_df["date"] >= cutoff]
     select_nifty_df = nifty_df[nifty_df["date"] >= cutoff]
     ind_df   = ind_df[ind_df["date"] >= cutoff]
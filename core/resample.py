@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 19:10:00 2026
+
+@author: varun
+"""
+
+# core/resample.py
+#
+# Minute bars → 5 / 15 / 60-minute OHLCV bars for every symbol at once.
+#
+#   bars5 = resample(cash_bars, "5m", key="cash")
+#
+# Buckets are anchored at the 09:15 open (09:15, 09:20, … / 09:15, 10:15, …)
+# and labelled by their start.  One lexsort of (bucket, symbol, time) and a
+# set of ufunc.reduceat calls build all symbols in a single pass – no
+# groupby, no per-symbol loop.
+#
+# With a `key` the completed buckets are kept between polls: the next call
+# only re-aggregates bars from the first still-open bucket on, so a live
+# refresh costs one bucket per symbol instead of the whole session.  A
+# bucket counts as closed once the newest bar is LATE past its end; if
+# rows show up in an already-closed stretch (late prints, a different
+# symbol set under the same key) the cache is rebuilt from scratch.  The
+# cache is shared by every session (under a lock) and holds the
+# MAX_STREAMS most recently used (key, timeframe) streams.
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from core.perf import traced, note
+
+TIMEFRAMES   = {"1m": 1, "5m": 5, "15m": 15, "60m": 60}
+SESSION_OPEN = pd.Timedelta("9h15min")
+LATE         = pd.Timedelta("2min")       # allowance for bars that land late
+MAX_STREAMS  = 16
+
+_NS_DAY = 86_400 * 10**9
+
+# how each column folds into a bucket (others are dropped)
+_AGG = {"open": "first", "high": "max", "low": "min", "close": "last",
+        "volume": "sum", "oi": "last"}
+
+# (key, minutes) → (raw rows consumed, cut, completed buckets), LRU order
+_done: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+def _minutes(timeframe) -> int:
+    return TIMEFRAMES[timeframe] if isinstance(timeframe, str) else int(timeframe)
+
+
+def bucket_start(ns: np.ndarray, minutes: int) -> np.ndarray:
+    """Bucket start (int64 ns, tz-naive wall time) for each timestamp."""
+    step = minutes * 60 * 10**9
+    anchor = ns - ns % _NS_DAY + SESSION_OPEN.value
+    return anchor + (ns - anchor) // step * step
+
+
+def _wall_ns(s: pd.Series) -> np.ndarray:
+    idx = pd.DatetimeIndex(s)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.as_unit("ns").asi8
+
+
+def aggregate(bars: pd.DataFrame, minutes: int) -> pd.DataFrame:
+    """
+    OHLCV(+OI) per (bucket, symbol) for long minute bars, sorted by
+    datetime then symbol.  Output has datetime, symbol and whichever of
+    open/high/low/close/volume/oi the input carries.
+    """
+    cols = [c for c in _AGG if c in bars]
+    if bars.empty:
+        return bars[["datetime", "symbol", *cols]].iloc[:0]
+
+    t = _wall_ns(bars["datetime"])
+    b = bucket_start(t, minutes)
+    sym, names = pd.factorize(bars["symbol"], sort=True)     # codes in symbol order
+
+    order = np.lexsort((t, sym, b))
+    s, bb = sym[order], b[order]
+    new = np.empty(len(s), dtype=bool)
+    new[0] = True
+    new[1:] = (s[1:] != s[:-1]) | (bb[1:] != bb[:-1])
+    starts = np.flatnonzero(new)
+    ends = np.append(starts[1:], len(s)) - 1
+
+    stamp = pd.DatetimeIndex(bb[starts].astype("datetime64[ns]"))
+    tz = getattr(bars["datetime"].dtype, "tz", None)
+    out = {"datetime": stamp.tz_localize(tz) if tz else stamp,
+           "symbol":   names.take(s[starts])}
+    for col in cols:
+        v = bars[col].to_numpy(dtype=float)[order]
+        how = _AGG[col]
+        if how == "first":
+            out[col] = v[starts]
+        elif how == "last":
+            out[col] = v[ends]
+        elif how == "max":
+            out[col] = np.fmax.reduceat(v, starts)
+        elif how == "min":
+            out[col] = np.fmin.reduceat(v, starts)
+        else:
+            out[col] = np.add.reduceat(np.nan_to_num(v), starts)
+    return pd.DataFrame(out)
+
+
+@traced
+def resample(bars: pd.DataFrame, timeframe="5m", key: str | None = None) -> pd.DataFrame:
+    """
+    `bars` at `timeframe` ("1m", "5m", "15m", "60m" or minutes).  "1m"
+    returns the input unchanged.  Pass a `key` per bar stream ("cash",
+    "fut", …) to reuse completed buckets across polls.
+    """
+    minutes = _minutes(timeframe)
+    if minutes <= 1 or bars.empty:
+        return bars
+    if key is None:
+        return aggregate(bars, minutes)
+
+    t = _wall_ns(bars["datetime"])
+    cut = bucket_start(np.array([t.max() - LATE.value]), minutes)[0]
+
+    with _lock:
+        n_rows, start, done = _done.get((key, minutes), (0, None, None))
+    old = np.zeros(len(t), dtype=bool)
+    if start is not None:
+        old = t < start
+        if int(old.sum()) != n_rows or cut < start:    # stale – rebuild
+            old[:], done = False, None
+
+    fresh = aggregate(bars[~old], minutes)
+    closed = _wall_ns(fresh["datetime"]) < cut
+    done = fresh[closed] if done is None else pd.concat([done, fresh[closed]])
+    done = done.reset_index(drop=True)
+    with _lock:
+        _done[(key, minutes)] = (int((t < cut).sum()), cut, done)
+        _done.move_to_end((key, minutes))
+        while len(_done) > MAX_STREAMS:
+            _done.popitem(last=False)
+
+    note(rows_in=len(bars) - int(old.sum()))
+    return pd.concat([done, fresh[~closed]], ignore_index=True)
@@ -8,11 +8,11 @@ Created on Wed May  7 10:59:37 2025
 
 # core/sector.py
 import pandas as pd
-import streamlit as st
+from core.cache import cached, MB
 
 LOOKBACKS = [1, 3, 5, 20, 60, 250]
 
-@st.cache_data(ttl="2h")
+@cached(ttl="2h", max_entries=32, max_bytes=16 * MB, persist=False)
 def constituent_returns(sector: str,
                         cash_df: pd.DataFrame,
                         idx_df: pd.DataFrame,
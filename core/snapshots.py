@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:30:00 2026
+
+@author: varun
+"""
+
+# core/snapshots.py
+#
+# Versioned on-disk snapshots of every derived dashboard table.
+# The refresh worker (worker.py) publishes; Streamlit sessions only read.
+#
+#   SNAPSHOT_DIR/{eod,live}/
+#       CURRENT                     ← name of the live version (atomic swap)
+#       .lock                       ← host-wide refresh lock
+#       20261019T093000123456/
+#           meta.json               ← scalars (expiries, dates, flags)
+#           <table>.parquet         ← derived tables
+#           <table>.arrow           ← base datasets (MMAP_TABLES), Arrow IPC
+#
+# Base datasets are written as uncompressed Arrow IPC files and loaded via
+# a read-only memory map, so every Streamlit process on the host shares the
+# same page-cache pages instead of holding its own copy.  Old versions can
+# be pruned while a process still maps them: the pages stay valid until the
+# last mapping goes away.
+import datetime as dt
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:                 # Windows – no host lock, worst case two refreshes
+    fcntl = None
+
+from app_config import SNAPSHOT_DIR, SNAPSHOT_KEEP
+
+_POINTER = "CURRENT"
+_META    = "meta.json"
+_LOCK    = ".lock"
+
+MMAP_TABLES = ("cash", "index", "fno_stock")
+
+
+def _root(root=None) -> Path:
+    return Path(root or SNAPSHOT_DIR)
+
+
+def mode_root(use_live: bool) -> Path:
+    """Snapshot directory for EOD-only or live-quote data."""
+    return Path(SNAPSHOT_DIR) / ("live" if use_live else "eod")
+
+
+@contextmanager
+def host_lock(root=None):
+    """Exclusive host-wide lock so a refresh runs once, not once per process."""
+    root = _root(root)
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / _LOCK, "w") as fh:
+        if fcntl:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _write_arrow(df: pd.DataFrame, path: Path) -> None:
+    table = pa.Table.from_pandas(df)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_arrow(path: Path) -> pd.DataFrame:
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    # split_blocks keeps numeric columns as zero-copy views of the mapping
+    return table.to_pandas(split_blocks=True)
+
+
+def _to_frame(obj) -> pd.DataFrame:
+    df = obj.to_frame() if isinstance(obj, pd.Series) else obj
+    df = df.copy()
+    df.columns = [str(c) for c in df.columns]          # parquet wants str names
+    return df
+
+
+def publish(tables: dict[str, pd.DataFrame], meta: dict | None = None,
+            root=None, keep: int = SNAPSHOT_KEEP) -> str:
+    """
+    Write `tables` + `meta` as a new version and make it current.
+
+    The version directory is fully written under a temp name and renamed
+    into place before CURRENT is swapped, so readers never see a partial
+    snapshot.  Returns the version string.
+    """
+    root = _root(root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    version = dt.datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    tmp = root / f".{version}.tmp"
+    tmp.mkdir()
+
+    for name, df in tables.items():
+        if name in MMAP_TABLES:
+            _write_arrow(_to_frame(df), tmp / f"{name}.arrow")
+        else:
+            _to_frame(df).to_parquet(tmp / f"{name}.parquet")
+
+    meta = dict(meta or {}, version=version, tables=sorted(tables),
+                published_at=dt.datetime.now().isoformat())
+    (tmp / _META).write_text(json.dumps(meta, default=str, indent=1))
+
+    os.rename(tmp, root / version)
+
+    ptr_tmp = root / f".{_POINTER}.{version}"
+    ptr_tmp.write_text(version)
+    os.replace(ptr_tmp, root / _POINTER)               # atomic switch
+
+    prune(root, keep)
+    return version
+
+
+def prune(root=None, keep: int = SNAPSHOT_KEEP) -> None:
+    """Delete all but the newest `keep` versions (never the current one)."""
+    root = _root(root)
+    current = current_version(root)
+    versions = sorted(p for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for path in versions[:-keep] if keep else versions:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def current_version(root=None) -> str | None:
+    ptr = _root(root) / _POINTER
+    if not ptr.exists():
+        return None
+    version = ptr.read_text().strip()
+    return version if (_root(root) / version).is_dir() else None
+
+
+def load_meta(version: str, root=None) -> dict:
+    return json.loads((_root(root) / version / _META).read_text())
+
+
+def load_table(version: str, name: str, root=None) -> pd.DataFrame:
+    """Load one table; base datasets come back memory-mapped (read-only)."""
+    path = _root(root) / version / name
+    if path.with_suffix(".arrow").exists():
+        return _read_arrow(path.with_suffix(".arrow"))
+    return pd.read_parquet(path.with_suffix(".parquet"))
+
+
+def snapshot_age(meta: dict) -> pd.Timedelta:
+    return pd.Timestamp.now() - pd.Timestamp(meta["published_at"])
@@ -8,55 +8,82 @@ Created on Tue May  6 11:30:00 2025
 
 # core/straddles.py
 import pandas as pd
-import streamlit as st
+import logging
 from datetime import timedelta
 from core.fetch import fno_stock_all, fno_index_all, cash_all, index_all
 from core.live_zerodha import atm_straddle, get_kite
 from typing import Union
+from core.cache import cached, MB
+from core.perf import traced
+from core.trading_calendar import session_back, sessions, check_coverage
+from app_config import CACHE_SQL_TTL, AUTO_REFRESH_SECS
      # we already cache both
 
+log = logging.getLogger(__name__)
 
 
-def _change_cols(df: pd.DataFrame, price_col: str, iv_col: str, pct_price=True):
+
+LOOKBACKS = (1, 2, 3, 5)
+
+
+def change_table(df: pd.DataFrame, price_col: str, iv_col: str) -> pd.DataFrame:
     """
-    Build a 1‑row Series with latest level + 1/2/3/5‑day changes.
+    One row per symbol: latest level + 1/2/3/5-session changes, all symbols
+    in one pass over the date-sorted frame.
 
     price  → % change
     IV     → absolute change
     """
-    df = df.sort_values("date")
-    # price % changes
-    df["p_Δ1"] = df[price_col].pct_change(1) * 100
-    df["p_Δ2"] = df[price_col].pct_change(2) * 100
-    df["p_Δ3"] = df[price_col].pct_change(3) * 100
-    df["p_Δ5"] = df[price_col].pct_change(5) * 100
-    # iv   absolute changes
-    df["iv_Δ1"] = df[iv_col].diff(1)
-    df["iv_Δ2"] = df[iv_col].diff(2)
-    df["iv_Δ3"] = df[iv_col].diff(3)
-    df["iv_Δ5"] = df[iv_col].diff(5)
-
-    latest = df.iloc[-1]
-    return pd.Series(
-        {
-            "Straddle": latest[price_col],
-            "IV": latest[iv_col],
-            "Δ1 d %": latest["p_Δ1"],
-            "Δ1 d IV": latest["iv_Δ1"],
-            "Δ2 d %": latest["p_Δ2"],
-            "Δ2 d IV": latest["iv_Δ2"],
-            "Δ3 d %": latest["p_Δ3"],
-            "Δ3 d IV": latest["iv_Δ3"],
-            "Δ5 d %": latest["p_Δ5"],
-            "Δ5 d IV": latest["iv_Δ5"],
-        }
-    )
-
-
-
-@st.cache_data(ttl="1h")
-def straddle_tables():
+    work = df[["symbol", "date", price_col, iv_col]].sort_values(["symbol", "date"],
+                                                                 kind="stable")
+    work["back"] = work.groupby("symbol", sort=False).cumcount(ascending=False)  # 0 = latest
+    wide = (work[work["back"] <= max(LOOKBACKS)]
+            .pivot(index="symbol", columns="back", values=[price_col, iv_col])
+            .reindex(columns=range(max(LOOKBACKS) + 1), level=1))
+    price, iv = wide[price_col], wide[iv_col]
+
+    out = pd.DataFrame({"Straddle": price[0], "IV": iv[0]})
+    for k in LOOKBACKS:
+        out[f"Δ{k} d %"]  = (price[0] / price[k] - 1) * 100
+        out[f"Δ{k} d IV"] = iv[0] - iv[k]
+    out.index.name = None
+    out.columns.name = None
+    return out
+
+
+def live_straddle_rows(symbols, weekly: bool = False) -> pd.DataFrame:
+    """Today's ATM straddle (symbol, date, price, iv) for every symbol Kite quotes."""
+    today = pd.Timestamp.today().normalize()
+    rows = []
+    for sym in symbols:
+        live = atm_straddle(sym, weekly=weekly)
+        if live and live["price"] is not None:
+            rows.append({"symbol": sym, "date": today,
+                         "price": live["price"], "iv": live["iv"]})
+    return pd.DataFrame(rows, columns=["symbol", "date", "price", "iv"])
+
+
+def _series_table(df, price_col, iv_col, live: pd.DataFrame | None = None):
+    """
+    change_table, with the live rows as the latest session – they replace
+    any EOD row already stamped with today's date, so Δ1 is measured
+    against the previous session, not today's own close.
     """
+    if live is not None and not live.empty:
+        df = (pd.concat([df[["symbol", "date", price_col, iv_col]],
+                         live.rename(columns={"price": price_col, "iv": iv_col})],
+                        ignore_index=True)
+                .drop_duplicates(["symbol", "date"], keep="last"))
+    return change_table(df, price_col, iv_col)
+
+
+@traced
+@cached(ttl=AUTO_REFRESH_SECS["straddle"], max_entries=2, max_bytes=16 * MB, persist=False)
+def straddle_tables(use_live: bool = False):
+    """
+    use_live → latest level and Δ columns from live ATM straddles (Kite),
+    appended to the history as today's session.
+
     Returns:
         idx_tbl  – index straddles (weekly, monthly)
         stk_tbl  – stock straddles
@@ -64,124 +91,136 @@ def straddle_tables():
     stock_df = fno_stock_all()
     idx_df   = fno_index_all()
 
-    # keep only last ~10 calendar days
-    cutoff = max(stock_df["date"].max(), idx_df["date"].max()) - pd.Timedelta(days=10)
+    # keep only the sessions change_table looks back over
+    cutoff = session_back(max(stock_df["date"].max(), idx_df["date"].max()), max(LOOKBACKS))
     stock_df = stock_df[stock_df["date"] >= cutoff]
     idx_df   = idx_df[idx_df["date"] >= cutoff]
 
-    # ── index side ───────────────────────────────────────────────────────────
-    idx_rows = []
-
-    for sym, sub in idx_df.groupby("symbol"):
-        sub = sub.copy()
-        if sym.upper() == "NIFTY":   # two rows: weekly & monthly
-            idx_rows.append(
-                _change_cols(
-                    sub, "front_weekly_straddle_price", "front_weekly_straddle_iv"
-                ).rename("NIFTY – WEEKLY")
-            )
-            idx_rows.append(
-                _change_cols(
-                    sub, "front_monthly_straddle_price", "front_monthly_straddle_iv"
-                ).rename("NIFTY – MONTHLY")
-            )
-        else:                            # other indices → only monthly
-            if "front_monthly_straddle_price" in sub.columns:
-                idx_rows.append(
-                    _change_cols(
-                        sub, "front_monthly_straddle_price", "front_monthly_straddle_iv"
-                    ).rename(sym)
-                )
-
-    idx_tbl = pd.DataFrame(idx_rows)
+    idx_syms = sorted(idx_df["symbol"].unique())
+    nifty    = [s for s in idx_syms if s.upper() == "NIFTY"]
+    stk_syms = sorted(stock_df["symbol"].unique())
+
+    live_w = live_straddle_rows(nifty, weekly=True) if use_live else None
+    live_m = live_straddle_rows(idx_syms) if use_live else None
+    live_s = live_straddle_rows(stk_syms) if use_live else None
+
+    # ── index side: NIFTY weekly + monthly, other indices monthly ────────────
+    monthly = _series_table(idx_df, "front_monthly_straddle_price",
+                            "front_monthly_straddle_iv", live_m)
+    weekly  = _series_table(idx_df[idx_df["symbol"].isin(nifty)],
+                            "front_weekly_straddle_price", "front_weekly_straddle_iv", live_w)
+
+    parts = []
+    for sym in monthly.index:
+        if sym in nifty:
+            parts.append(weekly.loc[[sym]].rename(index={sym: "NIFTY – WEEKLY"}))
+            parts.append(monthly.loc[[sym]].rename(index={sym: "NIFTY – MONTHLY"}))
+        else:
+            parts.append(monthly.loc[[sym]])
+    idx_tbl = pd.concat(parts) if parts else monthly
 
     # ── stock side ───────────────────────────────────────────────────────────
-    stk_rows = []
-    for sym, sub in stock_df.groupby("symbol"):
-        if "front_straddle_price" in sub.columns and "front_straddle_iv" in sub.columns:
-            stk_rows.append(
-                _change_cols(sub, "front_straddle_price", "front_straddle_iv").rename(sym)
-            )
-    stk_tbl = pd.DataFrame(stk_rows)
-    
-    #     # ── live override (optional toggle) ─────────────────────────────
-    # if st.session_state.get("use_live"):      # use the sidebar toggle you already have
-    #     for sym in idx_tbl.index.tolist() + stk_tbl.index.tolist():
-    #         weekly_flag = False
-    #         if 'WEEKLY' in sym or 'MONTHLY' in sym:
-        
-    #             sym_final = sym.replace(" – WEEKLY","").replace(" – MONTHLY","")
-    #             if sym == 'NIFTY - WEEKLY':
-    #                 weekly_flag = True
-    #         else:
-    #             sym_final = sym
-        
-    #         live = atm_straddle(sym_final, weekly = weekly_flag)
-    #         if live:
-    #             tbl = idx_tbl if sym in idx_tbl.index else stk_tbl
-    #             tbl.loc[sym, "Straddle"] = live["price"]
-    #             tbl.loc[sym, "IV"]       = live["iv"]
-
-    # return idx_tbl, stk_tbl
-
-
-        # ── live override (optional toggle) ─────────────────────────────
-    if st.session_state.get("use_live"):
-
-        lookbacks = [1, 2, 3, 5]     # mapping to column suffixes
-        # helper ------------------------------------------------------
-        def recalc_changes(df_src, sym, live_price, live_iv, price_col, iv_col):
-            sub = df_src[df_src["symbol"] == sym].sort_values("date")
-            closes = sub[price_col].tolist() + [live_price]     # append live
-            ivs    = sub[iv_col].tolist()    + [live_iv]
-
-            row = {}
-            for lb in lookbacks:
-                if len(closes) > lb:
-                    row[f"Δ{lb} d %"] = round(((closes[-1] / closes[-lb-1]) - 1) * 100, 2)
-                    row[f"Δ{lb} d IV"] = round(ivs[-1] - ivs[-lb-1], 2)
-            return row
-
-        # loop all table rows ----------------------------------------
-        for sym in idx_tbl.index.tolist() + stk_tbl.index.tolist():
-
-            weekly_flag = "WEEKLY" in sym
-            sym_clean   = sym.replace(" – WEEKLY","").replace(" – MONTHLY","")
-            live = atm_straddle(sym_clean, weekly=weekly_flag)
-            if not live:
-                continue
-
-            # choose source dataframe + column names
-            if sym in idx_tbl.index:
-                tbl      = idx_tbl
-                df_src   = idx_df
-                price_c  = "front_weekly_straddle_price" if weekly_flag else "front_monthly_straddle_price"
-                iv_c     = price_c.replace("price", "iv")
-            else:
-                tbl      = stk_tbl
-                df_src   = stock_df
-                price_c  = "front_straddle_price"
-                iv_c     = "front_straddle_iv"
-
-            # overwrite latest level
-            tbl.loc[sym, "Straddle"] = live["price"]
-            tbl.loc[sym, "IV"]       = live["iv"]
-
-            # recompute Δ columns
-            delta_vals = recalc_changes(df_src, sym_clean, live["price"], live["iv"],
-                                        price_c, iv_c)
-            for col, val in delta_vals.items():
-                tbl.loc[sym, col] = val
+    stk_tbl = _series_table(stock_df, "front_straddle_price", "front_straddle_iv", live_s)
 
     return idx_tbl, stk_tbl
 
 
+# ─── decay panel: every symbol × every expiry × days-to-expiry ─────────────
+def _panel_rows(df, labels, expiry_col, price_col, iv_col) -> pd.DataFrame:
+    return pd.DataFrame({
+        "symbol": labels,
+        "expiry": pd.to_datetime(df[expiry_col]),
+        "date":   df["date"],
+        "price":  df[price_col],
+        "iv":     df[iv_col],
+    })
+
+
+@traced
+@cached(ttl=CACHE_SQL_TTL, max_entries=2, max_bytes=256 * MB, persist=False)
+def straddle_panel(stock_df: pd.DataFrame, idx_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    ATM straddle price / IV for every symbol and every expiry in the history,
+    indexed by (symbol, expiry, dte) with dte = trading sessions to expiry
+    (0 on expiry day).  Symbols carry the straddle-table labels:
+    "NIFTY – WEEKLY", "NIFTY – MONTHLY", "BANKNIFTY", "RELIANCE", ...
+
+    Columns: date, price, iv, decay (price / first price of that expiry).
+    """
+    sym = idx_df["symbol"]
+    nifty = sym.str.upper() == "NIFTY"
+    parts = [
+        _panel_rows(idx_df, sym.where(~nifty, sym + " – MONTHLY"), "front_monthly_expiry",
+                    "front_monthly_straddle_price", "front_monthly_straddle_iv"),
+        _panel_rows(idx_df[nifty], sym[nifty] + " – WEEKLY", "front_weekly_expiry",
+                    "front_weekly_straddle_price", "front_weekly_straddle_iv"),
+        _panel_rows(stock_df, stock_df["symbol"], "front_expiry",
+                    "front_straddle_price", "front_straddle_iv"),
+    ]
+    panel = (pd.concat(parts, ignore_index=True)
+               .dropna(subset=["expiry", "price"])
+               .sort_values(["symbol", "expiry", "date"], kind="stable"))
+
+    days = sessions()
+    check_coverage(panel["date"].min(), panel["expiry"].max())
+    panel["dte"] = (days.searchsorted(panel["expiry"].to_numpy())
+                    - days.searchsorted(panel["date"].to_numpy()))
+    first = panel.groupby(["symbol", "expiry"], sort=False)["price"].transform("first")
+    panel["decay"] = panel["price"] / first
+    return panel.set_index(["symbol", "expiry", "dte"]).sort_index()
+
+
+@traced
+@cached(ttl=CACHE_SQL_TTL, max_entries=2, max_bytes=16 * MB, persist=False)
+def decay_vs_history(panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Latest straddle of every symbol's current expiry against the median of
+    its past expiries at the same DTE.
+
+    Decay vs hist %  – (decay / median decay − 1) × 100; < 0 → premium has
+                       bled faster than usual by this DTE
+    IV vs hist       – IV minus median IV at this DTE (vol points)
+
+    The oldest expiry per symbol may start before the history does, so it
+    is left out of the medians.
+    """
+    p = panel.reset_index()
+    current = p.groupby("symbol")["expiry"].transform("max")
+    cur = (p[p["expiry"] == current]
+           .sort_values("date", kind="stable")
+           .groupby("symbol").tail(1))
+
+    truncated = p.groupby(["symbol", "expiry"])["date"].transform("min") \
+        == p.groupby("symbol")["date"].transform("min")
+    past = p[(p["expiry"] < current) & ~truncated]
+    hist = (past.groupby(["symbol", "dte"])
+                .agg(hist_decay=("decay", "median"), hist_iv=("iv", "median"),
+                     n_hist=("expiry", "nunique"))
+                .reset_index())
+
+    out = cur.merge(hist, on=["symbol", "dte"], how="left").set_index("symbol").sort_index()
+    out.index.name = None
+    return pd.DataFrame({
+        "Expiry":          out["expiry"],
+        "DTE":             out["dte"],
+        "Straddle":        out["price"],
+        "IV":              out["iv"],
+        "Decay":           out["decay"],
+        "Median decay":    out["hist_decay"],
+        "Decay vs hist %": (out["decay"] / out["hist_decay"] - 1) * 100,
+        "Median IV":       out["hist_iv"],
+        "IV vs hist":      out["iv"] - out["hist_iv"],
+        "Past expiries":   out["n_hist"].fillna(0).astype(int),
+    })
+
+
 # ──────────────────────────────────────────────────────────────────────
 
-def straddle_timeseries(symbol: str) -> pd.DataFrame:
+@traced
+def straddle_timeseries(symbol: str, use_live: bool = False) -> pd.DataFrame:
     """
-    Returns a dataframe with ['date','price'] covering the *current* expiry
-    for the requested straddle symbol.
+    Returns a dataframe with ['date','price','iv'] covering the *current*
+    expiry for the requested straddle symbol – a lookup in straddle_panel.
 
     symbol examples:
         "NIFTY – WEEKLY", "NIFTY – MONTHLY", "BANKNIFTY",
@@ -190,42 +229,22 @@ def straddle_timeseries(symbol: str) -> pd.DataFrame:
     sym_clean = symbol.split(" – ")[0]        # strip WEEKLY / MONTHLY tag
     is_weekly = symbol.endswith("WEEKLY")
 
-    if sym_clean in fno_index_all()["symbol"].unique():
-        df = fno_index_all().copy()
-        df = df[df["symbol"] == sym_clean]
-
-        price_col  = (
-            "front_weekly_straddle_price" if is_weekly
-            else "front_monthly_straddle_price"
-        )
-        expiry_col = (
-            "front_weekly_expiry" if is_weekly
-            else "front_monthly_expiry"
-        )
-        iv_col = (
-            "front_weekly_straddle_iv" if is_weekly
-            else "front_monthly_straddle_iv"
-        )
-        
-    else:                               # stock
-        df = fno_stock_all().copy()
-        df = df[df["symbol"] == sym_clean]
-        price_col  = "front_straddle_price"
-        expiry_col = "front_expiry"
-        iv_col = "front_straddle_iv"
-
-    if df.empty or price_col not in df.columns:
+    panel = straddle_panel(fno_stock_all(), fno_index_all())
+    symbols = panel.index.levels[0]
+    key = symbol if symbol in symbols else f"{sym_clean} – MONTHLY"
+    if key not in symbols:
         return pd.DataFrame(columns=["date", "price"])
-    current_expiry = df[expiry_col].max()
+
+    rows = panel.xs(key, level="symbol")
+    current_expiry = rows.index.get_level_values("expiry").max()
     ts = (
-      df[df[expiry_col] == current_expiry][["date", price_col, iv_col]]
-      .rename(columns={price_col: "price", iv_col: "iv"})
+      rows.xs(current_expiry, level="expiry")[["date", "price", "iv"]]
       .sort_values("date")
       .reset_index(drop=True))
     
     
     # ---------- live append ---------------------------------------------
-    if st.session_state.get("use_live"):
+    if use_live:
         live = atm_straddle(sym_clean, weekly=is_weekly)
         if live and live["price"] is not None:
             today = pd.Timestamp.today().normalize()
@@ -248,12 +267,14 @@ index_symbol_dict = {
     "FINNIFTY":  "NIFTY FIN SERVICE",
 }
 
+@traced
 def price_timeseries(
     symbol: str,
     start_date: Union[str, pd.Timestamp],
     end_date:   Union[str, pd.Timestamp],
     cash_df: pd.DataFrame,
     idx_df:  pd.DataFrame,
+    use_live: bool = False,
 ) -> pd.DataFrame:
     """
     Slice price dataframe for [start_date, end_date].
@@ -269,7 +290,7 @@ def price_timeseries(
         df = idx_df[idx_df["symbol"] == mapped][["date", "close"]].copy()
 
         # append live index quote if toggle ON
-        if st.session_state.get("use_live"):
+        if use_live:
             kite = get_kite()
             tag  = f"NSE:{mapped}"
             try:
@@ -282,7 +303,7 @@ def price_timeseries(
                       .sort_values("date")
                 )
             except Exception as e:
-                st.warning(f"Live index quote failed for {mapped}: {e}")
+                log.warning(f"Live index quote failed for {mapped}: {e}")
 
     # ---------- stock branch -------------------------------------------------
     else:
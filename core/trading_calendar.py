@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:40:00 2026
+
+@author: varun
+"""
+
+# core/trading_calendar.py
+#
+# NSE trading calendar: weekday holidays + the session index built from them
+# once per process, with cached lookups for the date windows used across
+# core/ and the chart range-breaks in plots/.
+#
+#   sessions()                        every trading day (DatetimeIndex)
+#   previous_session(day)             last session strictly before `day`
+#   session_back(day, n)              n-th session before the last one ≤ day
+#   window_start(end, days=, months=) first session of a calendar look-back
+#   rangebreaks(dates)                plotly rangebreaks hiding non-data days
+#
+# Add the new year's holidays from the NSE circular every December.  Years
+# outside the table count every weekday as a session; check_coverage()
+# logs a warning (shown on the page) the first time a lookup reaches one.
+import logging
+from functools import lru_cache
+
+import pandas as pd
+
+FIRST_DAY = "2000-01-01"
+LAST_DAY  = "2035-12-31"
+
+NSE_HOLIDAYS = (
+    # 2023
+    "2023-01-26", "2023-03-07", "2023-03-30", "2023-04-04", "2023-04-07",
+    "2023-04-14", "2023-05-01", "2023-06-28", "2023-08-15", "2023-09-19",
+    "2023-10-02", "2023-10-24", "2023-11-14", "2023-11-27", "2023-12-25",
+    # 2024
+    "2024-01-22", "2024-01-26", "2024-03-08", "2024-03-25", "2024-03-29",
+    "2024-04-11", "2024-04-17", "2024-05-01", "2024-05-20", "2024-06-17",
+    "2024-07-17", "2024-08-15", "2024-10-02", "2024-11-01", "2024-11-15",
+    "2024-11-20", "2024-12-25",
+    # 2025
+    "2025-02-26", "2025-03-14", "2025-03-31", "2025-04-10", "2025-04-14",
+    "2025-04-18", "2025-05-01", "2025-08-15", "2025-08-27", "2025-10-02",
+    "2025-10-21", "2025-10-22", "2025-11-05", "2025-12-25",
+    # 2026
+    "2026-01-26", "2026-03-03", "2026-03-26", "2026-03-31", "2026-04-03",
+    "2026-04-14", "2026-05-01", "2026-05-28", "2026-06-26", "2026-09-14",
+    "2026-10-02", "2026-10-20", "2026-11-10", "2026-11-24", "2026-12-25",
+)
+COVERED = (int(min(NSE_HOLIDAYS)[:4]), int(max(NSE_HOLIDAYS)[:4]))   # years in the table
+
+log = logging.getLogger(__name__)
+_warned: set[int] = set()
+
+
+# ─── the calendar itself (built once) ───────────────────────────────────────
+@lru_cache(maxsize=1)
+def weekdays() -> pd.DatetimeIndex:
+    return pd.bdate_range(FIRST_DAY, LAST_DAY)
+
+
+@lru_cache(maxsize=1)
+def holidays() -> pd.DatetimeIndex:
+    days = pd.DatetimeIndex(pd.to_datetime(NSE_HOLIDAYS)).sort_values()
+    return days[days.weekday < 5]
+
+
+@lru_cache(maxsize=1)
+def sessions() -> pd.DatetimeIndex:
+    days = weekdays()
+    return days[~days.isin(holidays())]
+
+
+def _day(value) -> pd.Timestamp:
+    return pd.Timestamp(value).normalize()
+
+
+def check_coverage(start, end) -> None:
+    """Warn (once per year) when [start, end] reaches years without holiday data."""
+    lo, hi = COVERED
+    years = [y for y in range(_day(start).year, _day(end).year + 1)
+             if not lo <= y <= hi and y not in _warned]
+    if years:
+        _warned.update(years)
+        log.warning(f"NSE holidays for {', '.join(map(str, years))} missing from "
+                    "core/trading_calendar.py – every weekday counted as a session")
+
+
+def _slice(index: pd.DatetimeIndex, start, end) -> pd.DatetimeIndex:
+    lo = index.searchsorted(_day(start), side="left")
+    hi = index.searchsorted(_day(end), side="right")
+    return index[lo:hi]
+
+
+# ─── lookups ────────────────────────────────────────────────────────────────
+@lru_cache(maxsize=1024)
+def previous_session(day) -> pd.Timestamp:
+    """Last trading day strictly before `day`."""
+    check_coverage(day, day)
+    i = sessions().searchsorted(_day(day), side="left")
+    return sessions()[i - 1]
+
+
+@lru_cache(maxsize=1024)
+def session_back(day, n: int) -> pd.Timestamp:
+    """n-th trading day before the last session on/before `day` (n=0 → that session)."""
+    check_coverage(day, day)
+    i = sessions().searchsorted(_day(day), side="right") - 1
+    return sessions()[max(i - n, 0)]
+
+
+@lru_cache(maxsize=1024)
+def window_start(end, *, days: int = 0, months: int = 0) -> pd.Timestamp:
+    """
+    First trading day of a calendar look-back ending at `end`, i.e. the
+    session on/after end − days − months.  `date >= window_start(...)` keeps
+    the same rows as the raw calendar cut.
+    """
+    cut = _day(end) - pd.Timedelta(days=days) - pd.DateOffset(months=months)
+    check_coverage(cut, end)
+    i = sessions().searchsorted(cut, side="left")
+    return sessions()[i] if i < len(sessions()) else cut
+
+
+def missing_sessions(dates, start=None, end=None) -> pd.DatetimeIndex:
+    """
+    Weekdays in [start, end] (default: the span of `dates`) with no row in
+    `dates` – exchange holidays plus any gaps in the data.
+    """
+    have = pd.DatetimeIndex(pd.unique(pd.to_datetime(pd.Series(dates)).dt.normalize()))
+    if have.empty:
+        return have
+    start = have.min() if start is None else start
+    end   = have.max() if end is None else end
+    check_coverage(start, end)
+    return _slice(weekdays(), start, end).difference(have)
+
+
+def rangebreaks(dates, start=None, end=None) -> list[dict]:
+    """
+    Plotly x-axis rangebreaks for daily charts: weekends by bound, plus only
+    the missing weekdays inside the plotted window (as date strings).
+    """
+    missing = missing_sessions(dates, start, end)
+    return [dict(bounds=["sat", "mon"]),
+            dict(values=missing.strftime("%Y-%m-%d").tolist())]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:10:00 2026
+
+@author: varun
+"""
+
+# core/volatility.py
+#
+# Realized vs implied volatility for the whole F&O list.
+#
+#   panels = vol_panels(cash_df, idx_df, fno_stock_df, fno_index_df)
+#   screen = vol_screen(panels)               # latest IV, RV, spread, percentiles
+#
+# OHLC is pivoted once into date × symbol matrices; every estimator is a
+# trailing-window sum (cumulative sums down the date axis) over those
+# matrices, so all symbols move together and nothing loops per symbol.
+# RV is annualised % (√252), like the straddle IVs.
+#
+#   cc          close-to-close      std(ln C/C₋₁)
+#   parkinson   high-low            √( mean(ln(H/L)²) / 4ln2 )
+#   gk          Garman-Klass        √( mean(½ln(H/L)² − (2ln2−1)·ln(C/O)²) )
+#
+# Index IVs (monthly straddle) are matched to the spot series via INDEX_SPOT.
+import numpy as np
+import pandas as pd
+
+from app_config import CACHE_SQL_TTL
+from core.cache import cached, MB
+from core.fno_utils import INDEX_SPOT
+from core.perf import traced
+
+RV_WINDOW   = 20            # sessions per realized-vol estimate
+PCT_WINDOW  = 252           # sessions of history behind the percentiles
+ESTIMATORS  = ("cc", "parkinson", "gk")
+_ANNUAL     = np.sqrt(252) * 100
+
+
+def _wide(df: pd.DataFrame, cols) -> dict[str, pd.DataFrame]:
+    """date × symbol matrix per column of a long (date, symbol, ...) frame, one factorisation."""
+    di, dates = pd.factorize(df["date"], sort=True)
+    si, syms  = pd.factorize(df["symbol"], sort=True)
+    out = {}
+    for col in cols:
+        m = np.full((len(dates), len(syms)), np.nan)
+        m[di, si] = df[col].to_numpy(dtype=float)
+        out[col] = pd.DataFrame(m, index=pd.DatetimeIndex(dates, name="date"),
+                                columns=pd.Index(syms, name="symbol"))
+    return out
+
+
+def _rolling_sums(x: np.ndarray, window: int, power: int = 1):
+    """Trailing-window sum of x**power down axis 0; NaN unless all `window` rows present."""
+    ok = ~np.isnan(x)
+    v = np.where(ok, x, 0.0) ** power
+    cs = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(v, axis=0)])
+    cn = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(ok, axis=0)])
+    total = np.full(x.shape, np.nan)
+    full = (cn[window:] - cn[:-window]) == window
+    total[window - 1:] = np.where(full, cs[window:] - cs[:-window], np.nan)
+    return total
+
+
+def _rolling_mean(m: pd.DataFrame, window: int) -> pd.DataFrame:
+    return pd.DataFrame(_rolling_sums(m.to_numpy(), window) / window,
+                        index=m.index, columns=m.columns)
+
+
+def _rolling_std(m: pd.DataFrame, window: int) -> pd.DataFrame:
+    x = m.to_numpy()
+    s1, s2 = _rolling_sums(x, window), _rolling_sums(x, window, 2)
+    var = np.clip((s2 - s1 ** 2 / window) / (window - 1), 0, None)
+    return pd.DataFrame(np.sqrt(var), index=m.index, columns=m.columns)
+
+
+def realized_vol(o, h, l, c, window: int = RV_WINDOW) -> dict[str, pd.DataFrame]:
+    """Rolling cc / Parkinson / Garman-Klass vol from date × symbol OHLC matrices."""
+    log_hl = np.log(h / l)
+    log_co = np.log(c / o)
+    log_cc = np.log(c / c.shift(1))
+
+    return {
+        "cc":        _rolling_std(log_cc, window) * _ANNUAL,
+        "parkinson": np.sqrt(_rolling_mean(log_hl ** 2, window) / (4 * np.log(2))) * _ANNUAL,
+        "gk":        np.sqrt(_rolling_mean(0.5 * log_hl ** 2 - (2 * np.log(2) - 1) * log_co ** 2,
+                                           window).clip(lower=0)) * _ANNUAL,
+    }
+
+
+@traced
+@cached(ttl=CACHE_SQL_TTL, max_entries=4, max_bytes=256 * MB, persist=False)
+def vol_panels(cash_df: pd.DataFrame, idx_df: pd.DataFrame,
+               fno_stock_df: pd.DataFrame, fno_index_df: pd.DataFrame,
+               window: int = RV_WINDOW) -> dict[str, pd.DataFrame]:
+    """
+    date × F&O-symbol matrices: "iv" (front ATM straddle IV) and one RV
+    matrix per estimator, all on the IV's dates and columns.
+    """
+    # IV: stocks' front straddle, indices' monthly straddle
+    iv = pd.concat([
+        fno_stock_df[["date", "symbol", "front_straddle_iv"]]
+            .rename(columns={"front_straddle_iv": "iv"}),
+        fno_index_df[["date", "symbol", "front_monthly_straddle_iv"]]
+            .rename(columns={"front_monthly_straddle_iv": "iv"}),
+    ]).drop_duplicates(["date", "symbol"], keep="last")
+    iv = _wide(iv, ["iv"])["iv"]
+
+    # spot OHLC for the same names (index spot renamed to its F&O symbol)
+    spot_of = {s: INDEX_SPOT.get(s, s) for s in iv.columns}
+    fno_of  = {v: k for k, v in spot_of.items()}
+    ohlc = ["open", "high", "low", "close"]
+    spot = pd.concat([d.loc[d["symbol"].isin(fno_of), ["date", "symbol", *ohlc]]
+                      for d in (cash_df, idx_df)])
+    spot = (spot.drop_duplicates(["date", "symbol"], keep="last")
+                .assign(symbol=lambda d: d["symbol"].map(fno_of)))
+    wide = _wide(spot, ohlc)
+
+    rv = realized_vol(*(wide[k] for k in ohlc), window)
+    return {"iv": iv, **{k: v.reindex(index=iv.index, columns=iv.columns) for k, v in rv.items()}}
+
+
+def _latest_percentile(m: pd.DataFrame, lookback: int) -> pd.Series:
+    """
+    Percentile (0-100) of each column's last value within its last
+    `lookback` rows; NaN where the last value itself is missing.
+    """
+    tail = m.iloc[-lookback:]
+    last = tail.iloc[-1]
+    pct = (tail.le(last) & tail.notna()).sum() / tail.notna().sum() * 100
+    return pct.where(last.notna())
+
+
+@traced
+@cached(ttl=CACHE_SQL_TTL, max_entries=8, max_bytes=16 * MB, persist=False)
+def vol_screen(panels: dict[str, pd.DataFrame], estimator: str = "cc",
+               lookback: int = PCT_WINDOW) -> pd.DataFrame:
+    """
+    One row per F&O symbol on the latest date:
+
+    IV, RV cc / Parkinson / GK   – annualised %
+    IV − RV                      – spread against `estimator` (vol points)
+    IV/RV                        – ratio against `estimator`
+    Spread pct, IV pct           – percentile of today's value in the last
+                                   `lookback` sessions (100 = richest)
+    """
+    iv, rv = panels["iv"], panels[estimator]
+    spread = iv - rv
+    last = iv.index[-1]
+
+    out = pd.DataFrame({
+        "IV":           iv.loc[last],
+        "RV cc":        panels["cc"].loc[last],
+        "RV Parkinson": panels["parkinson"].loc[last],
+        "RV GK":        panels["gk"].loc[last],
+        "IV − RV":      spread.loc[last],
+        "IV/RV":        (iv / rv).loc[last],
+        "Spread pct":   _latest_percentile(spread, lookback),
+        "IV pct":       _latest_percentile(iv, lookback),
+    })
+    out.index.name = None
+    return out.dropna(subset=["IV"]).sort_values("IV − RV", ascending=False)
@@ -9,6 +9,12 @@ Created on Tue Jun 10 18:19:58 2025
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 
+from core.cache import cached, MB
+from core.perf import traced
+from plots.downsample import line, candles
+
+@traced
+@cached(max_entries=16, max_bytes=32 * MB, persist=False)
 def basis_daily_figure(symbol, price_df, basis_df):
     fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
                         specs=[[{}],[{"secondary_y":True}]],
@@ -16,11 +22,7 @@ def basis_daily_figure(symbol, price_df, basis_df):
 
     # Row-1 OHLC
     fig.add_trace(
-        go.Candlestick(
-            x=price_df.index, open=price_df["open"], high=price_df["high"],
-            low=price_df["low"], close=price_df["close"],
-            name=f"{symbol} spot"
-        ),
+        candles(price_df, name=f"{symbol} spot"),
         row=1,col=1
     )
 
@@ -34,9 +36,9 @@ def basis_daily_figure(symbol, price_df, basis_df):
     for col,c in colors.items():
         if col in basis_df:
             fig.add_trace(
-                go.Scatter(x=basis_df.index, y=basis_df[col],
-                           name=col.replace("_pct"," basis %"),
-                           line=dict(color=c, dash="dot")),
+                line(basis_df.index, basis_df[col], method="minmax",
+                     name=col.replace("_pct"," basis %"),
+                     line=dict(color=c, dash="dot")),
                 row=2,col=1, secondary_y=False
             )
 
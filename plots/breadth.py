@@ -3,9 +3,14 @@ from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 import pandas as pd
 
+from core.cache import cached, MB
+from core.perf import traced
+from core.trading_calendar import rangebreaks
 
 
 # ── Panel A – % > EMA ────────────────────────────────────────────────────────
+@traced
+@cached(max_entries=4, max_bytes=32 * MB, persist=False)
 def ema_area_figure(ema_pct: pd.DataFrame) -> go.Figure:
     spans   = [20, 50, 200]
     colors  = ["#e75480", "#55bbaa", "#9b7bed"]      # pick any you like
@@ -35,6 +40,8 @@ def ema_area_figure(ema_pct: pd.DataFrame) -> go.Figure:
 
 
 # ── Panel B – Net New Highs / Lows ───────────────────────────────────────────
+@traced
+@cached(max_entries=4, max_bytes=16 * MB, persist=False)
 def nnhl_figure(nnhl: pd.DataFrame) -> go.Figure:
     fig = go.Figure()
 
@@ -61,6 +68,8 @@ def nnhl_figure(nnhl: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@traced
+@cached(max_entries=4, max_bytes=16 * MB, persist=False)
 def breadth_figure(breadth_df, pct_df, nifty_df):
     # create secondary‑y subplot in *one* row
     fig = make_subplots(rows=1, cols=1, specs=[[{"secondary_y": True}]])
@@ -90,12 +99,10 @@ def breadth_figure(breadth_df, pct_df, nifty_df):
     fig.update_yaxes(title_text="NIFTY Price", secondary_y=True)
 
     # ── slider + skip weekends/holidays ────────────────────────────
-    bdays   = pd.date_range(breadth_df["date"].min(), breadth_df["date"].max(), freq="B")
-    missing = bdays.difference(nifty_df["date"].unique())
-
     fig.update_xaxes(
         rangeslider=dict(visible=True, thickness=0.05),
-        rangebreaks=[dict(bounds=["sat","mon"]), dict(values=missing)]
+        rangebreaks=rangebreaks(nifty_df["date"], breadth_df["date"].min(),
+                                breadth_df["date"].max())
     )
 
     fig.update_layout(
@@ -107,6 +114,8 @@ def breadth_figure(breadth_df, pct_df, nifty_df):
     return fig
 
 # ───────────────────────── A/D ratio + Nifty candles ────────────────────────
+@traced
+@cached(max_entries=4, max_bytes=16 * MB, persist=False)
 def advdec_figure(breadth_df, nifty_df):
     fig = make_subplots(rows=1, cols=1, specs=[[{"secondary_y": True}]])
 
@@ -132,12 +141,10 @@ def advdec_figure(breadth_df, nifty_df):
     fig.update_yaxes(title_text="NIFTY Price", secondary_y=True)
 
     # shared slider
-    bdays = pd.date_range(breadth_df["date"].min(), breadth_df["date"].max(), freq="B")
-    missing = bdays.difference(nifty_df["date"].unique())
-
     fig.update_xaxes(
         rangeslider=dict(visible=True, thickness=0.05),
-        rangebreaks=[dict(bounds=["sat","mon"]), dict(values=missing)]
+        rangebreaks=rangebreaks(nifty_df["date"], breadth_df["date"].min(),
+                                breadth_df["date"].max())
     )
 
     fig.update_layout(
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:20:00 2026
+
+@author: varun
+"""
+
+# plots/downsample.py
+#
+# Keep chart payloads proportional to screen width, not to row count.
+#
+#   line(x, y, name=...)        → Scatter / Scattergl with ≤ ~PIXEL_WIDTH points
+#   candles(df, x="date")       → Candlestick, consecutive bars merged above MAX_BARS
+#
+# Lines are thinned with LTTB (largest-triangle-three-buckets; keeps the
+# visual shape) or min/max buckets (keeps every spike – use for basis /
+# spread series).  Traces that still carry more than GL_POINTS points are
+# drawn with WebGL.  WebGL traces ignore x-axis rangebreaks, so daily
+# charts that hide holidays pass gl=False.
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+PIXEL_WIDTH = 1200      # ~ plot width in px at use_container_width
+GL_POINTS   = 5000      # switch a trace to Scattergl above this
+MAX_BARS    = 600       # candles per chart before bars get merged
+
+
+# ─── index pickers ──────────────────────────────────────────────────────────
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions of the `n_out` points LTTB keeps (first and last always kept)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)   # n_out-2 inner buckets
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the next bucket (or the last point)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions of each bucket's min and max (≈ n_out points, spikes preserved)."""
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+
+    buckets = max(n_out // 2, 1)
+    starts = np.linspace(0, n, buckets + 1).astype(np.int64)[:-1]
+    ends = np.append(starts[1:], n)
+    bucket = np.repeat(np.arange(buckets), ends - starts)
+
+    order = np.lexsort((y, bucket))                     # by bucket, then value
+    lo, hi = order[starts], order[ends - 1]
+    return np.unique(np.concatenate(([0, n - 1], lo, hi)))
+
+
+# ─── public helpers ─────────────────────────────────────────────────────────
+def downsample(x, y, n_out: int = PIXEL_WIDTH, method: str = "lttb"):
+    """(x, y) thinned to about `n_out` points (NaNs dropped); short series pass through."""
+    if len(x) <= n_out:
+        return x, y
+    x = pd.Index(x)
+    y = np.asarray(y, dtype=float)
+    keep = ~np.isnan(y)
+    x, y = x[keep], y[keep]
+    if len(y) <= n_out:
+        return x, y
+
+    if method == "minmax":
+        idx = minmax_indices(y, n_out)
+    elif method == "lttb":
+        xs = x.asi8 if isinstance(x, pd.DatetimeIndex) else np.asarray(x, dtype=float)
+        idx = lttb_indices(xs.astype(float), y, n_out)
+    else:
+        raise ValueError(f"unknown downsampling method {method!r}")
+    return x[idx], y[idx]
+
+
+def line(x, y, *, n_out: int | None = PIXEL_WIDTH, method: str = "lttb",
+         gl: bool | None = None, **trace) -> go.Scatter:
+    """
+    Line trace for a long series.  n_out=None sends every point;
+    gl=None picks Scattergl when more than GL_POINTS points remain.
+    """
+    if n_out:
+        x, y = downsample(x, y, n_out, method)
+    if gl is None:
+        gl = len(x) > GL_POINTS
+    trace.setdefault("mode", "lines")
+    return (go.Scattergl if gl else go.Scatter)(x=x, y=y, **trace)
+
+
+def merge_bars(df: pd.DataFrame, max_bars: int = MAX_BARS) -> pd.DataFrame:
+    """
+    Merge runs of consecutive OHLC(V) rows so at most `max_bars` remain:
+    first open, max high, min low, last close, summed volume, first x.
+    """
+    n = len(df)
+    if n <= max_bars:
+        return df
+    step = -(-n // max_bars)                            # ceil
+    grp = np.arange(n) // step
+    agg = {c: f for c, f in (("open", "first"), ("high", "max"), ("low", "min"),
+                             ("close", "last"), ("volume", "sum")) if c in df}
+    other = {c: "first" for c in df.columns if c not in agg}
+    return df.groupby(grp).agg({**other, **agg})[df.columns]
+
+
+def candles(df: pd.DataFrame, x: str | None = None, max_bars: int = MAX_BARS,
+            **trace) -> go.Candlestick:
+    """Candlestick from an OHLC frame (x column or the index), bars merged above `max_bars`."""
+    df = df.reset_index() if x is None else df
+    x = df.columns[0] if x is None else x
+    df = merge_bars(df, max_bars)
+    return go.Candlestick(x=df[x], open=df["open"], high=df["high"],
+                          low=df["low"], close=df["close"], **trace)
@@ -7,7 +7,12 @@ Created on Tue May  6 10:18:57 2025
 """
 import plotly.graph_objects as go
 
+from core.cache import cached, MB
+from core.perf import traced
 
+
+@traced
+@cached(max_entries=8, max_bytes=16 * MB, persist=False)
 def sector_figure(rebased):
      # build a simple Plotly figure
     fig_sec = go.Figure()
@@ -10,7 +10,14 @@ from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 import pandas as pd
 
+from core.cache import cached, MB
+from core.perf import traced
+from core.trading_calendar import rangebreaks
+from plots.downsample import line, candles
 
+
+@traced
+@cached(max_entries=16, max_bytes=64 * MB, persist=False)
 def stock_explorer_figure(choice, price_df, ind_df, rebased_stock, rebased_index, prev_close_price, win_label):
         # ---------- make prev_close a clean scalar ---------------------------
     if isinstance(prev_close_price, pd.Series):
@@ -37,10 +44,8 @@ def stock_explorer_figure(choice, price_df, ind_df, rebased_stock, rebased_index
     )
     # Row-1: Candlestick
     fig.add_trace(
-        go.Candlestick(
-            x=price_df["date"],
-            open=price_df["open"], high=price_df["high"],
-            low=price_df["low"], close=price_df["close"],
+        candles(
+            price_df, x="date",
             name=f"{choice} Candles",
             increasing_line_color="green", decreasing_line_color="red",
             showlegend=False
@@ -49,15 +54,15 @@ def stock_explorer_figure(choice, price_df, ind_df, rebased_stock, rebased_index
     )
     
     
-    # Row-2: rebased close lines
+    # Row-2: rebased close lines (SVG – WebGL traces ignore rangebreaks)
     fig.add_trace(
-        go.Scatter(x=price_df["date"], y=rebased_stock,
-                   name=f"{choice} (Rebased 100)", mode="lines"),
+        line(price_df["date"], rebased_stock, gl=False,
+             name=f"{choice} (Rebased 100)"),
         row=2, col=1
     )
     fig.add_trace(
-        go.Scatter(x=price_df["date"], y=rebased_index,
-                   name="Nifty (Rebased 100)", mode="lines", line=dict(dash="dot")),
+        line(price_df["date"], rebased_index, gl=False,
+             name="Nifty (Rebased 100)", line=dict(dash="dot")),
         row=2, col=1
     )
     
@@ -72,13 +77,7 @@ def stock_explorer_figure(choice, price_df, ind_df, rebased_stock, rebased_index
         )
     
     # remove Sat/Sun gaps + any other blank days
-    fig.update_xaxes(
-        rangebreaks=[
-            dict(bounds=["sat", "mon"]),           # hide weekends
-            dict(values=pd.date_range("1900-01-01", "2100-01-01", freq="C")
-                         .difference(price_df["date"]))  # hide missing trading days
-        ]
-    )
+    fig.update_xaxes(rangebreaks=rangebreaks(price_df["date"]))
     
     fig.update_yaxes(title_text="Rebased Price", row=2, col=1)
     fig.update_xaxes(rangeslider_visible=False)   # ← hides Plotly’s default slider
@@ -99,11 +98,11 @@ def stock_explorer_figure(choice, price_df, ind_df, rebased_stock, rebased_index
     
     
     fig.add_trace(
-    go.Scatter(
-        x=price_df["date"],
-        y=price_df["deliv_pct_smooth"],
+    line(
+        price_df["date"],
+        price_df["deliv_pct_smooth"],
+        gl=False,
         name="Delivery %",
-        mode="lines",
         line=dict(width=2, color="purple", dash="dot"),
     ),
     row=4, col=1, secondary_y=True
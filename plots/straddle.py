@@ -8,15 +8,15 @@ Created on Tue May  6 14:56:18 2025
 
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
-import pandas as pd
 
+from core.cache import cached, MB
+from core.perf import traced
+from core.trading_calendar import rangebreaks
 
-def straddle_figure(ts_df, price_df, title):
-    # ── pre‑compute range‑breaks (skip Sat/Sun + missing trading days) ──────
-    start, end = ts_df["date"].min(), ts_df["date"].max()
-    all_bdays   = pd.date_range(start, end, freq="B")
-    missing_days = all_bdays.difference(price_df["date"].unique())
 
+@traced
+@cached(max_entries=16, max_bytes=32 * MB, persist=False)
+def straddle_figure(ts_df, price_df, title):
     fig = make_subplots(
         rows=2, cols=1, shared_xaxes=True,
         specs=[[{"secondary_y": True}], [{}]],
@@ -59,10 +59,8 @@ def straddle_figure(ts_df, price_df, title):
     # ── global x‑axis settings ─────────────────────────────────────────────
     fig.update_xaxes(
         rangeslider_visible=False,                    # hide slider
-        rangebreaks=[
-            dict(bounds=["sat", "mon"]),              # skip weekends
-            dict(values=missing_days)                 # skip holidays / missing
-        ]
+        # skip weekends + holidays / missing days over the straddle window
+        rangebreaks=rangebreaks(price_df["date"], ts_df["date"].min(), ts_df["date"].max())
     )
 
     fig.update_layout(
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 21:10:00 2026
+
+@author: varun
+"""
+
+# tests/test_cache.py
+#
+# core/cache.py: keys follow argument content, results can't be changed
+# through a caller's copy, and both tiers honour the TTL.
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import cache
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Fresh disk tier in tmp_path; both tiers on."""
+    disk = cache._DiskStore(tmp_path / "cache.sqlite", 64 * cache.MB)
+    monkeypatch.setattr(cache, "_disk", disk)
+    monkeypatch.setattr(cache, "_tiers", {"memory": True, "disk": True})
+    return disk
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the cache module."""
+    now = {"t": 1_000_000.0}
+    monkeypatch.setattr(cache.time, "time", lambda: now["t"])
+    return now
+
+
+def counted(**kw):
+    calls = []
+
+    @cache.cached(**kw)
+    def total(df: pd.DataFrame) -> pd.DataFrame:
+        calls.append(1)
+        return df.sum().to_frame("total")
+
+    return total, calls
+
+
+def test_argument_changed_in_place_misses(store):
+    total, calls = counted(persist=False)
+    df = pd.DataFrame({"a": [1.0, 2.0], "b": ["x", "y"]})
+    total(df)
+    total(df)
+    assert len(calls) == 1
+
+    df.loc[0, "a"] = 10.0
+    assert total(df).loc["a", "total"] == 12.0
+    assert len(calls) == 2
+
+    df.loc[1, "b"] = "z"                            # string columns too
+    total(df)
+    assert len(calls) == 3
+
+
+def test_equal_content_hits(store):
+    total, calls = counted(persist=False)
+    total(pd.DataFrame({"a": [1.0, 2.0]}))
+    total(pd.DataFrame({"a": [1.0, 2.0]}))
+    total(pd.DataFrame({"a": [1.0, 2.0]}, index=[5, 6]))
+    assert len(calls) == 2
+
+
+def test_result_changed_by_caller_leaves_entry(store):
+    total, _ = counted(persist=False)
+    df = pd.DataFrame({"a": [1.0, 2.0]})
+    out = total(df)
+    out.loc["a", "total"] = -1.0
+    out["extra"] = 1
+    again = total(df)
+    assert again.loc["a", "total"] == 3.0
+    assert "extra" not in again
+
+
+def test_array_results_are_read_only(store):
+    @cache.cached(persist=False)
+    def arange(n):
+        return np.arange(n)
+
+    with pytest.raises(ValueError):
+        arange(3)[0] = 5
+    assert arange(3)[0] == 0
+
+
+def test_memory_entry_expires(store, clock):
+    total, calls = counted(ttl=60, persist=False)
+    df = pd.DataFrame({"a": [1.0]})
+    total(df)
+    clock["t"] += 59
+    total(df)
+    assert len(calls) == 1
+    clock["t"] += 2
+    total(df)
+    assert len(calls) == 2
+
+
+def test_disk_hit_keeps_disk_expiry(store, clock):
+    total, calls = counted(ttl=60)
+    df = pd.DataFrame({"a": [1.0]})
+    total(df)
+    clock["t"] += 50
+    total.clear(disk=False)                         # e.g. a new process
+    total(df)                                       # disk hit, 10 s left
+    assert len(calls) == 1
+    clock["t"] += 20
+    total(df)
+    assert len(calls) == 2
+
+
+def test_disk_entry_expires(store, clock):
+    total, calls = counted(ttl=60)
+    df = pd.DataFrame({"a": [1.0]})
+    total(df)
+    clock["t"] += 61
+    total.clear(disk=False)
+    total(df)
+    assert len(calls) == 2
+
+
+def test_function_id_follows_code():
+    def f(x):
+        return [y + 1 for y in x]
+
+    def g(x):
+        return [y + 2 for y in x]
+
+    assert cache._func_id(f).split(":")[1] != cache._func_id(g).split(":")[1]
+    assert cache._func_id(f) == cache._func_id(f)
+
+
+def test_entry_budget_evicts_least_recently_used(store):
+    calls = []
+
+    @cache.cached(max_entries=2, persist=False)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    square(1), square(2), square(1)                 # 1 is now most recent
+    square(3)                                       # evicts 2
+    square(1), square(3)
+    assert calls == [1, 2, 3]
+    square(2)
+    assert calls == [1, 2, 3, 2]
+    assert square.report()["entries"] == 2
+
+
+def test_byte_budget(store):
+    calls = []
+
+    @cache.cached(max_bytes=3 * 8 * 1000 + 500, persist=False)
+    def ones(n, tag):
+        calls.append(tag)
+        return np.ones(n)
+
+    for tag in "abcd":
+        ones(1000, tag)
+    assert ones.report()["bytes"] <= 3 * 8 * 1000 + 500
+    ones(1000, "a")                                 # evicted by d
+    assert calls == list("abcda")
+
+    ones(10_000, "big")                             # over the budget: never stored
+    ones(10_000, "big")
+    assert calls.count("big") == 2
+
+
+def test_clear_memory_only_keeps_disk(store):
+    total, calls = counted()
+    df = pd.DataFrame({"a": [1.0]})
+    total(df)
+    total.clear(disk=False)
+    total(df)
+    assert len(calls) == 1
+    total.clear()
+    total(df)
+    assert len(calls) == 2
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 22:00:00 2026
+
+@author: varun
+"""
+
+# tests/test_downsample.py
+#
+# Index pickers and helpers of plots/downsample.py.
+import numpy as np
+import pandas as pd
+import pytest
+
+from plots.downsample import lttb_indices, minmax_indices, downsample, merge_bars
+
+
+def walk(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(0, 1, n).cumsum()
+
+
+@pytest.mark.parametrize("n, n_out", [(1000, 100), (1001, 3), (50, 49)])
+def test_lttb_shape(n, n_out):
+    y = walk(n)
+    idx = lttb_indices(np.arange(n, dtype=float), y, n_out)
+    assert len(idx) == n_out
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert (np.diff(idx) > 0).all()
+
+
+def test_lttb_one_point_per_bucket():
+    n, n_out = 1000, 52
+    idx = lttb_indices(np.arange(n, dtype=float), walk(n), n_out)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    inner = idx[1:-1]
+    assert ((inner >= edges[:-1]) & (inner < edges[1:])).all()
+
+
+def test_lttb_keeps_a_lone_spike():
+    y = np.zeros(1000)
+    y[437] = 50.0
+    idx = lttb_indices(np.arange(1000, dtype=float), y, 50)
+    assert 437 in idx
+
+
+def test_lttb_short_series_unchanged():
+    assert (lttb_indices(np.arange(10.0), walk(10), 20) == np.arange(10)).all()
+    assert (lttb_indices(np.arange(10.0), walk(10), 2) == np.arange(10)).all()
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    n, n_out = 1000, 100
+    y = walk(n, seed=1)
+    idx = minmax_indices(y, n_out)
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert (np.diff(idx) > 0).all()
+    starts = np.linspace(0, n, n_out // 2 + 1).astype(np.int64)
+    for lo, hi in zip(starts[:-1], starts[1:]):
+        kept = y[idx[(idx >= lo) & (idx < hi)]]
+        assert kept.max() == y[lo:hi].max()
+        assert kept.min() == y[lo:hi].min()
+
+
+def test_minmax_short_series_unchanged():
+    assert (minmax_indices(walk(10), 20) == np.arange(10)).all()
+
+
+def test_downsample_drops_nan_and_keeps_x():
+    x = pd.date_range("2026-01-01", periods=2000, freq="min")
+    y = walk(2000)
+    y[::10] = np.nan
+    dx, dy = downsample(x, y, n_out=200, method="minmax")
+    assert len(dx) == len(dy) <= 202
+    assert not np.isnan(dy).any()
+    assert dx.isin(x).all()
+    assert np.nanmax(y) in dy and np.nanmin(y) in dy
+
+
+def test_merge_bars_keeps_ohlc():
+    dates = pd.date_range("2026-01-01", periods=100, freq="D")
+    close = walk(100) + 100
+    df = pd.DataFrame({"date": dates, "open": close - 1, "high": close + 2,
+                       "low": close - 2, "close": close})
+    merged = merge_bars(df, max_bars=10)
+    assert len(merged) <= 10
+    assert merged["open"].iloc[0] == df["open"].iloc[0]
+    assert merged["close"].iloc[-1] == df["close"].iloc[-1]
+    assert merged["high"].max() == df["high"].max()
+    assert merged["low"].min() == df["low"].min()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 22:30:00 2026
+
+@author: varun
+"""
+
+# tests/test_intraday_breadth.py
+#
+# core/intraday_breadth.py against direct per-minute counts, and the
+# incremental (keyed) path against the full recompute.
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import intraday_breadth as ib
+
+SYMBOLS = ["AAA", "BBB", "CCC", "DDD", "EEE"]
+UNIVERSES = {"All": SYMBOLS, "Some": ["AAA", "CCC", "ZZZ"]}
+
+
+@pytest.fixture(autouse=True)
+def empty_state():
+    ib._state.clear()
+
+
+@pytest.fixture
+def market():
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2026-10-19 09:15", periods=40, freq="min")
+    rows = []
+    for sym in SYMBOLS:
+        keep = rng.random(len(times)) > 0.2
+        close = 100 + rng.normal(0, 1, keep.sum()).cumsum()
+        rows.append(pd.DataFrame({"datetime": times[keep], "symbol": sym,
+                                  "high": close + 0.5, "low": close - 0.5, "close": close,
+                                  "volume": rng.integers(1, 500, len(close)).astype(float)}))
+    bars = pd.concat(rows, ignore_index=True).sort_values("datetime", ignore_index=True)
+    prev = pd.Series(100.0, index=SYMBOLS)
+    ref = pd.Series([99.0, 101.0, 100.0, 98.0, 102.0], index=SYMBOLS)
+    return bars, prev, ref
+
+
+def test_counts_match_direct(market):
+    bars, prev, ref = market
+    out = ib.intraday_breadth(bars, prev, UNIVERSES, ref_close=ref)
+
+    close = bars.pivot(index="datetime", columns="symbol", values="close").ffill()
+    adv = (close > prev).sum(axis=1)
+    dec = (close < prev).sum(axis=1)
+    np.testing.assert_array_equal(out["All"]["Adv"], adv)
+    np.testing.assert_array_equal(out["All"]["A-D"], adv - dec)
+
+    some = close[["AAA", "CCC"]]
+    np.testing.assert_array_equal(out["Some"]["Adv"], (some > 100).sum(axis=1))
+    above_ref = (close > ref).sum(axis=1) / close.notna().sum(axis=1) * 100
+    np.testing.assert_allclose(out["All"]["% > prev expiry"], above_ref)
+
+    diff = np.sign(close.diff()).fillna(0)
+    np.testing.assert_array_equal(out["All"]["Tick"], diff.sum(axis=1))
+    np.testing.assert_array_equal(out["All"]["Cum tick"], diff.sum(axis=1).cumsum())
+
+
+def test_incremental_equals_full(market):
+    bars, prev, ref = market
+    for stop in bars["datetime"].unique()[1::3]:
+        seen = bars[bars["datetime"] <= stop]
+        got = ib.intraday_breadth(seen, prev, UNIVERSES, ref_close=ref, key="cash")
+        want = ib.intraday_breadth(seen, prev, UNIVERSES, ref_close=ref)
+        for u in UNIVERSES:
+            pd.testing.assert_frame_equal(got[u], want[u])
+
+
+def test_state_is_bounded(market):
+    bars, prev, _ = market
+    for i in range(ib.MAX_STREAMS + 3):
+        ib.intraday_breadth(bars, prev, key=f"stream-{i}")
+    assert len(ib._state) == ib.MAX_STREAMS
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 21:50:00 2026
+
+@author: varun
+"""
+
+# tests/test_live_scanner.py
+#
+# Rule parser and evaluator of core/live_scanner.py.
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.live_scanner import compile_rule, run_scans, scan_prev_expiry_cross
+
+
+@pytest.fixture
+def reference() -> pd.DataFrame:
+    return pd.DataFrame({
+        "cash_close_latest": [100.0, 100.0, 100.0, 100.0],
+        "x":                 [1.0,   5.0,   np.nan, 9.0],
+        "y":                 [np.nan, 2.0,  3.0,   0.0],
+        "quadrant":          ["OI up / price up", "OI down / price up",
+                              "OI up / price up", None],
+    }, index=["AAA", "BBB", "CCC", "DDD"])
+
+
+def matches(rule: str, reference) -> list[str]:
+    hits = run_scans({"r": rule}, reference)["r"]
+    return hits[hits].index.tolist()
+
+
+def test_precedence():
+    assert compile_rule("a OR b AND NOT c > 1 + 2 * d") == (
+        "or", ("field", "a"),
+        ("and", ("field", "b"),
+         ("not", (">", ("field", "c"),
+                  ("+", ("num", 1.0), ("*", ("num", 2.0), ("field", "d")))))))
+    assert compile_rule("-(a - b) / 2") == (
+        "/", ("neg", ("-", ("field", "a"), ("field", "b"))), ("num", 2.0))
+
+
+def test_keywords_are_case_insensitive():
+    assert compile_rule("a > 1 and not b") == compile_rule("a > 1 AND NOT b")
+
+
+@pytest.mark.parametrize("rule", ["x >", "x > 1)", "(x > 1", "x $ 1", "AND x", ""])
+def test_bad_syntax(rule):
+    with pytest.raises(ValueError):
+        compile_rule(rule)
+
+
+def test_unknown_field(reference):
+    with pytest.raises(KeyError, match="nope"):
+        run_scans({"r": "nope > 1"}, reference)
+
+
+def test_arithmetic_and_logic(reference):
+    assert matches("x * 2 >= 10", reference) == ["BBB", "DDD"]
+    assert matches("x > 2 AND y < 1", reference) == ["DDD"]
+    assert matches("x < 2 OR y == 3", reference) == ["AAA", "CCC"]
+    assert matches("(x + y) / 2 > 3", reference) == ["BBB", "DDD"]
+
+
+def test_missing_values_never_match(reference):
+    assert matches("x != 5", reference) == ["AAA", "DDD"]
+    assert matches("NOT (x > 5)", reference) == ["AAA", "BBB"]
+    assert matches("x > 5 OR y > 1", reference) == ["BBB", "CCC", "DDD"]
+    assert matches("x > 100 AND y > 1", reference) == []
+    assert matches("NOT y", reference) == ["DDD"]
+
+
+def test_text_columns_are_one_hot(reference):
+    assert matches("quadrant_oi_up_price_up", reference) == ["AAA", "CCC"]
+    assert matches("NOT quadrant_oi_down_price_up", reference) == ["AAA", "CCC", "DDD"]
+
+
+def test_rules_evaluated_together(reference):
+    hits = run_scans({"a": "x > 2", "b": "x > 2 AND y > 1", "c": "NOT x > 2"}, reference)
+    assert list(hits.columns) == ["a", "b", "c"]
+    assert hits.dtypes.eq(bool).all()
+    assert hits["b"].tolist() == [False, True, False, False]
+
+
+def test_live_bars_set_now_price():
+    reference = pd.DataFrame({
+        "cash_close_latest": [100.0, 100.0, 100.0, 100.0],
+        "cash_close_prev":   [100.0, 100.0, 100.0, 100.0],
+        "prev_expiry_close": [101.0, 101.0, 99.0, 99.0],
+        "prev_expiry_high":  [105.0, 105.0, 105.0, 105.0],
+        "prev_expiry_low":   [95.0, 95.0, 95.0, 95.0],
+    }, index=["AAA", "BBB", "CCC", "DDD"])
+    bars = pd.DataFrame({
+        "datetime": pd.to_datetime(["2026-10-19 09:15", "2026-10-19 09:16",
+                                    "2026-10-19 09:15", "2026-10-19 09:15",
+                                    "2026-10-19 09:15"]),
+        "symbol":   ["AAA", "AAA", "BBB", "CCC", "DDD"],
+        "close":    [99.0, 106.0, 102.0, 98.0, 94.0],
+    })
+    up_close, up_high, down_close, down_low = scan_prev_expiry_cross(reference, live_bars=bars)
+    assert sorted(up_close.index) == ["AAA", "BBB"]
+    assert list(up_high.index) == ["AAA"]
+    assert list(down_close.index) == ["CCC", "DDD"]
+    assert list(down_low.index) == ["DDD"]
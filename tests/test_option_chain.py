@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 22:20:00 2026
+
+@author: varun
+"""
+
+# tests/test_option_chain.py
+#
+# chain_summary (core/option_chain.py) against brute-force definitions.
+import inspect
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import option_chain
+
+chain_summary = inspect.unwrap(option_chain.chain_summary)   # no cache tiers
+
+
+def make_chain(seed: int = 0) -> pd.DataFrame:
+    """Two underlyings with a front future plus one with no future quoted."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for name, fut, step, n in (("AAA", 1012.0, 20.0, 15), ("BBB", 248.5, 5.0, 12),
+                               ("CCC", None, 10.0, 8)):
+        strikes = np.round(np.linspace(-(n // 2), n // 2, n) * step + (fut or 500.0))
+        for k in strikes:
+            for typ in ("CE", "PE"):
+                if rng.random() < 0.1:
+                    continue                        # leg not listed
+                rows.append((name, typ, k, rng.uniform(1, 80),
+                             int(rng.integers(0, 50_000)), int(rng.integers(0, 9_000))))
+        if fut is not None:
+            rows.append((name, "FUT", 0.0, fut, 0, 0))
+    chain = pd.DataFrame(rows, columns=["name", "type", "strike", "ltp", "oi", "volume"])
+    chain["expiry"] = pd.Timestamp("2026-10-27")
+    return chain.astype({"name": "category", "type": "category"})
+
+
+def brute_force(chain: pd.DataFrame, name: str) -> dict:
+    opt = chain[(chain["name"] == name) & chain["type"].isin(["CE", "PE"])]
+    ce, pe = opt[opt["type"] == "CE"], opt[opt["type"] == "PE"]
+    strikes = np.sort(opt["strike"].unique())
+    pain = [(ce["oi"] * np.maximum(K - ce["strike"], 0)).sum()
+            + (pe["oi"] * np.maximum(pe["strike"] - K, 0)).sum() for K in strikes]
+    return {
+        "Max pain":  strikes[int(np.argmin(pain))],
+        "PCR OI":    pe["oi"].sum() / ce["oi"].sum(),
+        "PCR Vol":   pe["volume"].sum() / ce["volume"].sum(),
+        "Call wall": ce.groupby("strike")["oi"].sum().idxmax(),
+        "Put wall":  pe.groupby("strike")["oi"].sum().idxmax(),
+        "CE OI strike": (ce["oi"] * ce["strike"]).sum() / ce["oi"].sum(),
+    }
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_brute_force(seed):
+    chain = make_chain(seed)
+    summary = chain_summary(chain)
+    for name in ("AAA", "BBB", "CCC"):
+        for col, want in brute_force(chain, name).items():
+            assert summary.loc[name, col] == pytest.approx(want), (name, col)
+
+
+def test_atm_straddle_and_future():
+    chain = make_chain()
+    summary = chain_summary(chain)
+    opt = chain[(chain["name"] == "AAA") & chain["type"].isin(["CE", "PE"])]
+    atm = opt["strike"].iloc[(opt["strike"] - 1012.0).abs().argmin()]
+    legs = opt.loc[opt["strike"] == atm, "ltp"].sum()
+
+    assert summary.loc["AAA", "Fut"] == 1012.0
+    assert summary.loc["AAA", "ATM"] == atm
+    assert summary.loc["AAA", "Straddle"] == pytest.approx(legs)
+    assert summary.loc["AAA", "Max pain %"] == pytest.approx(
+        (summary.loc["AAA", "Max pain"] / 1012.0 - 1) * 100)
+
+
+def test_underlying_without_future():
+    summary = chain_summary(make_chain())
+    row = summary.loc["CCC"]
+    assert np.isnan(row["Fut"]) and np.isnan(row["ATM"]) and np.isnan(row["Straddle"])
+    assert not np.isnan(row["Max pain"])
+    assert row["Expiry"] == pd.Timestamp("2026-10-27")
+
+
+def test_no_call_oi_gives_nan_pcr():
+    chain = make_chain()
+    chain.loc[(chain["name"] == "BBB") & (chain["type"] == "CE"), "oi"] = 0
+    summary = chain_summary(chain)
+    assert np.isnan(summary.loc["BBB", "PCR OI"])
+    assert np.isnan(summary.loc["BBB", "CE OI strike"])
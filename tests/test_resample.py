@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 21:40:00 2026
+
+@author: varun
+"""
+
+# tests/test_resample.py
+#
+# core/resample.py against a per-symbol pandas resample, and the
+# incremental (keyed) path against the full recompute.
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import resample as rs
+
+
+def minute_bars(symbols=("AAA", "BBB", "CCC"), start="2026-10-19 09:15",
+                end="2026-10-19 11:00", seed=0) -> pd.DataFrame:
+    """Random OHLCV minute bars with a few missing minutes, in shuffled order."""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start, end, freq="1min")
+    rows = []
+    for sym in symbols:
+        keep = rng.random(len(times)) > 0.1
+        close = 100 + rng.normal(0, 1, keep.sum()).cumsum()
+        rows.append(pd.DataFrame({
+            "datetime": times[keep], "symbol": sym,
+            "open": close + rng.normal(0, 0.2, len(close)),
+            "high": close + 1, "low": close - 1, "close": close,
+            "volume": rng.integers(1, 1000, len(close)).astype(float),
+        }))
+    bars = pd.concat(rows, ignore_index=True)
+    return bars.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def pandas_resample(bars: pd.DataFrame, minutes: int) -> pd.DataFrame:
+    out = (bars.set_index("datetime")
+               .groupby("symbol")
+               .resample(f"{minutes}min", origin="2026-10-19 09:15")
+               .agg({"open": "first", "high": "max", "low": "min",
+                     "close": "last", "volume": "sum"})
+               .dropna(subset=["close"])
+               .reset_index())
+    out = out.sort_values(["datetime", "symbol"], ignore_index=True)
+    return out[["datetime", "symbol", "open", "high", "low", "close", "volume"]]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    rs._done.clear()
+
+
+def test_bucket_start_anchored_at_open():
+    t = pd.to_datetime(["2026-10-19 09:15:00", "2026-10-19 09:19:59",
+                        "2026-10-19 09:20:00", "2026-10-19 10:14:00"]).as_unit("ns").asi8
+    got = pd.to_datetime(rs.bucket_start(t, 5))
+    assert list(got.strftime("%H:%M")) == ["09:15", "09:15", "09:20", "10:10"]
+    got = pd.to_datetime(rs.bucket_start(t, 60))
+    assert list(got.strftime("%H:%M")) == ["09:15", "09:15", "09:15", "09:15"]
+
+
+@pytest.mark.parametrize("minutes", [5, 15, 60])
+def test_aggregate_matches_pandas(minutes):
+    bars = minute_bars()
+    got = rs.aggregate(bars, minutes)
+    want = pandas_resample(bars, minutes)
+    pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+
+def test_one_minute_passes_through():
+    bars = minute_bars()
+    assert rs.resample(bars, "1m", key="cash") is bars
+
+
+@pytest.mark.parametrize("timeframe", ["5m", "15m", "60m"])
+def test_incremental_equals_full(timeframe):
+    bars = minute_bars()
+    minutes = rs.TIMEFRAMES[timeframe]
+    for stop in pd.date_range("2026-10-19 09:16", "2026-10-19 11:00", freq="7min"):
+        seen = bars[bars["datetime"] <= stop]
+        got = rs.resample(seen, timeframe, key="cash")
+        pd.testing.assert_frame_equal(got, rs.aggregate(seen, minutes))
+
+
+def test_late_bar_in_closed_bucket_rebuilds():
+    bars = minute_bars()
+    late = bars[(bars["symbol"] == "AAA") & (bars["datetime"] == "2026-10-19 09:30")]
+    early = bars.drop(late.index)
+    rs.resample(early, "5m", key="cash")            # 09:30 bucket already closed
+
+    got = rs.resample(bars, "5m", key="cash")
+    pd.testing.assert_frame_equal(got, rs.aggregate(bars, 5))
+
+
+def test_cache_is_bounded():
+    bars = minute_bars()
+    for i in range(rs.MAX_STREAMS + 5):
+        rs.resample(bars, "5m", key=f"stream-{i}")
+    assert len(rs._done) == rs.MAX_STREAMS
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 22:10:00 2026
+
+@author: varun
+"""
+
+# tests/test_trading_calendar.py
+#
+# Session lookups of core/trading_calendar.py.
+import logging
+
+import pandas as pd
+import pytest
+
+from core import trading_calendar as tc
+
+
+def ts(day: str) -> pd.Timestamp:
+    return pd.Timestamp(day)
+
+
+def test_sessions_skip_weekends_and_holidays():
+    s = tc.sessions()
+    assert (s.weekday < 5).all()
+    assert not s.isin(tc.holidays()).any()
+    assert ts("2026-10-20") not in s                # holiday (Tuesday)
+    assert ts("2026-10-19") in s
+
+
+@pytest.mark.parametrize("day, prev", [
+    ("2026-10-21", "2026-10-19"),                   # over the 20th holiday
+    ("2026-10-19", "2026-10-16"),                   # Monday → Friday
+    ("2026-10-18", "2026-10-16"),                   # Sunday → Friday
+    ("2026-10-16 15:30", "2026-10-15"),             # time of day ignored
+])
+def test_previous_session(day, prev):
+    assert tc.previous_session(ts(day)) == ts(prev)
+
+
+@pytest.mark.parametrize("day, n, want", [
+    ("2026-10-19", 0, "2026-10-19"),
+    ("2026-10-20", 0, "2026-10-19"),                # holiday → last session before
+    ("2026-10-21", 1, "2026-10-19"),
+    ("2026-10-21", 5, "2026-10-13"),
+])
+def test_session_back(day, n, want):
+    assert tc.session_back(ts(day), n) == ts(want)
+
+
+def test_window_start_lands_on_a_session():
+    # 2026-10-20 is a holiday, so a 1-day look-back from the 21st starts on the 21st
+    assert tc.window_start(ts("2026-10-21"), days=1) == ts("2026-10-21")
+    # a Sunday cut moves forward to Monday
+    assert tc.window_start(ts("2026-10-25"), days=7) == ts("2026-10-19")
+    assert tc.window_start(ts("2026-03-31"), months=1) == ts("2026-03-02")
+
+
+def test_window_start_keeps_the_same_rows():
+    dates = pd.Series(tc.sessions()[(tc.sessions() >= "2025-01-01")
+                                    & (tc.sessions() <= "2026-10-19")])
+    end = dates.max()
+    for days in (10, 30, 400):
+        raw = dates[dates >= end - pd.Timedelta(days=days)]
+        assert raw.equals(dates[dates >= tc.window_start(end, days=days)])
+
+
+def test_missing_sessions_and_rangebreaks():
+    dates = pd.bdate_range("2026-10-12", "2026-10-23").drop(ts("2026-10-15"))
+    dates = dates[dates != ts("2026-10-20")]
+    missing = tc.missing_sessions(dates)
+    assert list(missing) == [ts("2026-10-15"), ts("2026-10-20")]
+
+    breaks = tc.rangebreaks(dates)
+    assert breaks[0] == dict(bounds=["sat", "mon"])
+    assert breaks[1]["values"] == ["2026-10-15", "2026-10-20"]
+
+
+def test_uncovered_year_warns_once(caplog, monkeypatch):
+    monkeypatch.setattr(tc, "_warned", set())
+    with caplog.at_level(logging.WARNING, logger=tc.log.name):
+        tc.check_coverage("2031-01-05", "2031-03-01")
+        tc.check_coverage("2031-06-01", "2031-06-01")
+        tc.check_coverage("2025-01-01", "2026-01-01")
+    warnings = [r for r in caplog.records if "2031" in r.getMessage()]
+    assert len(warnings) == 1
+    assert len(caplog.records) == 1
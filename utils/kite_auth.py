@@ -7,44 +7,78 @@ Created on Wed May  7 20:46:29 2025
 """
 
 # utils/kite_auth.py
-from kiteconnect import KiteConnect
 from functools import lru_cache
-import streamlit as st
+import os
 import webbrowser
+from core.perf import note
 
 # 1) -------------------------------------------------------------------------
-# Put these three env-vars in ~/.bashrc or export them before running Streamlit
+# Credentials live in st.secrets["kite"] (api_key, api_secret, access_token).
+# Headless jobs can export these three env-vars instead:
 #   KC_API_KEY, KC_API_SECRET, KC_ACCESS_TOKEN
-# KC_ACCESS_TOKEN is blank the very first time; you’ll generate it with the CLI below.
+# The access token is blank the very first time; you’ll generate it with the CLI below.
+#
+# Nothing is read – and neither streamlit nor kiteconnect is imported – until
+# a client is actually needed, so importing core/ stays cheap.
+
+def _secret(name: str, env: str) -> str | None:
+    try:
+        import streamlit as st
+        value = st.secrets.get("kite", {}).get(name)
+    except Exception:               # no secrets.toml (worker, cron, bench)
+        value = None
+    return value or os.environ.get(env)
+
+
+def api_key() -> str | None:
+    return _secret("api_key", "KC_API_KEY")
+
+
+def api_secret() -> str | None:
+    return _secret("api_secret", "KC_API_SECRET")
 
-API_KEY = st.secrets.get("kite", {}).get("api_key", None)
-API_SECRET = st.secrets.get("kite", {}).get("api_secret", None)
 
 # 2) -------------------------------------------------------------------------
 def manual_login() -> str:
     """Run this once each morning to generate a fresh access token."""
-    kite = KiteConnect(api_key=API_KEY)
+    from kiteconnect import KiteConnect
+
+    kite = KiteConnect(api_key=api_key())
     print("Opening Zerodha login…")
     webbrowser.open(kite.login_url())
 
     req_tok = input("Paste request_token from redirected URL: ").strip()
-    sess = kite.generate_session(req_tok, api_secret=API_SECRET)
+    sess = kite.generate_session(req_tok, api_secret=api_secret())
     print("ACCESS_TOKEN =", sess["access_token"])
     # copy-paste that token into your env var
     return sess["access_token"]
 
 
 @lru_cache(maxsize=1)
-def get_kite() -> KiteConnect:
+def _client_class():
+    from kiteconnect import KiteConnect
+
+    class CountingKite(KiteConnect):
+        """KiteConnect that reports every REST call to the perf recorder."""
+
+        def _request(self, route, method, *args, **kwargs):
+            note(kite_calls=1)
+            return super()._request(route, method, *args, **kwargs)
+
+    return CountingKite
+
+
+@lru_cache(maxsize=1)
+def get_kite():
     """
     Return a singleton KiteConnect client.
-    Reads the *current* access token from st.secrets each call,
-    so updating secrets + rerunning Streamlit picks up the new token.
+    Reads the access token from st.secrets (or KC_ACCESS_TOKEN) on first
+    use, so updating secrets + restarting picks up the new token.
     """
-    token = st.secrets["kite"]["access_token"]
+    token = _secret("access_token", "KC_ACCESS_TOKEN")
     if not token:
         raise RuntimeError("access_token empty – run manual_login() and update secrets")
 
-    kite = KiteConnect(api_key=API_KEY)
+    kite = _client_class()(api_key=api_key())
     kite.set_access_token(token)
-    return kite
\ No newline at end of file
+    return kite
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:45:00 2026
+
+@author: varun
+"""
+
+# worker.py
+#
+# Background refresh worker: pulls fresh data on a schedule, computes every
+# derived dashboard table off the request path and publishes a versioned
+# snapshot (core/snapshots.py).  Streamlit sessions only read snapshots, so
+# page latency no longer depends on compute time and N viewers ≠ N
+# recomputations.
+#
+#   python worker.py                 # EOD tables every CACHE_LIVE_TTL secs
+#   python worker.py --live          # include live Kite quotes
+#   python worker.py --once          # single refresh (cron / systemd timer)
+#   python worker.py --nightly       # full EOD build after the data lands
+#
+# Derived tables are built in independent stages (STAGES) over the same
+# base datasets; with --jobs N they run in a process pool.  --nightly is
+# the morning materialization: one EOD build on every core, published with
+# EOD_SNAPSHOT_MAX_AGE so the app reads it all day instead of recomputing.
+import argparse
+import logging
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from app_config import CACHE_LIVE_TTL, SNAPSHOT_KEEP, SNAPSHOT_MAX_AGE, EOD_SNAPSHOT_MAX_AGE
+from core import cache, perf, snapshots
+from core.fetch import fno_stock_all, fno_index_all
+from core.preprocess import (
+    breadth_panels,
+    cash_with_live,
+    index_with_live,
+    compute_adv_decl,
+    official_sector,
+    equal_weight_sector,
+    fno_oi_processing,
+)
+from core.sector import constituent_returns
+from core.straddles import straddle_tables, straddle_panel, decay_vs_history
+from core.basis_screener import daily_basis_panel
+from core.volatility import vol_panels, vol_screen
+from core.option_chain import chain_snapshot, chain_summary
+
+log = logging.getLogger("worker")
+
+# base datasets every stage reads; set in the parent, inherited by pool workers
+_base: dict = {}
+
+
+# ─── stages: each returns ({table: dataframe}, meta) ────────────────────────
+def stage_breadth():
+    ema_pct, nnhl = breadth_panels(_base["cash"])
+    return {"ema_pct": ema_pct, "nnhl": nnhl}, {}
+
+
+def stage_adv_decl():
+    breadth_df, pct_df = compute_adv_decl(_base["cash"])
+    return {"breadth_df": breadth_df, "pct_df": pct_df}, {}
+
+
+def stage_official_sector():
+    rel_official_df, official_table, official_syms = official_sector(_base["index"])
+    return ({"rel_official_df": rel_official_df, "official_table": official_table},
+            {"official_syms": official_syms})
+
+
+def stage_equal_weight_sector():
+    eq_sector_rel, eq_table = equal_weight_sector(_base["cash"], _base["const"], _base["index"])
+    return {"eq_sector_rel": eq_sector_rel, "eq_table": eq_table}, {}
+
+
+def stage_sector_constituents():
+    const = _base["const"]
+    tables = {
+        sector: constituent_returns(sector, _base["cash"], _base["index"], const)
+        for sector in sorted(const["Sector"].unique())
+    }
+    return {"sector_constituents": pd.concat(tables, names=["Sector", "symbol"])}, {}
+
+
+def stage_oi():
+    combined, prev_expiry, front_expiry, cash_latest_date = fno_oi_processing(
+        _base["fno_stock"], _base["cash"])
+    return {"oi_combined": combined}, {
+        "prev_expiry":      prev_expiry,
+        "front_expiry":     front_expiry,
+        "cash_latest_date": cash_latest_date,
+    }
+
+
+def stage_straddles():
+    idx_tbl, stk_tbl = straddle_tables(_base["use_live"])
+    return {"straddle_idx": idx_tbl, "straddle_stk": stk_tbl}, {}
+
+
+def stage_straddle_decay():
+    panel = straddle_panel(_base["fno_stock"], _base["fno_index"])
+    return {"straddle_decay": decay_vs_history(panel)}, {}
+
+
+def stage_vol():
+    panels = vol_panels(_base["cash"], _base["index"], _base["fno_stock"], _base["fno_index"])
+    return {"vol_screen": vol_screen(panels)}, {}
+
+
+def stage_option_chain():
+    if not _base["use_live"]:                 # live quotes only
+        return {}, {}
+    chain = chain_snapshot()
+    return {"option_chain": chain, "chain_summary": chain_summary(chain)}, {}
+
+
+def stage_basis_panel():
+    cash_eod = _base["cash"].drop_duplicates(subset=["symbol", "date"])
+    panel = daily_basis_panel(cash_eod, _base["index"], _base["fno_stock"])
+    return {f"basis_{k}": v for k, v in panel.items()}, {"basis_panel": list(panel)}
+
+
+STAGES = {
+    "breadth":             stage_breadth,
+    "adv_decl":            stage_adv_decl,
+    "official_sector":     stage_official_sector,
+    "equal_weight_sector": stage_equal_weight_sector,
+    "sector_constituents": stage_sector_constituents,
+    "oi":                  stage_oi,
+    "straddles":           stage_straddles,
+    "straddle_decay":      stage_straddle_decay,
+    "vol":                 stage_vol,
+    "option_chain":        stage_option_chain,
+    "basis_panel":         stage_basis_panel,
+}
+
+
+def _init_stages(base: dict) -> None:
+    _base.clear()
+    _base.update(base)
+
+
+def _init_pool_worker(base: dict) -> None:
+    # results go into the snapshot; don't have N processes writing them to
+    # the shared SQLite cache as well
+    cache.configure(disk=False)
+    _init_stages(base)
+
+
+def _run_stage(name: str, own_run: bool = False) -> tuple[dict, dict]:
+    # in-process a stage is a span of the refresh run; in a pool worker the
+    # events can't reach the parent, so each stage is logged as its own run
+    with (perf.run if own_run else perf.span)(f"stage:{name}"):
+        return STAGES[name]()
+
+
+def run_stages(base: dict, jobs: int = 1) -> tuple[dict, dict]:
+    """Run every stage over `base`; jobs > 1 → process pool."""
+    if jobs <= 1:
+        _init_stages(base)
+        results = [_run_stage(name) for name in STAGES]
+    else:
+        # fork hands the base frames to the workers without pickling them
+        ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=min(jobs, len(STAGES)), mp_context=ctx,
+                                 initializer=_init_pool_worker, initargs=(base,)) as pool:
+            futures = [pool.submit(_run_stage, name, True) for name in STAGES]
+            results = [f.result() for f in as_completed(futures)]
+
+    tables, meta = {}, {}
+    for t, m in results:
+        tables.update(t)
+        meta.update(m)
+    return tables, meta
+
+
+def build_tables(use_live: bool, jobs: int = 1) -> tuple[dict, dict]:
+    """Compute every derived table → ({name: dataframe}, meta)."""
+    # fresh in-process pulls; the shared disk tier stays warm for the app
+    cache.clear_all(disk=False)
+
+    const_df = pd.read_csv("data/nifty_500_constituents.csv")
+    const_df["Sector"] = const_df["Sector"].str.strip()
+
+    base = {
+        "cash":      cash_with_live(use_live),
+        "index":     index_with_live(use_live),
+        "fno_stock": fno_stock_all(),
+        "fno_index": fno_index_all(),         # loaded once, before any fork
+        "const":     const_df,
+        "use_live":  use_live,
+    }
+    tables = {"cash": base["cash"], "index": base["index"], "fno_stock": base["fno_stock"]}
+
+    derived, meta = run_stages(base, jobs)
+    tables.update(derived)
+    meta["use_live"] = use_live
+    return tables, meta
+
+
+def refresh(use_live: bool, keep: int = SNAPSHOT_KEEP, jobs: int = 1,
+            max_age: str = SNAPSHOT_MAX_AGE) -> str:
+    t0 = time.perf_counter()
+    with perf.run("refresh-live" if use_live else "refresh-eod"):
+        tables, meta = build_tables(use_live, jobs)
+    meta["max_age"] = max_age                 # how long the app trusts it
+    root = snapshots.mode_root(use_live)
+    with snapshots.host_lock(root):
+        version = snapshots.publish(tables, meta, root=root, keep=keep)
+    log.info("published %s (%d tables) in %.1fs", version, len(tables),
+             time.perf_counter() - t0)
+    return version
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Precompute dashboard tables into snapshots")
+    ap.add_argument("--live", action="store_true", help="include live (Kite) quotes")
+    ap.add_argument("--interval", type=int, default=CACHE_LIVE_TTL,
+                    help="seconds between refreshes (default: CACHE_LIVE_TTL)")
+    ap.add_argument("--keep", type=int, default=SNAPSHOT_KEEP,
+                    help="number of snapshot versions to keep")
+    ap.add_argument("--once", action="store_true", help="refresh once and exit")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="processes for the table stages (default: 1, in-process)")
+    ap.add_argument("--max-age", default=SNAPSHOT_MAX_AGE,
+                    help="how long the app uses the snapshot (default: SNAPSHOT_MAX_AGE)")
+    ap.add_argument("--nightly", action="store_true",
+                    help="single EOD build on all cores, valid for EOD_SNAPSHOT_MAX_AGE")
+    args = ap.parse_args()
+
+    if args.nightly:
+        args.live, args.once = False, True
+        args.jobs = max(args.jobs, os.cpu_count() or 1)
+        args.max_age = EOD_SNAPSHOT_MAX_AGE
+
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    while True:
+        started = time.monotonic()
+        try:
+            refresh(args.live, keep=args.keep, jobs=args.jobs, max_age=args.max_age)
+        except Exception:
+            log.exception("refresh failed – keeping previous snapshot")
+            if args.once:
+                raise
+        if args.once:
+            return
+        time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    main()